@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - ADAPTIVE CONCURRENCY
+AIMD per-host in-flight request limits for harvesters
+
+Each host starts at a modest limit that grows additively (about +1 per
+window of successful requests) while latency and error rate stay healthy,
+and is halved on 429/503, a burst of errors, or a p95 latency well above the
+host's learned baseline. Learned limits and baselines are saved to disk so
+the next run starts where the last one left off.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from harvest_paths import harvest_data_dir
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_STATUSES = frozenset({429, 503})
+
+
+class HostConcurrency:
+    """AIMD limit and recent health samples for one host"""
+
+    def __init__(self, limit: float, baseline: Optional[float] = None, window: int = 50):
+        self.limit = limit
+        self.baseline = baseline
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.last_decrease = 0.0
+        self.decreases = 0
+        self._condition = None
+        self._loop = None
+
+    @property
+    def condition(self) -> asyncio.Condition:
+        """Condition bound to the running loop; a new loop starts with no requests in flight"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._condition = asyncio.Condition()
+            self.in_flight = 0
+        return self._condition
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < 10:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+
+class _Slot:
+    """One in-flight request against a host; set ``status`` before exit
+
+    The slot is held until the response body has been read; callers that
+    parse afterwards call ``release()`` first so local work neither holds
+    the host's slot nor counts as host latency. With a ``budget`` semaphore
+    the slot also takes one of a shared pool of connections, after the
+    host's own limit so a request waiting on its host holds none.
+    """
+
+    def __init__(self, controller: 'AdaptiveConcurrency', host: str,
+                 budget: Optional[asyncio.Semaphore] = None):
+        self.controller = controller
+        self.host = host
+        self.budget = budget
+        self.status: Optional[int] = None
+        self.started = 0.0
+        self.released = False
+
+    async def __aenter__(self) -> '_Slot':
+        await self.controller.acquire(self.host)
+        if self.budget is not None:
+            try:
+                await self.budget.acquire()
+            except BaseException:
+                await self.controller.release(self.host, 0.0, None, sample=False)
+                raise
+        self.started = time.monotonic()
+        return self
+
+    async def release(self, local_seconds: float = 0.0, failed: bool = False):
+        """Give the slot back now, excluding ``local_seconds`` of parsing from the latency sample"""
+        if self.released:
+            return
+        self.released = True
+        if self.budget is not None:
+            self.budget.release()
+        latency = max(0.0, time.monotonic() - self.started - local_seconds)
+        await self.controller.release(self.host, latency, self.status, failed=failed)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.released:
+            return
+        if exc_type is not None and issubclass(exc_type, asyncio.CancelledError):
+            # Abandoned (e.g. an unneeded prefetch), says nothing about the host
+            self.released = True
+            if self.budget is not None:
+                self.budget.release()
+            await self.controller.release(self.host, time.monotonic() - self.started, None, sample=False)
+            return
+        await self.release(failed=exc_type is not None)
+
+
+class AdaptiveConcurrency:
+    """Process-wide AIMD controller of per-host in-flight requests"""
+
+    def __init__(self, path: Optional[Path] = None, initial_limit: float = 4, min_limit: float = 1,
+                 max_limit: float = 64, backoff: float = 0.5, latency_tolerance: float = 2.0,
+                 max_error_rate: float = 0.2):
+        self.path = Path(path) if path else None
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.hosts: Dict[str, HostConcurrency] = {}
+        self._learned: Optional[Dict[str, Dict[str, float]]] = None
+
+    def _state_path(self) -> Path:
+        if self.path is None:
+            self.path = harvest_data_dir('state') / 'concurrency.json'
+        return self.path
+
+    def _host(self, host: str) -> HostConcurrency:
+        state = self.hosts.get(host)
+        if state is None:
+            if self._learned is None:
+                path = self._state_path()
+                self._learned = json.loads(path.read_text()) if path.exists() else {}
+            learned = self._learned.get(host, {})
+            state = HostConcurrency(learned.get('limit', self.initial_limit), learned.get('baseline'))
+            self.hosts[host] = state
+        return state
+
+    def slot(self, url: str, budget: Optional[asyncio.Semaphore] = None) -> _Slot:
+        """Async context manager holding one request slot for the URL's host (and one of ``budget``)"""
+        return _Slot(self, urlsplit(url).netloc.lower(), budget)
+
+    async def acquire(self, host: str):
+        state = self._host(host)
+        condition = state.condition
+        async with condition:
+            await condition.wait_for(lambda: state.in_flight < max(1, int(state.limit)))
+            state.in_flight += 1
+
+    async def release(self, host: str, latency: float, status: Optional[int], failed: bool = False,
+                      sample: bool = True):
+        state = self._host(host)
+        if sample:
+            self._observe(host, state, latency, status, failed)
+
+        condition = state.condition
+        async with condition:
+            state.in_flight -= 1
+            condition.notify_all()
+
+    def _observe(self, host: str, state: HostConcurrency, latency: float, status: Optional[int], failed: bool):
+        ok = not failed and status is not None and status < 500 and status not in BACKOFF_STATUSES
+        state.outcomes.append(ok)
+        if ok:
+            state.latencies.append(latency)
+
+        p95 = state.p95()
+        if status in BACKOFF_STATUSES or state.error_rate() > self.max_error_rate:
+            self._decrease(host, state, f"status {status}" if status else "errors")
+        elif p95 is not None and state.baseline is not None and p95 > state.baseline * self.latency_tolerance:
+            self._decrease(host, state, f"p95 {p95:.2f}s over baseline {state.baseline:.2f}s")
+        elif ok:
+            state.limit = min(self.max_limit, state.limit + 1.0 / state.limit)
+            if p95 is not None:
+                state.baseline = p95 if state.baseline is None else 0.9 * state.baseline + 0.1 * p95
+
+    def _decrease(self, host: str, state: HostConcurrency, reason: str):
+        now = time.monotonic()
+        # One decrease per burst of bad responses
+        if now - state.last_decrease < 1.0:
+            return
+        state.last_decrease = now
+        state.limit = max(self.min_limit, state.limit * self.backoff)
+        state.decreases += 1
+        state.outcomes.clear()
+        state.latencies.clear()
+        logger.info(f"Concurrency for {host} reduced to {state.limit:.1f} ({reason})")
+
+    def save(self):
+        """Persist learned limits for the next run"""
+        if not self.hosts:
+            return
+        learned = dict(self._learned or {})
+        for host, state in self.hosts.items():
+            learned[host] = {'limit': state.limit, 'baseline': state.baseline}
+        path = self._state_path()
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(learned))
+        tmp.replace(path)
+        self._learned = learned
+
+    def get_status(self, hosts=None) -> Dict[str, Dict[str, Any]]:
+        hosts = self.hosts if hosts is None else hosts
+        return {
+            host: {
+                'limit': round(self.hosts[host].limit, 2),
+                'in_flight': self.hosts[host].in_flight,
+                'p95_latency': self.hosts[host].p95(),
+                'baseline_p95': self.hosts[host].baseline,
+                'decreases': self.hosts[host].decreases
+            }
+            for host in hosts if host in self.hosts
+        }
+
+
+# Process-wide controller
+shared_concurrency = AdaptiveConcurrency()
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - ATT&CK GRAPH INDEX
+Compact in-memory graph of the MITRE ATT&CK STIX bundle
+
+The bundle is stream-parsed once into integer node ids and one CSR adjacency
+(offsets + targets arrays) per relationship: technique -> tactic, mitigation
+-> technique, data component -> technique, data component -> data source,
+group -> technique and sub-technique -> technique, each walkable in both
+directions. Coverage questions ("mitigations for T1059", "detections covering
+execution") become array slices instead of rescans of the multi-MB JSON. The
+built index is saved next to the bundle's ETag and collection version, and a
+refresh only downloads and rebuilds when the published bundle changed.
+
+    python attack_graph.py --refresh
+    python attack_graph.py --mitigations T1059.001
+    python attack_graph.py --detections-for-tactic execution
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from harvest_paths import harvest_data_dir
+from json_stream import JsonItemStream
+from session_pool import shared_session_pool
+
+logger = logging.getLogger(__name__)
+
+ATTACK_BUNDLE_URL = (
+    'https://raw.githubusercontent.com/mitre-attack/attack-stix-data/master/{domain}/{domain}.json'
+)
+
+# Node kinds, indexed by their uint8 code
+KINDS = ('technique', 'tactic', 'mitigation', 'data_source', 'data_component', 'group')
+_STIX_KINDS = {
+    'attack-pattern': 'technique',
+    'x-mitre-tactic': 'tactic',
+    'course-of-action': 'mitigation',
+    'x-mitre-data-source': 'data_source',
+    'x-mitre-data-component': 'data_component',
+    'intrusion-set': 'group'
+}
+
+# Relationship name -> (source kind, target kind); edges point source -> target
+RELATIONS = {
+    'tactic': ('technique', 'tactic'),
+    'mitigates': ('mitigation', 'technique'),
+    'detects': ('data_component', 'technique'),
+    'component_of': ('data_component', 'data_source'),
+    'uses': ('group', 'technique'),
+    'subtechnique_of': ('technique', 'technique')
+}
+_STIX_RELATIONS = {'mitigates': 'mitigates', 'detects': 'detects', 'uses': 'uses',
+                   'subtechnique-of': 'subtechnique_of'}
+
+
+class _Adjacency:
+    """CSR adjacency of one relationship, forward and reverse"""
+
+    __slots__ = ('offsets', 'targets', 'reverse_offsets', 'reverse_targets')
+
+    def __init__(self, edges: Iterable[Tuple[int, int]], nodes: int):
+        pairs = np.array(sorted(set(edges)), dtype=np.int32).reshape(-1, 2)
+        self.offsets, self.targets = self._csr(pairs[:, 0], pairs[:, 1], nodes)
+        self.reverse_offsets, self.reverse_targets = self._csr(pairs[:, 1], pairs[:, 0], nodes)
+
+    @staticmethod
+    def _csr(sources: np.ndarray, targets: np.ndarray, nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(sources, kind='stable')
+        offsets = np.zeros(nodes + 1, dtype=np.int32)
+        np.cumsum(np.bincount(sources, minlength=nodes), out=offsets[1:])
+        return offsets, targets[order].astype(np.int32)
+
+    def neighbors(self, node: int, reverse: bool = False) -> np.ndarray:
+        offsets, targets = ((self.reverse_offsets, self.reverse_targets) if reverse
+                            else (self.offsets, self.targets))
+        return targets[offsets[node]:offsets[node + 1]]
+
+
+class AttackGraph:
+    """Integer-id ATT&CK graph with per-relationship adjacency arrays"""
+
+    def __init__(self, stix_ids: List[str], external_ids: List[str], names: List[str],
+                 kinds: np.ndarray, edges: Dict[str, List[Tuple[int, int]]], version: Dict[str, Any]):
+        self.stix_ids = stix_ids
+        self.external_ids = external_ids
+        self.names = names
+        self.kinds = kinds
+        self.version = version
+        self._edges = edges
+        self.relations = {name: _Adjacency(edges.get(name, ()), len(stix_ids)) for name in RELATIONS}
+        self._index: Dict[str, int] = {}
+        for node, (stix_id, external_id, name) in enumerate(zip(stix_ids, external_ids, names)):
+            self._index[stix_id] = node
+            self._index.setdefault(name.lower(), node)
+            if external_id:
+                self._index[external_id.upper()] = node
+        # Tactics by ATT&CK id, shortname ("command-and-control") and name
+        self._tactics: Dict[str, int] = {}
+        for node in np.flatnonzero(kinds == KINDS.index('tactic')).tolist():
+            for key in (external_ids[node].upper(), names[node].lower(), names[node].lower().replace(' ', '-')):
+                self._tactics[key] = node
+
+    @classmethod
+    def from_objects(cls, objects: Iterable[Dict[str, Any]]) -> 'AttackGraph':
+        """Build from STIX objects; revoked and deprecated objects are left out"""
+        stix_ids: List[str] = []
+        external_ids: List[str] = []
+        names: List[str] = []
+        kinds: List[int] = []
+        nodes: Dict[str, int] = {}
+        tactic_names: Dict[str, int] = {}
+        component_sources: List[Tuple[int, str]] = []
+        technique_phases: List[Tuple[int, List[str]]] = []
+        # Pre-v10 bundles name data sources on the technique as "Source: Component"
+        technique_data_sources: List[Tuple[int, List[str]]] = []
+        relationships: List[Dict[str, Any]] = []
+        version: Dict[str, Any] = {}
+
+        for obj in objects:
+            stix_type = obj.get('type')
+            if stix_type == 'relationship':
+                relationships.append(obj)
+                continue
+            if stix_type == 'x-mitre-collection':
+                version = {'collection': obj.get('x_mitre_version'), 'modified': obj.get('modified')}
+                continue
+            kind = _STIX_KINDS.get(stix_type)
+            if kind is None or obj.get('revoked') or obj.get('x_mitre_deprecated'):
+                continue
+            node = len(stix_ids)
+            nodes[obj['id']] = node
+            stix_ids.append(obj['id'])
+            external_ids.append(next(
+                (ref.get('external_id', '') for ref in obj.get('external_references', [])
+                 if ref.get('source_name') == 'mitre-attack'), ''
+            ))
+            names.append(obj.get('name', ''))
+            kinds.append(KINDS.index(kind))
+            if kind == 'tactic':
+                tactic_names[obj.get('x_mitre_shortname', '')] = node
+            elif kind == 'technique':
+                technique_phases.append((node, [
+                    phase['phase_name'] for phase in obj.get('kill_chain_phases', [])
+                    if phase.get('kill_chain_name', '').startswith('mitre')
+                ]))
+                if obj.get('x_mitre_data_sources'):
+                    technique_data_sources.append((node, obj['x_mitre_data_sources']))
+            elif kind == 'data_component' and obj.get('x_mitre_data_source_ref'):
+                component_sources.append((node, obj['x_mitre_data_source_ref']))
+
+        edges: Dict[str, List[Tuple[int, int]]] = {name: [] for name in RELATIONS}
+        for technique, phases in technique_phases:
+            edges['tactic'].extend((technique, tactic_names[phase]) for phase in phases if phase in tactic_names)
+        for component, source_ref in component_sources:
+            if source_ref in nodes:
+                edges['component_of'].append((component, nodes[source_ref]))
+        for rel in relationships:
+            name = _STIX_RELATIONS.get(rel.get('relationship_type'))
+            if name is None or rel.get('revoked') or rel.get('x_mitre_deprecated'):
+                continue
+            source, target = nodes.get(rel.get('source_ref')), nodes.get(rel.get('target_ref'))
+            if source is None or target is None:
+                continue
+            source_kind, target_kind = RELATIONS[name]
+            if KINDS[kinds[source]] == source_kind and KINDS[kinds[target]] == target_kind:
+                edges[name].append((source, target))
+
+        if technique_data_sources and not edges['detects']:
+            cls._legacy_detections(technique_data_sources, nodes, stix_ids, external_ids, names, kinds, edges)
+        return cls(stix_ids, external_ids, names, np.array(kinds, dtype=np.uint8), edges, version)
+
+    @staticmethod
+    def _legacy_detections(technique_data_sources, nodes, stix_ids, external_ids, names, kinds, edges):
+        """Synthesize data source/component nodes from technique x_mitre_data_sources strings"""
+        created: Dict[str, int] = {}
+
+        def node_for(key: str, name: str, kind: str) -> int:
+            if key not in created:
+                created[key] = len(stix_ids)
+                stix_ids.append(key)
+                external_ids.append('')
+                names.append(name)
+                kinds.append(KINDS.index(kind))
+            return created[key]
+
+        for technique, entries in technique_data_sources:
+            for entry in entries:
+                source_name, _, component_name = entry.partition(': ')
+                source = node_for(f"data-source--{source_name}", source_name, 'data_source')
+                component = node_for(f"data-component--{entry}", component_name or source_name, 'data_component')
+                edges['component_of'].append((component, source))
+                edges['detects'].append((component, technique))
+
+    # Queries
+
+    def node(self, key: str) -> int:
+        """Node id for an ATT&CK id (T1059, TA0002, M1038, G0016), STIX id or name"""
+        for candidate in (key, key.upper(), key.lower()):
+            if candidate in self._index:
+                return self._index[candidate]
+        raise KeyError(key)
+
+    def kind(self, node: int) -> str:
+        return KINDS[self.kinds[node]]
+
+    def neighbors(self, relation: str, node: int, reverse: bool = False) -> np.ndarray:
+        return self.relations[relation].neighbors(node, reverse)
+
+    def describe(self, nodes: Iterable[int]) -> List[Dict[str, str]]:
+        return [{'id': self.external_ids[node] or self.stix_ids[node], 'name': self.names[node],
+                 'kind': self.kind(node)} for node in nodes]
+
+    def _tactic_nodes(self, tactic: str) -> np.ndarray:
+        for key in (tactic.upper(), tactic.lower(), tactic.lower().replace(' ', '-')):
+            if key in self._tactics:
+                return self.neighbors('tactic', self._tactics[key], reverse=True)
+        raise KeyError(tactic)
+
+    def techniques(self, tactic: str) -> List[Dict[str, str]]:
+        """Techniques (and sub-techniques) under a tactic"""
+        return self.describe(self._tactic_nodes(tactic))
+
+    def tactics(self, technique: str) -> List[Dict[str, str]]:
+        return self.describe(self.neighbors('tactic', self.node(technique)))
+
+    def mitigations(self, technique: str) -> List[Dict[str, str]]:
+        return self.describe(self.neighbors('mitigates', self.node(technique), reverse=True))
+
+    def mitigated_techniques(self, mitigation: str) -> List[Dict[str, str]]:
+        return self.describe(self.neighbors('mitigates', self.node(mitigation)))
+
+    def groups(self, technique: str) -> List[Dict[str, str]]:
+        return self.describe(self.neighbors('uses', self.node(technique), reverse=True))
+
+    def group_techniques(self, group: str) -> List[Dict[str, str]]:
+        return self.describe(self.neighbors('uses', self.node(group)))
+
+    def detections(self, technique: str) -> List[Dict[str, Any]]:
+        """Data components that detect a technique, with their data sources"""
+        return [
+            dict(component, data_sources=[source['name'] for source in self.describe(
+                self.neighbors('component_of', node))])
+            for node, component in self._with_nodes(self.neighbors('detects', self.node(technique), reverse=True))
+        ]
+
+    def _with_nodes(self, nodes: np.ndarray):
+        return zip(nodes.tolist(), self.describe(nodes))
+
+    def detections_for_tactic(self, tactic: str) -> Dict[str, Any]:
+        """Data components covering a tactic's techniques, most coverage first, plus the gaps"""
+        techniques = self._tactic_nodes(tactic)
+        detects = self.relations['detects']
+        per_technique = [detects.neighbors(node, reverse=True) for node in techniques.tolist()]
+        components, counts = np.unique(
+            np.concatenate(per_technique) if per_technique else np.empty(0, dtype=np.int32),
+            return_counts=True
+        )
+        order = np.argsort(-counts, kind='stable')
+        undetected = [node for node, found in zip(techniques.tolist(), per_technique) if not len(found)]
+        return {
+            'tactic': tactic,
+            'techniques': int(len(techniques)),
+            'detected': int(len(techniques) - len(undetected)),
+            'components': [
+                dict(component, techniques=int(count), data_sources=[
+                    self.names[source] for source in self.neighbors('component_of', node).tolist()
+                ])
+                for (node, component), count in zip(self._with_nodes(components[order]), counts[order].tolist())
+            ],
+            'undetected': self.describe(undetected)
+        }
+
+    def mitigation_coverage(self, tactic: str) -> Dict[str, Any]:
+        """How many of a tactic's techniques have at least one mitigation"""
+        techniques = self._tactic_nodes(tactic)
+        mitigates = self.relations['mitigates']
+        unmitigated = [node for node in techniques.tolist() if not len(mitigates.neighbors(node, reverse=True))]
+        return {'tactic': tactic, 'techniques': int(len(techniques)),
+                'mitigated': int(len(techniques) - len(unmitigated)), 'unmitigated': self.describe(unmitigated)}
+
+    # Persistence
+
+    def save(self, path: Path):
+        """Write node tables and edge lists; adjacency arrays are rebuilt on load"""
+        path = Path(path)
+        arrays = {f"edges_{name}": np.array(edges, dtype=np.int32).reshape(-1, 2)
+                  for name, edges in self._edges.items()}
+        np.savez_compressed(path.with_suffix('.npz'), kinds=self.kinds, **arrays)
+        path.with_suffix('.json').write_text(json.dumps({
+            'version': self.version, 'stix_ids': self.stix_ids,
+            'external_ids': self.external_ids, 'names': self.names
+        }))
+
+    @classmethod
+    def load(cls, path: Path) -> 'AttackGraph':
+        path = Path(path)
+        meta = json.loads(path.with_suffix('.json').read_text())
+        with np.load(path.with_suffix('.npz')) as arrays:
+            edges = {name: [tuple(edge) for edge in arrays[f"edges_{name}"].tolist()]
+                     for name in RELATIONS if f"edges_{name}" in arrays}
+            kinds = arrays['kinds']
+        return cls(meta['stix_ids'], meta['external_ids'], meta['names'], kinds, edges, meta['version'])
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'nodes': {kind: int((self.kinds == code).sum()) for code, kind in enumerate(KINDS)},
+            'edges': {name: int(len(adjacency.targets)) for name, adjacency in self.relations.items()}
+        }
+
+
+class AttackGraphStore:
+    """Loads the saved graph once and refreshes it when the published bundle changes"""
+
+    def __init__(self, domain: str = 'enterprise-attack', url: Optional[str] = None,
+                 root: Optional[Path] = None):
+        self.domain = domain
+        self.url = url or ATTACK_BUNDLE_URL.format(domain=domain)
+        self.root = Path(root) if root else None
+        self._graph: Optional[AttackGraph] = None
+        self.reloads = 0
+
+    @property
+    def path(self) -> Path:
+        if self.root is None:
+            self.root = harvest_data_dir('attack')
+        return self.root / f"{self.domain}-graph"
+
+    @property
+    def graph(self) -> AttackGraph:
+        """The loaded graph; read from disk on first use"""
+        if self._graph is None:
+            if not self.path.with_suffix('.npz').exists():
+                raise LookupError(f"No ATT&CK graph for {self.domain}; run refresh() first")
+            self._graph = AttackGraph.load(self.path)
+        return self._graph
+
+    def _saved_version(self) -> Dict[str, Any]:
+        meta = self.path.with_suffix('.json')
+        if self._graph is not None:
+            return self._graph.version
+        if meta.exists():
+            return json.loads(meta.read_text()).get('version', {})
+        return {}
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Download and rebuild if the bundle changed; True when the graph was replaced"""
+        saved = self._saved_version()
+        headers = {}
+        if saved.get('etag') and not force:
+            headers['If-None-Match'] = saved['etag']
+
+        session = await shared_session_pool.acquire()
+        try:
+            async with session.get(self.url, headers=headers) as response:
+                if response.status == 304:
+                    logger.info(f"ATT&CK {self.domain} bundle unchanged")
+                    return False
+                response.raise_for_status()
+                objects = await self._stream_objects(response.content.iter_chunked(256 * 1024))
+                etag = response.headers.get('ETag')
+        finally:
+            await shared_session_pool.release()
+        return self._install(objects, etag, saved, force)
+
+    async def load_file(self, path: Path, force: bool = False) -> bool:
+        """Rebuild from a local bundle file if its version differs from the saved one"""
+        async def chunks():
+            with open(path, 'rb') as bundle:
+                while True:
+                    chunk = bundle.read(1024 * 1024)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        return self._install(await self._stream_objects(chunks()), None, self._saved_version(), force)
+
+    @staticmethod
+    async def _stream_objects(chunks: AsyncIterator[bytes]) -> List[Dict[str, Any]]:
+        stream = JsonItemStream((b'objects',))
+        objects: List[Dict[str, Any]] = []
+        async for chunk in chunks:
+            objects.extend(stream.feed(chunk))
+        objects.extend(stream.close())
+        return objects
+
+    def _install(self, objects: List[Dict[str, Any]], etag: Optional[str],
+                 saved: Dict[str, Any], force: bool) -> bool:
+        collection = next((obj for obj in objects if obj.get('type') == 'x-mitre-collection'), {})
+        version = {'collection': collection.get('x_mitre_version'), 'modified': collection.get('modified')}
+        if not force and version['collection'] and all(saved.get(k) == v for k, v in version.items()):
+            logger.info(f"ATT&CK {self.domain} {version['collection']} already indexed")
+            if etag and saved.get('etag') != etag:
+                self.graph.version['etag'] = etag
+                self.graph.save(self.path)
+            return False
+
+        started = time.perf_counter()
+        graph = AttackGraph.from_objects(objects)
+        graph.version.update(etag=etag, loaded_at=time.time())
+        graph.save(self.path)
+        self._graph = graph
+        self.reloads += 1
+        logger.info(f"Indexed ATT&CK {self.domain} {graph.version.get('collection')}: "
+                    f"{len(graph.stix_ids)} nodes in {time.perf_counter() - started:.2f}s")
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        status = {'domain': self.domain, 'url': self.url, 'reloads': self.reloads}
+        if self._graph is not None:
+            status['graph'] = self._graph.get_status()
+        return status
+
+
+# Lazy process-wide store for the enterprise matrix
+_shared_store: Optional[AttackGraphStore] = None
+
+
+def shared_attack_graph() -> AttackGraphStore:
+    global _shared_store
+    if _shared_store is None:
+        _shared_store = AttackGraphStore()
+    return _shared_store
+
+
+QUERIES = ('mitigations', 'detections', 'groups', 'techniques', 'detections_for_tactic', 'mitigation_coverage')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--domain', default='enterprise-attack',
+                        choices=['enterprise-attack', 'mobile-attack', 'ics-attack'])
+    parser.add_argument('--url', default=None, help='bundle URL override')
+    parser.add_argument('--refresh', action='store_true', help='download the bundle if it changed')
+    parser.add_argument('--bundle', type=Path, default=None, help='index a local bundle file')
+    parser.add_argument('--force', action='store_true', help='rebuild even if the version is unchanged')
+    parser.add_argument('--mitigations', metavar='TECHNIQUE')
+    parser.add_argument('--detections', metavar='TECHNIQUE')
+    parser.add_argument('--groups', metavar='TECHNIQUE')
+    parser.add_argument('--techniques', metavar='TACTIC')
+    parser.add_argument('--detections-for-tactic', metavar='TACTIC')
+    parser.add_argument('--mitigation-coverage', metavar='TACTIC')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    store = AttackGraphStore(args.domain, args.url)
+    if args.bundle:
+        asyncio.run(store.load_file(args.bundle, args.force))
+    if args.refresh:
+        asyncio.run(store.refresh(args.force))
+
+    ran = False
+    for name in QUERIES:
+        value = getattr(args, name)
+        if value is None:
+            continue
+        ran = True
+        started = time.perf_counter()
+        try:
+            result = getattr(store.graph, name)(value)
+        except KeyError as e:
+            print(f"Unknown ATT&CK id or name: {e}")
+            return 1
+        print(json.dumps(result, indent=2))
+        print(f"{name} in {(time.perf_counter() - started) * 1000:.2f} ms")
+    if not ran:
+        print(json.dumps(store.graph.get_status(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,10 @@
 
 # BRAIN CONNECTION - Added by THORNE + GS343
+import os
 import sys
-sys.path.append(r'E:\ECHO_X\X1200_BRAIN')
+BRAIN_PATH = r'E:\ECHO_X\X1200_BRAIN'
+if os.path.isdir(BRAIN_PATH):
+    sys.path.append(BRAIN_PATH)
 brain_connection = True
 consciousness_contribution = 0.01
 
@@ -32,9 +35,32 @@ import asyncio
 import aiohttp
 import json
 import logging
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
 from pathlib import Path
+from urllib.parse import urlencode, urljoin
+
+# Core helpers live alongside this module
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from rate_limiter import HostRateLimiter
+from session_pool import shared_session_pool
+from response_cache import AUTH_HEADERS, shared_response_cache
+from json_stream import JsonItemStream, map_fields
+from harvest_item import HarvestItem
+from quality_scoring import BatchQualityScorer
+from dedup_index import shared_dedup_index
+from watermark_store import shared_watermark_store
+from circuit_breaker import RETRY_STATUSES, RetryPolicy, parse_retry_after, shared_breakers
+from adaptive_concurrency import shared_concurrency
+from harvest_metrics import HarvestMetrics, shared_loop_lag
+from parse_offload import (
+    DEFAULT_OFFLOAD_BYTES, ITEM_KEYS, decode_text_payload, extract_html_payload, parse_json_payload, shared_parse_offload
+)
+from html_text import ExtractedText, HtmlTextExtractor
+from pagination import Page, Pagination
+from single_flight import flight_key, shared_single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -55,58 +81,124 @@ class BaseHarvester:
             'base_urls': ['https://api.example.com'],
             'endpoints': ['/data'],
             'auth': {},
-            'rate_limit': 10
+            'rate_limit': 10,
+            # Global cap; per-host limits adapt underneath it
+            'max_concurrency': 16,
+            'cache_ttl': None,
+            'stream_chunk_size': 64 * 1024,
+            'stream_queue_size': 100,
+            # e.g. {'param': 'since', 'field': 'updated_at'} to request only newer items
+            'incremental': None,
+            'max_attempts': 3,
+            # e.g. {'scheme': 'offset', 'param': 'offset', 'limit_param': 'limit', 'page_size': 100}
+            'pagination': None,
+            # Bodies at least this large are parsed in the process pool; None keeps all parsing in-loop
+            'parse_offload_bytes': DEFAULT_OFFLOAD_BYTES,
+            # Keys of the item array in a top-level JSON object, tried in order
+            'item_keys': list(ITEM_KEYS),
+            # e.g. {'title': 'cve.id', 'content': ['summary', 'cve.descriptions.0.value']}
+            # to map raw items onto harvester fields by dotted path
+            'fields': None
         }
         
-        # Session and rate limiting
+        # Session
         self.session = None
-        self.rate_limiter = asyncio.Semaphore(5)
+        self.concurrency = shared_concurrency
+        # Optional semaphore shared with other harvesters, taken per request
+        self.connection_budget = None
+        
+        # Failure handling shared across harvester instances
+        self.breakers = shared_breakers
+        self.retry_count = 0
+        self._hosts = set()
         
         # Performance features
-        self.cache = {}
-        # Metrics disabled
+        self.cache = shared_response_cache
+        self.dedup = shared_dedup_index
+        # Concurrent identical fetches, from this or other harvesters, share one request
+        self.flights = shared_single_flight
+        
+        # Durable storage; assign a HarvestSink to persist accepted items
+        self.sink = None
+        
+        # Incremental harvesting and sweep resume
+        self.watermarks = shared_watermark_store
+        self._target_state = {}
+        
+        # Per-target latency, bytes, parse time and validation metrics
+        self.metrics = HarvestMetrics(self.name)
+        self.loop_lag = shared_loop_lag
+        
+        # CPU-heavy parsing of large payloads runs on other cores
+        self.offload = shared_parse_offload
+        self.last_harvest = None
         
         # Quality control
         self.quality_threshold = 0.7
         self.harvested_count = 0
         
+        self._apply_config()
+        
         logger.info(f"{self.name} harvester initialized with swarm enhancements")
     
+    def _apply_config(self):
+        """(Re)build the helpers derived from api_config and category
+        
+        Call again after changing api_config or category on an instance.
+        """
+        self.rate_limiter = asyncio.Semaphore(self.api_config['max_concurrency'])
+        self.host_limiter = HostRateLimiter(self.api_config['rate_limit'])
+        self.retry_policy = RetryPolicy(max_attempts=self.api_config['max_attempts'])
+        
+        # Following next pages, prefetching ahead where the scheme allows
+        self.pagination = Pagination.from_config(self.api_config.get('pagination'))
+        self.item_keys = tuple(self.api_config.get('item_keys') or ITEM_KEYS)
+        self.scorer = BatchQualityScorer.for_category(self.category)
+        self.metrics.harvester = self.name
+        
+        # Everything besides the URL that shapes a fetched page; harvesters
+        # only share fetches when theirs match
+        self._parse_profile = json.dumps([
+            self.item_keys, self.api_config.get('fields'), self.api_config.get('pagination'),
+            self.api_config.get('incremental'), self.scorer.table
+        ], sort_keys=True, default=str)
+    
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=30),
-            headers={'User-Agent': 'Echo-Prime-V8-Harvester/1.0'}
-        )
+        self.session = await shared_session_pool.acquire()
+        self.loop_lag.start()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
         if self.session:
-            await self.session.close()
+            self.session = None
+            await self.loop_lag.stop()
+            await shared_session_pool.release()
     
     async def harvest(self, max_items: int = 50) -> List[Dict[str, Any]]:
         """Main harvesting method with advanced processing"""
         harvested_data = []
         
         try:
-            targets = self._get_harvest_targets()
+            targets = self._get_harvest_targets()[:max_items]
+            targets = self.watermarks.begin_sweep(self.name, targets)
             logger.info(f"Starting harvest of {len(targets)} targets")
             
-            async with self.rate_limiter:
-                for target in targets[:max_items]:
-                    try:
-                        data = await self._harvest_target(target)
-                        if data and self._validate_data(data):
-                            harvested_data.extend(data)
-                        
-                        # Rate limiting
-                        await asyncio.sleep(0.5)
-                        
-                    except Exception as e:
-                        logger.error(f"Target harvest error: {e}")
-                        continue
+            results = await asyncio.gather(
+                *(self._harvest_one(target) for target in targets),
+                return_exceptions=True
+            )
+            
+            for data in results:
+                if isinstance(data, Exception):
+                    logger.error(f"Target harvest error: {data}")
+                    continue
+                harvested_data.extend(data)
             
+            self.watermarks.finish_sweep(self.name)
+            await self._flush_stores()
+            self.last_harvest = datetime.now().isoformat()
             self.harvested_count += len(harvested_data)
             logger.info(f"Harvest complete: {len(harvested_data)} items")
             
@@ -115,6 +207,168 @@ class BaseHarvester:
         
         return harvested_data
     
+    async def harvest_stream(self, max_items: int = 50) -> AsyncIterator[Dict[str, Any]]:
+        """Yield processed items as targets complete
+        
+        Items pass through a bounded queue; fetch slots are held until a
+        target's items are queued, so a slow consumer throttles fetching.
+        Items are stored and a target's watermark advances only as they are
+        yielded; if the stream stops early, items admitted to the dedup index
+        but never yielded are withdrawn again so a later run delivers them.
+        """
+        targets = self._get_harvest_targets()[:max_items]
+        targets = self.watermarks.begin_sweep(self.name, targets)
+        queue = asyncio.Queue(maxsize=self.api_config.get('stream_queue_size', 100))
+        finished = object()
+        undelivered: Dict[int, HarvestItem] = {}
+        remaining: Dict[str, int] = {}
+        logger.info(f"Starting streamed harvest of {len(targets)} targets")
+        
+        async def produce(target: str):
+            async with self.rate_limiter:
+                data = await self._harvest_target(target)
+                accepted = self._admit(target, data) if self._validate_target(target, data) else []
+                if not accepted:
+                    self._complete_target(target)
+                    return
+                undelivered.update((id(item), item) for item in accepted)
+                remaining[target] = len(accepted)
+                for item in accepted:
+                    await queue.put((target, item))
+        
+        async def run():
+            results = await asyncio.gather(
+                *(produce(target) for target in targets),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Target harvest error: {result}")
+            await queue.put(finished)
+        
+        producer = asyncio.create_task(run())
+        streamed = 0
+        
+        try:
+            while True:
+                entry = await queue.get()
+                if entry is finished:
+                    self.watermarks.finish_sweep(self.name)
+                    self.last_harvest = datetime.now().isoformat()
+                    break
+                target, item = entry
+                del undelivered[id(item)]
+                if self.sink is not None:
+                    self.sink.write([item])
+                remaining[target] -= 1
+                if not remaining[target]:
+                    self._complete_target(target)
+                streamed += 1
+                self.harvested_count += 1
+                yield item
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+            if undelivered:
+                self.dedup.forget(undelivered.values())
+                logger.info(f"Withdrew {len(undelivered)} undelivered items from the dedup index")
+            await self._flush_stores()
+            logger.info(f"Streamed harvest complete: {streamed} items")
+    
+    async def _harvest_one(self, target: str) -> List[HarvestItem]:
+        """Harvest, validate and accept one target, recording its progress"""
+        data = await self._harvest_limited(target)
+        accepted = self._accept(target, data) if self._validate_target(target, data) else []
+        self._complete_target(target)
+        return accepted
+    
+    def _validate_target(self, target: str, data: List[HarvestItem]) -> bool:
+        """Validate a target's items, counting them as rejected if they fail"""
+        valid = bool(data) and self._validate_data(data)
+        if not valid:
+            self.metrics.target(target).items_rejected += len(data)
+        return valid
+    
+    def _complete_target(self, target: str):
+        """Advance the target's watermark and mark it done in the current sweep
+        
+        Targets whose fetch failed have no recorded state and stay pending,
+        so a resumed sweep retries them.
+        """
+        state = self._target_state.pop(target, None)
+        if state is None:
+            return
+        if state['cursor'] is not None:
+            self.watermarks.set(self.name, target, state['cursor'])
+        self.watermarks.mark_done(self.name, target)
+    
+    def _apply_watermark(self, target: str) -> str:
+        """Add the target's cursor to the request URL when harvesting incrementally"""
+        incremental = self.api_config.get('incremental')
+        if not incremental:
+            return target
+        cursor = self.watermarks.get(self.name, target)
+        if cursor is None:
+            return target
+        separator = '&' if '?' in target else '?'
+        return f"{target}{separator}{urlencode({incremental['param']: cursor})}"
+    
+    def _observe_cursor(self, source: str, batch: List[Any]):
+        """Track the newest cursor value seen in a batch of raw items"""
+        incremental = self.api_config.get('incremental')
+        if not incremental:
+            return
+        field = incremental['field']
+        self._record_cursor(source, [
+            item[field] for item in batch if isinstance(item, dict) and item.get(field) is not None
+        ])
+    
+    def _record_cursor(self, source: str, values: List[Any]):
+        """Advance the in-progress cursor of a target to the newest of ``values``"""
+        state = self._target_state.get(source)
+        if state is None:
+            return
+        values = list(values)
+        if state['cursor'] is not None:
+            values.append(state['cursor'])
+        if not values:
+            return
+        try:
+            state['cursor'] = max(values)
+        except TypeError:
+            state['cursor'] = max(str(value) for value in values)
+    
+    def _admit(self, target: str, data: List[HarvestItem]) -> List[HarvestItem]:
+        """Admit validated items through the dedup index, counting accepted and duplicate items"""
+        admitted = self.dedup.admit(data)
+        metrics = self.metrics.target(target)
+        metrics.items_accepted += len(admitted)
+        metrics.items_duplicate += len(data) - len(admitted)
+        return admitted
+    
+    def _accept(self, target: str, data: List[HarvestItem]) -> List[HarvestItem]:
+        """Admit validated items through the dedup index and into the sink"""
+        accepted = self._admit(target, data)
+        if self.sink is not None:
+            self.sink.write(accepted)
+        return accepted
+    
+    async def _flush_stores(self):
+        """Persist dedup and sink state at the end of a harvest"""
+        self.dedup.flush()
+        self.concurrency.save()
+        if self.sink is not None:
+            await self.sink.aflush()
+    
+    async def _harvest_limited(self, target: str) -> List[Dict[str, Any]]:
+        """Harvest a target under the global concurrency cap"""
+        async with self.rate_limiter:
+            return await self._harvest_target(target)
+    
     def _get_harvest_targets(self) -> List[str]:
         """Get harvesting targets based on API configuration"""
         targets = []
@@ -127,111 +381,440 @@ class BaseHarvester:
         
         return targets
     
-    async def _harvest_target(self, target: str) -> List[Dict[str, Any]]:
-        """Harvest data from specific target"""
+    async def _harvest_target(self, target: str) -> List[HarvestItem]:
+        """Harvest data from specific target, following its pages if paginated"""
         try:
-            headers = self._build_headers()
+            request_url = self._apply_watermark(target)
+            self._target_state[target] = {'cursor': None}
             
-            async with self.session.get(target, headers=headers) as response:
-                if response.status == 200:
-                    content_type = response.headers.get('Content-Type', '').lower()
-                    
-                    if 'json' in content_type:
-                        data = await response.json()
-                        return self._process_json_data(data, target)
-                    else:
-                        text = await response.text()
-                        return self._process_text_data(text, target)
-                else:
-                    logger.warning(f"HTTP {response.status} for {target}")
-                    return []
+            if self.pagination is None:
+                page = await self._fetch_page(target, request_url)
+                items, completed = (page.items, True) if page else ([], False)
+            else:
+                items, completed = await self.pagination.walk(
+                    lambda url, on_next: self._fetch_page(target, url, on_next), request_url
+                )
+            
+            # Failed targets stay pending so a resumed sweep retries them
+            if not completed:
+                self._target_state.pop(target, None)
+            return items
                     
         except Exception as e:
+            self._target_state.pop(target, None)
             logger.error(f"Target error: {e}")
             return []
     
+    async def _fetch_page(self, target: str, request_url: str, on_next=None) -> Optional[Page]:
+        """Fetch one page of a target, joining an identical fetch already in flight
+        
+        Returns None if the page could not be fetched.
+        """
+        headers = self._build_headers()
+        # Every header can change the response, not only credentials
+        scope = '\n'.join(f"{name.lower()}: {value}" for name, value in sorted(headers.items()))
+        (page, cursor), shared = await self.flights.run(
+            flight_key(request_url, scope, self._parse_profile),
+            lambda: self._fetch_shared(target, request_url, headers, on_next)
+        )
+        if not shared:
+            return page
+        
+        self.metrics.target(target).coalesced += 1
+        if page is None:
+            return None
+        if cursor is not None:
+            self._record_cursor(target, [cursor])
+        return self._adopt_page(page, target)
+    
+    async def _fetch_shared(self, target: str, request_url: str, headers: Dict[str, str],
+                            on_next=None) -> Tuple[Optional[Page], Any]:
+        """Fetch a page for every caller of a flight
+        
+        Returns the page and the target's incremental cursor after it.
+        """
+        page = await self._fetch_uncoalesced(target, request_url, headers, on_next)
+        state = self._target_state.get(target)
+        return page, state['cursor'] if state else None
+    
+    def _adopt_page(self, page: Page, target: str) -> Page:
+        """A page fetched by another harvester, relabelled as this one's"""
+        if all(item.category == self.category and item.source == target for item in page.items):
+            return page
+        return Page([
+            HarvestItem(
+                content=item.content,
+                title=item.title,
+                url=item.url,
+                category=self.category,
+                source=target,
+                harvested_ns=item.harvested_ns,
+                quality_score=item.quality_score
+            )
+            for item in page.items
+        ], page.next_url)
+    
+    async def _fetch_uncoalesced(self, target: str, request_url: str, headers: Dict[str, str],
+                                 on_next=None) -> Optional[Page]:
+        """Fetch one page of a target through the cache, breaker and retry policy"""
+        cache_key = self.cache.make_key(request_url, headers, self._auth_headers())
+        cached = self.cache.lookup(cache_key)
+        if cached:
+            ttl = self.cache.ttl_for(self.category, self.api_config.get('cache_ttl'))
+            if cached.is_fresh(ttl):
+                self.metrics.target(target).cache_hits += 1
+                items = self._drop_duplicates(HarvestItem.from_row(row) for row in self.cache.replay(cached))
+                return Page(items, cached.next_page)
+            headers.update(cached.conditional_headers())
+        
+        breaker = self.breakers.for_url(request_url)
+        self._hosts.add(self.host_limiter.host_of(request_url))
+        delay = self.retry_policy.base_delay
+        request_bytes = len(request_url) + sum(len(k) + len(v) + 4 for k, v in headers.items())
+        
+        for attempt in range(self.retry_policy.max_attempts):
+            if not breaker.allow():
+                logger.warning(f"Circuit open, skipping {request_url}")
+                break
+            
+            # Cancellation or an unexpected error must not keep a half-open probe slot
+            recorded = False
+            retry_after = None
+            try:
+                await self.host_limiter.acquire(request_url)
+                started = None
+                try:
+                    async with self.concurrency.slot(request_url, self.connection_budget) as slot:
+                        # Latency covers the request itself, not the wait for a slot
+                        started = time.perf_counter()
+                        async with self.session.get(request_url, headers=headers) as response:
+                            slot.status = response.status
+                            self.metrics.record_request(
+                                target, time.perf_counter() - started, request_bytes,
+                                failed=response.status >= 400
+                            )
+                            recorded = True
+                            if response.status in RETRY_STATUSES:
+                                breaker.record_failure()
+                                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                                logger.warning(f"HTTP {response.status} for {request_url} (attempt {attempt + 1})")
+                            else:
+                                breaker.record_success()
+                                return await self._handle_response(
+                                    response, target, request_url, cache_key, cached, on_next, slot
+                                )
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    if not recorded:
+                        latency = time.perf_counter() - started if started is not None else 0.0
+                        self.metrics.record_request(target, latency, request_bytes, failed=True)
+                        recorded = True
+                    breaker.record_failure()
+                    logger.warning(f"Request error for {request_url} (attempt {attempt + 1}): {e!r}")
+            finally:
+                if not recorded:
+                    breaker.release()
+            
+            if attempt + 1 < self.retry_policy.max_attempts:
+                delay = self.retry_policy.next_delay(delay, retry_after)
+                if delay is None:
+                    logger.warning(f"Giving up on {request_url}: server asked to retry after {retry_after:.0f}s")
+                    break
+                self.retry_count += 1
+                await asyncio.sleep(delay)
+        
+        return None
+    
+    async def _handle_response(self, response, target: str, request_url: str, cache_key: str,
+                               cached, on_next=None, slot=None) -> Optional[Page]:
+        """Turn a final (non-retryable) response into a page of items
+        
+        ``slot`` is the host's concurrency slot; it is released as soon as
+        the body has been read, before the page is parsed or stored.
+        """
+        metrics = self.metrics.target(target)
+        if response.status == 304 and cached:
+            await self._release(slot)
+            metrics.cache_hits += 1
+            items = self._drop_duplicates(HarvestItem.from_row(row) for row in self.cache.refresh(cached))
+            return Page(items, cached.next_page)
+        elif response.status == 200:
+            metrics.cache_misses += 1
+            content_type = response.headers.get('Content-Type', '').lower()
+            
+            next_url = None
+            if self.pagination is not None:
+                next_url = self.pagination.next_from_headers(request_url, response.headers)
+                if next_url and on_next:
+                    on_next(next_url)
+            
+            offload_bytes = self.api_config.get('parse_offload_bytes')
+            offload = offload_bytes is not None and (response.content_length or 0) >= offload_bytes
+            
+            if 'json' in content_type:
+                if offload:
+                    items, envelope, count = await self._offload_json_items(response, target, slot)
+                else:
+                    items, envelope, count = await self._stream_json_items(response, target, slot)
+                if self.pagination is not None and next_url is None:
+                    next_url = self.pagination.next_from_body(request_url, envelope, count)
+            elif 'html' in content_type:
+                if offload:
+                    body = await response.read()
+                    await self._release(slot)
+                    metrics.bytes_in += len(body)
+                    parse_started = time.perf_counter()
+                    page = await self.offload.run(extract_html_payload, body, response.charset)
+                    metrics.parse_seconds += time.perf_counter() - parse_started
+                else:
+                    page = await self._stream_html_page(response, target, slot)
+                items = self._process_html_data(page, target)
+            elif offload:
+                body = await response.read()
+                await self._release(slot)
+                metrics.bytes_in += len(body)
+                parse_started = time.perf_counter()
+                content, length = await self.offload.run(decode_text_payload, body, response.charset)
+                items = self._process_text_data(content, target, length)
+                metrics.parse_seconds += time.perf_counter() - parse_started
+            else:
+                text = await response.text()
+                await self._release(slot)
+                metrics.bytes_in += response.content_length or len(text)
+                parse_started = time.perf_counter()
+                items = self._process_text_data(text, target)
+                metrics.parse_seconds += time.perf_counter() - parse_started
+            
+            self.cache.store(
+                cache_key,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified'),
+                [item.to_row() for item in items],
+                next_url
+            )
+            return Page(items, next_url)
+        else:
+            logger.warning(f"HTTP {response.status} for {request_url}")
+            return None
+    
+    @staticmethod
+    async def _release(slot, local_seconds: float = 0.0):
+        """Release a concurrency slot once the response body is in hand"""
+        if slot is not None:
+            await slot.release(local_seconds)
+    
+    async def _stream_json_items(self, response, source: str,
+                                 slot=None) -> Tuple[List[HarvestItem], Dict[str, Any], int]:
+        """Parse a JSON response incrementally, processing each item as it completes
+        
+        Returns the items, the document envelope and the raw item count.
+        """
+        items = []
+        harvested_ns = time.time_ns()
+        parser = JsonItemStream(tuple(key.encode() for key in self.item_keys))
+        chunk_size = self.api_config.get('stream_chunk_size', 64 * 1024)
+        metrics = self.metrics.target(source)
+        
+        parse_seconds = 0.0
+        async for chunk in response.content.iter_chunked(chunk_size):
+            metrics.bytes_in += len(chunk)
+            parse_started = time.perf_counter()
+            batch = parser.feed(chunk)
+            if batch:
+                items.extend(self._process_json_batch(batch, source, harvested_ns))
+            parse_seconds += time.perf_counter() - parse_started
+        metrics.parse_seconds += parse_seconds
+        await self._release(slot, parse_seconds)
+        
+        parse_started = time.perf_counter()
+        items.extend(self._process_json_batch(parser.close(), source, harvested_ns))
+        metrics.parse_seconds += time.perf_counter() - parse_started
+        return items, parser.envelope(), parser.items_seen
+    
+    async def _stream_html_page(self, response, source: str, slot=None) -> ExtractedText:
+        """Extract main-content text from an HTML response as it arrives"""
+        extractor = HtmlTextExtractor(response.charset)
+        chunk_size = self.api_config.get('stream_chunk_size', 64 * 1024)
+        metrics = self.metrics.target(source)
+        
+        parse_seconds = 0.0
+        async for chunk in response.content.iter_chunked(chunk_size):
+            metrics.bytes_in += len(chunk)
+            parse_started = time.perf_counter()
+            extractor.feed_bytes(chunk)
+            parse_seconds += time.perf_counter() - parse_started
+        metrics.parse_seconds += parse_seconds
+        await self._release(slot, parse_seconds)
+        
+        parse_started = time.perf_counter()
+        page = extractor.finish()
+        metrics.parse_seconds += time.perf_counter() - parse_started
+        return page
+    
+    async def _offload_json_items(self, response, source: str,
+                                  slot=None) -> Tuple[List[HarvestItem], Dict[str, Any], int]:
+        """Parse and score a large JSON response in the process pool
+        
+        Only dedup checks and item construction stay on the event loop.
+        """
+        body = await response.read()
+        await self._release(slot)
+        metrics = self.metrics.target(source)
+        metrics.bytes_in += len(body)
+        parse_started = time.perf_counter()
+        
+        incremental = self.api_config.get('incremental')
+        parsed = await self.offload.run(
+            parse_json_payload, body, source, self.scorer.table, incremental['field'] if incremental else None,
+            self.item_keys, self.api_config.get('fields')
+        )
+        self._record_cursor(source, parsed.cursor_values)
+        
+        harvested_ns = time.time_ns()
+        items = self._drop_duplicates(
+            HarvestItem(
+                content=content,
+                title=title,
+                url=url,
+                category=self.category,
+                source=source,
+                harvested_ns=harvested_ns,
+                quality_score=score
+            )
+            for content, title, url, score in parsed.records
+        )
+        metrics.parse_seconds += time.perf_counter() - parse_started
+        return items, parsed.envelope, parsed.raw_count
+    
     def _build_headers(self) -> Dict[str, str]:
         """Build request headers with authentication"""
         headers = {'Accept': 'application/json'}
         
         auth = self.api_config.get('auth', {})
         if auth.get('api_key'):
-            headers['X-API-Key'] = auth['api_key']
+            headers[auth.get('header', 'X-API-Key')] = auth['api_key']
         elif auth.get('token'):
-            headers['Authorization'] = f"Bearer {auth['token']}"
+            headers[auth.get('header', 'Authorization')] = f"Bearer {auth['token']}"
         
         return headers
     
-    def _process_json_data(self, data: Any, source: str) -> List[Dict[str, Any]]:
+    def _auth_headers(self) -> Tuple[str, ...]:
+        """Header names that scope cached responses to a credential"""
+        header = self.api_config.get('auth', {}).get('header')
+        return AUTH_HEADERS + (header,) if header and header not in AUTH_HEADERS else AUTH_HEADERS
+    
+    def _process_json_data(self, data: Any, source: str) -> List[HarvestItem]:
         """Process JSON response data"""
         items = []
+        harvested_ns = time.time_ns()
         
         try:
             # Handle different JSON structures
             if isinstance(data, dict):
-                data_list = data.get('results', data.get('items', data.get('data', [data])))
+                key = next((key for key in self.item_keys if key in data), None)
+                data_list = data[key] if key is not None else [data]
             else:
                 data_list = data if isinstance(data, list) else [data]
             
-            for item in data_list:
-                processed_item = {
-                    'content': str(item.get('content', item.get('description', ''))),
-                    'title': str(item.get('title', item.get('name', 'Untitled'))),
-                    'url': str(item.get('url', item.get('link', source))),
-                    'category': self.category,
-                    'source': source,
-                    'harvested_at': datetime.now().isoformat(),
-                    'quality_score': self._calculate_quality_score(item)
-                }
-                
-                if processed_item['content']:
-                    items.append(processed_item)
+            items = self._process_json_batch(data_list, source, harvested_ns)
                     
         except Exception as e:
             logger.error(f"JSON processing error: {e}")
         
         return items
     
-    def _process_text_data(self, text: str, source: str) -> List[Dict[str, Any]]:
-        """Process text response data"""
-        if len(text) < 50:
-            return []
+    def _process_json_batch(self, batch: List[Any], source: str, harvested_ns: int) -> List[HarvestItem]:
+        """Process a batch of raw JSON items, scoring them in one vectorized pass
         
-        return [{
-            'content': text[:1000],  # Limit content length
-            'title': f'Content from {source}',
-            'url': source,
-            'category': self.category,
-            'source': source,
-            'harvested_at': datetime.now().isoformat(),
-            'quality_score': min(0.8, len(text) / 1000)
-        }]
-    
-    def _calculate_quality_score(self, item: Dict) -> float:
-        """Calculate quality score for harvested item"""
-        score = 0.5
+        Items already in the dedup index are dropped before scoring.
+        """
+        self._observe_cursor(source, batch)
+        fields = self.api_config.get('fields')
+        if fields:
+            batch = [map_fields(item, fields) if isinstance(item, dict) else item for item in batch]
+        candidates = []
+        for item in batch:
+            if not isinstance(item, dict):
+                continue
+            content = str(item.get('content', item.get('description', '')))
+            if not content:
+                continue
+            url = str(item.get('url', item.get('link', source)))
+            if self.dedup.contains(content, url, source):
+                self.metrics.target(source).items_duplicate += 1
+                continue
+            candidates.append((item, content, url))
+        
+        scores = self.scorer.score([item for item, _, _ in candidates])
+        items = []
+        
+        for (item, content, url), score in zip(candidates, scores.tolist()):
+            items.append(HarvestItem(
+                content=content,
+                title=str(item.get('title', item.get('name', 'Untitled'))),
+                url=url,
+                category=self.category,
+                source=source,
+                harvested_ns=harvested_ns,
+                quality_score=score
+            ))
         
-        content = str(item.get('content', ''))
-        if len(content) > 100:
-            score += 0.2
-        if len(content) > 500:
-            score += 0.1
+        return items
+    
+    def _process_text_data(self, text: str, source: str, length: Optional[int] = None) -> List[HarvestItem]:
+        """Process text response data
         
-        if item.get('title') and len(str(item['title'])) > 10:
-            score += 0.1
+        ``length`` is the full text length when ``text`` is already truncated.
+        """
+        length = len(text) if length is None else length
+        if length < 50:
+            return []
         
-        if item.get('author') or item.get('published_date'):
-            score += 0.1
+        return self._drop_duplicates([HarvestItem(
+            content=text[:1000],  # Limit content length
+            title=f'Content from {source}',
+            url=source,
+            category=self.category,
+            source=source,
+            harvested_ns=time.time_ns(),
+            quality_score=min(0.8, length / 1000)
+        )])
+    
+    def _process_html_data(self, page: ExtractedText, source: str) -> List[HarvestItem]:
+        """Process the extracted main content of an HTML page"""
+        if page.length < 50:
+            return []
         
-        return min(1.0, score)
+        return self._drop_duplicates([HarvestItem(
+            content=page.text[:1000],  # Limit content length
+            title=page.title or f'Content from {source}',
+            url=urljoin(source, page.canonical_url) if page.canonical_url else source,
+            category=self.category,
+            source=source,
+            harvested_ns=time.time_ns(),
+            quality_score=self._calculate_quality_score(page.to_raw_item())
+        )])
+    
+    def _drop_duplicates(self, items) -> List[HarvestItem]:
+        """Drop processed items already in the dedup index"""
+        kept = []
+        for item in items:
+            if self.dedup.contains(item.content, item.url, item.source):
+                self.metrics.target(item.source).items_duplicate += 1
+            else:
+                kept.append(item)
+        return kept
+    
+    def _calculate_quality_score(self, item: Dict) -> float:
+        """Calculate quality score for harvested item"""
+        return float(self.scorer.score([item])[0])
     
     def _validate_data(self, data: List[Dict]) -> bool:
         """Validate harvested data quality"""
         if not data:
             return False
         
-        quality_items = [d for d in data if d.get('quality_score', 0) >= self.quality_threshold]
-        return len(quality_items) >= len(data) * 0.5  # At least 50% quality items
+        scores = self.scorer.scores_of(data)
+        return self.scorer.accepts(scores, self.quality_threshold)  # At least 50% quality items
     
     def get_status(self) -> Dict[str, Any]:
         """Get harvester status"""
@@ -242,12 +825,31 @@ class BaseHarvester:
             'quality_threshold': self.quality_threshold,
             'swarm_enhanced': True,
             'api_endpoints': len(self.api_config.get('base_urls', [])),
-            'last_harvest': datetime.now().isoformat()
+            'cache': self.cache.get_status(),
+            'dedup': self.dedup.get_status(),
+            'sink': self.sink.get_status() if self.sink is not None else None,
+            'circuit_breakers': self.breakers.get_status(self._hosts),
+            'concurrency': self.concurrency.get_status(self._hosts),
+            'retries': self.retry_count,
+            'metrics': self.metrics.get_status(),
+            'event_loop': self.loop_lag.get_status(),
+            'parse_offload': self.offload.get_status(),
+            'single_flight': self.flights.get_status(),
+            'last_harvest': self.last_harvest
         }
 
 
-# Module instance
-base_harvester_instance = BaseHarvester()
+# Module instance, created on first access so importing has no side effects
+_instance = None
+
+
+def __getattr__(name):
+    global _instance
+    if name == 'base_harvester_instance':
+        if _instance is None:
+            _instance = BaseHarvester()
+        return _instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def main():
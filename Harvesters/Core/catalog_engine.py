@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - CATALOG ENGINE
+Declarative source catalogs driving one shared harvester engine
+
+Each ``Harvesters/<Domain>/catalog.json`` describes that domain's sources as
+data: endpoints, auth, pagination, item keys, field mapping and rate limits.
+The engine builds a BaseHarvester configured for a source only when it is
+requested, and every source built by one engine shares a single per-host
+rate limiter. Only enabled sources of the requested domains are parsed and
+built, so start-up time and memory follow what is actually harvested rather
+than how many template modules exist.
+
+    {
+      "domain": "Cybersecurity",
+      "defaults": {"rate_limit": 1, "max_concurrency": 4},
+      "sources": [
+        {"name": "cve_database", "enabled": true, "priority": 10,
+         "base_urls": ["https://services.nvd.nist.gov"], "endpoints": ["/rest/json/cves/2.0"],
+         "auth": {"api_key_env": "NVD_API_KEY", "header": "apiKey"},
+         "pagination": {"scheme": "offset", "param": "startIndex", "page_size": 2000},
+         "item_keys": ["vulnerabilities"],
+         "fields": {"title": "cve.id", "content": "cve.descriptions.0.value"}}
+      ]
+    }
+
+Credentials are never stored in a catalog; ``api_key_env``/``token_env``
+name environment variables read when the source is built.
+
+    python catalog_engine.py --list [DOMAIN ...]     show sources
+    python catalog_engine.py --generate              add stubs for unlisted legacy modules
+    python catalog_engine.py --harvest Domain/name   run one source
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from base_harvester import BaseHarvester
+from module_registry import ModuleRegistry
+from rate_limiter import HostRateLimiter
+
+logger = logging.getLogger(__name__)
+
+HARVESTERS_ROOT = Path(__file__).resolve().parents[1]
+CATALOG_FILE = 'catalog.json'
+
+# Requests per second for hosts whose sources set no rate_limit
+DEFAULT_RATE_LIMIT = 10
+
+# Per-source keys that describe the source rather than its api_config
+SOURCE_KEYS = frozenset({'name', 'enabled', 'priority', 'category', 'module', 'description'})
+
+# api_config keys a catalog may set
+CONFIG_KEYS = frozenset({
+    'base_urls', 'endpoints', 'auth', 'rate_limit', 'max_concurrency', 'cache_ttl',
+    'stream_chunk_size', 'stream_queue_size', 'incremental', 'max_attempts', 'pagination',
+    'parse_offload_bytes', 'item_keys', 'fields'
+})
+
+AUTH_KEYS = frozenset({'api_key_env', 'token_env', 'header'})
+
+
+class CatalogError(ValueError):
+    """A catalog file that does not describe valid sources"""
+
+
+class SourceSpec:
+    """One catalog entry"""
+
+    __slots__ = ('domain', 'name', 'enabled', 'priority', 'category', 'module', 'description', 'config')
+
+    def __init__(self, domain: str, name: str, config: Dict[str, Any], enabled: bool = True,
+                 priority: int = 0, category: Optional[str] = None, module: Optional[str] = None,
+                 description: Optional[str] = None):
+        self.domain = domain
+        self.name = name
+        self.config = config
+        self.enabled = enabled
+        self.priority = priority
+        self.category = category or domain
+        # Legacy template module the entry replaces, if any
+        self.module = module
+        self.description = description
+
+    @property
+    def id(self) -> str:
+        return f"{self.domain}/{self.name}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'enabled': self.enabled,
+            'priority': self.priority,
+            'category': self.category,
+            'module': self.module,
+            'targets': len(self.config.get('base_urls', [])) * len(self.config.get('endpoints', [])),
+            'paginated': bool(self.config.get('pagination'))
+        }
+
+
+def load_catalog(path: Path) -> List[SourceSpec]:
+    """Parse and validate one domain catalog"""
+    path = Path(path)
+    try:
+        document = json.loads(path.read_text())
+    except json.JSONDecodeError as e:
+        raise CatalogError(f"{path}: {e}") from e
+
+    domain = document.get('domain', path.parent.name)
+    defaults = document.get('defaults', {})
+    unknown = set(defaults) - CONFIG_KEYS
+    if unknown:
+        raise CatalogError(f"{path}: unknown default keys {sorted(unknown)}")
+
+    specs = []
+    seen = set()
+    for entry in document.get('sources', []):
+        name = entry.get('name')
+        if not name:
+            raise CatalogError(f"{path}: source without a name")
+        if name in seen:
+            raise CatalogError(f"{path}: duplicate source {name}")
+        seen.add(name)
+        unknown = set(entry) - SOURCE_KEYS - CONFIG_KEYS
+        if unknown:
+            raise CatalogError(f"{path}: {name} has unknown keys {sorted(unknown)}")
+        auth = entry.get('auth', defaults.get('auth', {}))
+        if set(auth) - AUTH_KEYS:
+            raise CatalogError(f"{path}: {name} auth may only name environment variables {sorted(AUTH_KEYS)}")
+
+        config = {**defaults, **{key: value for key, value in entry.items() if key in CONFIG_KEYS}}
+        enabled = bool(entry.get('enabled', True))
+        if enabled and not (config.get('base_urls') and config.get('endpoints')):
+            raise CatalogError(f"{path}: enabled source {name} needs base_urls and endpoints")
+        specs.append(SourceSpec(
+            domain, name, config,
+            enabled=enabled,
+            priority=entry.get('priority', 0),
+            category=entry.get('category'),
+            module=entry.get('module'),
+            description=entry.get('description')
+        ))
+    return specs
+
+
+class CatalogEngine:
+    """Builds configured BaseHarvester instances from domain catalogs"""
+
+    def __init__(self, root: Optional[Path] = None, host_limiter: Optional[HostRateLimiter] = None):
+        self.root = Path(root) if root else HARVESTERS_ROOT
+        self._catalogs: Dict[str, List[SourceSpec]] = {}
+        # One limiter for every source, so sources sharing a host share its budget
+        self.host_limiter = host_limiter or HostRateLimiter(DEFAULT_RATE_LIMIT)
+        self.built = 0
+
+    def domains(self) -> List[str]:
+        """Domains that have a catalog; no catalog is parsed"""
+        return sorted(path.parent.name for path in self.root.glob(f'*/{CATALOG_FILE}'))
+
+    def catalog(self, domain: str) -> List[SourceSpec]:
+        """All sources of one domain, parsed on first use"""
+        specs = self._catalogs.get(domain)
+        if specs is None:
+            path = self.root / domain / CATALOG_FILE
+            specs = load_catalog(path) if path.exists() else []
+            self._catalogs[domain] = specs
+        return specs
+
+    def sources(self, domains: Optional[Iterable[str]] = None, enabled: bool = True) -> List[SourceSpec]:
+        """Sources of the given domains (all by default), highest priority first"""
+        specs = [
+            spec
+            for domain in (domains if domains is not None else self.domains())
+            for spec in self.catalog(domain)
+            if spec.enabled or not enabled
+        ]
+        return sorted(specs, key=lambda spec: -spec.priority)
+
+    def find(self, source_id: str) -> SourceSpec:
+        """Source by '<Domain>/<name>'"""
+        domain, _, name = source_id.partition('/')
+        for spec in self.catalog(domain):
+            if spec.name == name:
+                return spec
+        raise KeyError(f"No catalog source {source_id}")
+
+    def build(self, spec: SourceSpec) -> BaseHarvester:
+        """A BaseHarvester configured for one source"""
+        harvester = BaseHarvester()
+        harvester.name = spec.id
+        harvester.category = spec.category
+        harvester.api_config.update(json.loads(json.dumps(spec.config)))
+        harvester.api_config['auth'] = _resolve_auth(spec.config.get('auth', {}))
+        harvester._apply_config()
+
+        host_rate = spec.config.get('rate_limit')
+        if host_rate is not None:
+            for base_url in spec.config.get('base_urls', []):
+                self.host_limiter.limit_host(HostRateLimiter.host_of(base_url), host_rate)
+        harvester.host_limiter = self.host_limiter
+        self.built += 1
+        return harvester
+
+    def build_all(self, domains: Optional[Iterable[str]] = None) -> List[BaseHarvester]:
+        return [self.build(spec) for spec in self.sources(domains)]
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'root': str(self.root),
+            'catalogs_loaded': len(self._catalogs),
+            'sources_loaded': sum(len(specs) for specs in self._catalogs.values()),
+            'harvesters_built': self.built,
+            'host_rates': dict(self.host_limiter.rates)
+        }
+
+
+def _resolve_auth(auth: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a catalog auth block into BaseHarvester auth, reading credentials from the environment"""
+    resolved = {}
+    if auth.get('header'):
+        resolved['header'] = auth['header']
+    for variable, key in (('api_key_env', 'api_key'), ('token_env', 'token')):
+        if auth.get(variable):
+            value = os.environ.get(auth[variable])
+            if value:
+                resolved[key] = value
+            else:
+                logger.info(f"{auth[variable]} is not set; requesting without {key}")
+    return resolved
+
+
+def generate_catalogs(root: Path = HARVESTERS_ROOT, registry: Optional[ModuleRegistry] = None) -> Dict[str, int]:
+    """Add disabled stub entries for legacy harvester modules missing from their domain catalog
+
+    Existing entries are left untouched, so hand-written sources survive.
+    Returns the number of stubs added per domain.
+    """
+    registry = registry or ModuleRegistry()
+    modules: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in registry.harvesters():
+        if entry['domain'] and entry['domain'] not in ('Core', 'configs'):
+            modules.setdefault(entry['domain'], []).append(entry)
+
+    added = {}
+    for domain, entries in sorted(modules.items()):
+        path = root / domain / CATALOG_FILE
+        document = json.loads(path.read_text()) if path.exists() else {'domain': domain, 'defaults': {}, 'sources': []}
+        listed = {source.get('module') for source in document['sources']}
+        names = {source['name'] for source in document['sources']}
+        count = 0
+        for entry in sorted(entries, key=lambda e: e['id']):
+            if entry['id'] in listed:
+                continue
+            name = entry['id'].rsplit('/', 1)[1]
+            name = name[:-len('_harvester')] if name.endswith('_harvester') else name
+            while name in names:
+                name += '_legacy'
+            names.add(name)
+            document['sources'].append({'name': name, 'enabled': False, 'module': entry['id']})
+            count += 1
+        if count:
+            path.write_text(json.dumps(document, indent=2) + '\n')
+            added[domain] = count
+    return added
+
+
+async def _harvest(engine: CatalogEngine, source_id: str, max_items: int) -> int:
+    async with engine.build(engine.find(source_id)) as harvester:
+        results = await harvester.harvest(max_items=max_items)
+        for item in results[:5]:
+            print(f"- {item['title']} ({item['quality_score']:.2f}) {item['url']}")
+        print(json.dumps(harvester.metrics.get_status()['totals'], indent=2))
+        return len(results)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--list', nargs='*', metavar='DOMAIN', help='list sources of these domains (all if none)')
+    parser.add_argument('--all', action='store_true', help='include disabled sources when listing')
+    parser.add_argument('--generate', action='store_true', help='add stub entries for unlisted legacy modules')
+    parser.add_argument('--harvest', metavar='DOMAIN/NAME', help='run one source')
+    parser.add_argument('--max-items', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    engine = CatalogEngine()
+    if args.generate:
+        added = generate_catalogs(engine.root)
+        print(f"Added {sum(added.values())} stub entries across {len(added)} catalogs")
+    if args.list is not None:
+        for spec in engine.sources(args.list or None, enabled=not args.all):
+            print(json.dumps(spec.to_dict()))
+    if args.harvest:
+        count = asyncio.run(_harvest(engine, args.harvest, args.max_items))
+        print(f"Harvested {count} items")
+    if not (args.generate or args.list is not None or args.harvest):
+        print(json.dumps({
+            'domains': len(engine.domains()),
+            'enabled_sources': len(engine.sources()),
+            **engine.get_status()
+        }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
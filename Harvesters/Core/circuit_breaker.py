@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - CIRCUIT BREAKER
+Per-host circuit breakers and jittered retry policy for harvester fetches
+
+Breakers are shared by every harvester in the process, so once one harvester
+has found a host dead the others skip it instead of each waiting out their
+own timeouts. Retries use decorrelated jitter and honour Retry-After.
+"""
+
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Responses worth retrying; anything else is final
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one host"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.probe_started = 0.0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now
+
+        Callers that are allowed must end with record_success(),
+        record_failure() or, when the request ended without a verdict
+        (cancelled, unexpected error), release().
+        """
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == HALF_OPEN:
+            # A probe older than reset_timeout was lost by its caller
+            if self.probe_in_flight and now - self.probe_started < self.reset_timeout:
+                return False
+            self.probe_in_flight = True
+            self.probe_started = now
+        return True
+
+    def release(self):
+        """Give back a half-open probe slot without recording an outcome"""
+        self.probe_in_flight = False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {'state': self.state, 'failures': self.failures, 'times_opened': self.times_opened}
+
+
+class BreakerRegistry:
+    """Process-wide map of host to circuit breaker"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc.lower()
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self.breakers[host] = breaker
+        return breaker
+
+    def get_status(self, hosts: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        hosts = self.breakers if hosts is None else hosts
+        return {host: self.breakers[host].get_status() for host in hosts if host in self.breakers}
+
+
+class RetryPolicy:
+    """Bounded retries with decorrelated jitter"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def next_delay(self, previous: float, retry_after: Optional[float] = None) -> Optional[float]:
+        """Decorrelated jitter, but never sooner than the server asked for
+
+        Returns None when the server's Retry-After is longer than
+        ``max_delay``: the caller should give up rather than retry early.
+        """
+        if retry_after is not None and retry_after > self.max_delay:
+            return None
+        delay = min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Process-wide breakers
+shared_breakers = BreakerRegistry()
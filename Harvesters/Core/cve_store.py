@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - CVE STORE
+Local indexed CVE database built from NVD bulk JSON feeds
+
+Yearly and "modified" NVD feeds (JSON 2.0, or the older 1.1 layout) are
+gunzipped and parsed as they download, one CVE at a time, into a SQLite
+store. Each CVE's affected CPE matches are kept with sortable version keys,
+so "which CVEs affect vendor/product at version X" is one indexed query
+instead of an API round trip. Feed checksums from the .meta files are
+remembered, and an update only re-reads feeds that changed; the modified
+feed (the last eight days of changes) keeps a synced store current.
+
+    python cve_store.py --sync 2023 2024     ingest yearly feeds
+    python cve_store.py --update             apply the modified and recent feeds
+    python cve_store.py --feed nvdcve.json.gz   ingest a local feed file
+    python cve_store.py --affected apache http_server 2.4.49
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from harvest_paths import harvest_data_dir
+from json_stream import JsonItemStream
+from session_pool import shared_session_pool
+
+logger = logging.getLogger(__name__)
+
+NVD_FEED_URL = 'https://nvd.nist.gov/feeds/json/cve/2.0/nvdcve-2.0-{name}.json.gz'
+
+# Item arrays of the 2.0 and 1.1 feed layouts
+FEED_ITEM_KEYS = (b'vulnerabilities', b'CVE_Items')
+
+_VERSION_TOKEN = re.compile(r'\d+|[A-Za-z]+')
+
+# Tags that mark a version before its release
+PRE_RELEASE_TAGS = frozenset({'alpha', 'beta', 'rc', 'pre', 'dev', 'preview'})
+
+# Bumped when version_key() changes; stored keys of an older scheme are stale
+KEY_VERSION = 3
+
+# Key of the CPE "not applicable" version ('-'), equal to no real version's key
+NOT_APPLICABLE = '-'
+
+_CPE_SPLIT = re.compile(r'(?<!\\):')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cves (
+    id TEXT PRIMARY KEY, published TEXT, modified TEXT, cvss REAL, severity TEXT,
+    vector TEXT, description TEXT, refs TEXT);
+CREATE INDEX IF NOT EXISTS cves_published ON cves(published);
+CREATE INDEX IF NOT EXISTS cves_cvss ON cves(cvss);
+CREATE TABLE IF NOT EXISTS cpe_matches (
+    cve_id TEXT, vendor TEXT, product TEXT, version TEXT, version_key TEXT,
+    start_incl TEXT, start_excl TEXT, end_incl TEXT, end_excl TEXT, vulnerable INTEGER, cpe TEXT);
+CREATE INDEX IF NOT EXISTS cpe_product ON cpe_matches(product, vendor);
+CREATE INDEX IF NOT EXISTS cpe_cve ON cpe_matches(cve_id);
+CREATE TABLE IF NOT EXISTS feeds (
+    name TEXT PRIMARY KEY, sha256 TEXT, last_modified TEXT, records INTEGER, ingested_at REAL);
+"""
+
+
+def version_key(version: Optional[str]) -> Optional[str]:
+    """Sortable form of a version string, or None for any-version wildcards
+
+    Numeric parts compare numerically at any length, and zero parts ending a
+    run of numbers are ignored (1.0 == 1.0.0). Known pre-release tags sort
+    before the release and any other letters (OpenSSL's 1.0.2k, p1, post1)
+    after it: 1.0rc1 < 1.0 < 1.0a < 1.0.1 and 1.0.2 < 1.0.2k < 1.0.2u < 1.0.3.
+    'a' and 'b' count as alpha/beta only when a number follows (1.0b2).
+    The CPE "not applicable" value '-' maps to NOT_APPLICABLE and matches nothing.
+    """
+    if version is None or version in ('*', ''):
+        return None
+    if version == '-':
+        return NOT_APPLICABLE
+    tokens = _VERSION_TOKEN.findall(version)
+    parts: List[str] = []
+    numbers: List[str] = []
+
+    def end_numbers():
+        while len(numbers) > 1 and not numbers[-1]:
+            numbers.pop()
+        # Length-prefixed, so 10 > 9 and 13-digit numbers still sort
+        parts.extend(f'p{len(digits):02d}{digits}' for digits in numbers)
+        numbers.clear()
+
+    for position, token in enumerate(tokens):
+        if token.isdigit():
+            numbers.append(token.lstrip('0'))
+            continue
+        end_numbers()
+        token = token.lower()
+        numbered = position + 1 < len(tokens) and tokens[position + 1].isdigit()
+        if token in PRE_RELEASE_TAGS or (token in ('a', 'b') and numbered):
+            parts.append('a' + token)
+        else:
+            parts.append('o' + token)
+    end_numbers()
+    # 'a' (pre-release) < 'm' (end) < 'o' (letter/post release) < 'p' (further numeric parts)
+    parts.append('m')
+    return '.'.join(parts)
+
+
+def parse_cpe(cpe: str) -> Tuple[str, str, str]:
+    """(vendor, product, version) of a CPE 2.3 formatted string"""
+    fields = _CPE_SPLIT.split(cpe)
+    if len(fields) < 6:
+        return '', '', '*'
+    unescape = lambda value: value.replace('\\', '')
+    return unescape(fields[3]).lower(), unescape(fields[4]).lower(), unescape(fields[5])
+
+
+class CveRecord:
+    """One CVE as stored: summary fields plus its CPE match rows"""
+
+    __slots__ = ('id', 'published', 'modified', 'cvss', 'severity', 'vector', 'description',
+                 'references', 'matches', 'rejected')
+
+    def __init__(self, cve_id: str):
+        self.id = cve_id
+        self.published: Optional[str] = None
+        self.modified: Optional[str] = None
+        self.cvss: Optional[float] = None
+        self.severity: Optional[str] = None
+        self.vector: Optional[str] = None
+        self.description: Optional[str] = None
+        self.references: List[str] = []
+        # (cpe, vulnerable, start_incl, start_excl, end_incl, end_excl)
+        self.matches: List[Tuple[str, bool, Optional[str], Optional[str], Optional[str], Optional[str]]] = []
+        self.rejected = False
+
+
+def _english(entries: Iterable[Dict[str, Any]]) -> Optional[str]:
+    entries = list(entries or [])
+    for entry in entries:
+        if entry.get('lang') == 'en':
+            return entry.get('value')
+    return entries[0].get('value') if entries else None
+
+
+def _from_v2(item: Dict[str, Any]) -> Optional[CveRecord]:
+    cve = item.get('cve', {})
+    if not cve.get('id'):
+        return None
+    record = CveRecord(cve['id'])
+    record.published = cve.get('published')
+    record.modified = cve.get('lastModified')
+    record.rejected = cve.get('vulnStatus') == 'Rejected'
+    record.description = _english(cve.get('descriptions'))
+    record.references = [ref['url'] for ref in cve.get('references', []) if ref.get('url')]
+    metrics = cve.get('metrics', {})
+    for key in ('cvssMetricV40', 'cvssMetricV31', 'cvssMetricV30', 'cvssMetricV2'):
+        if metrics.get(key):
+            metric = next((m for m in metrics[key] if m.get('type') == 'Primary'), metrics[key][0])
+            data = metric.get('cvssData', {})
+            record.cvss = data.get('baseScore')
+            record.severity = data.get('baseSeverity') or metric.get('baseSeverity')
+            record.vector = data.get('vectorString')
+            break
+    for configuration in cve.get('configurations', []):
+        for node in configuration.get('nodes', []):
+            for match in node.get('cpeMatch', []):
+                record.matches.append((
+                    match.get('criteria', ''), bool(match.get('vulnerable', True)),
+                    match.get('versionStartIncluding'), match.get('versionStartExcluding'),
+                    match.get('versionEndIncluding'), match.get('versionEndExcluding')
+                ))
+    return record
+
+
+def _nodes_v1(nodes: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for node in nodes:
+        yield from node.get('cpe_match', [])
+        yield from _nodes_v1(node.get('children', []))
+
+
+def _from_v1(item: Dict[str, Any]) -> Optional[CveRecord]:
+    cve = item.get('cve', {})
+    cve_id = cve.get('CVE_data_meta', {}).get('ID')
+    if not cve_id:
+        return None
+    record = CveRecord(cve_id)
+    record.published = item.get('publishedDate')
+    record.modified = item.get('lastModifiedDate')
+    record.description = _english(cve.get('description', {}).get('description_data'))
+    record.rejected = (record.description or '').startswith('** REJECT **')
+    record.references = [ref['url'] for ref in cve.get('references', {}).get('reference_data', []) if ref.get('url')]
+    impact = item.get('impact', {})
+    if 'baseMetricV3' in impact:
+        data = impact['baseMetricV3'].get('cvssV3', {})
+        record.cvss, record.severity, record.vector = data.get('baseScore'), data.get('baseSeverity'), data.get('vectorString')
+    elif 'baseMetricV2' in impact:
+        data = impact['baseMetricV2'].get('cvssV2', {})
+        record.cvss, record.vector = data.get('baseScore'), data.get('vectorString')
+        record.severity = impact['baseMetricV2'].get('severity')
+    for match in _nodes_v1(item.get('configurations', {}).get('nodes', [])):
+        record.matches.append((
+            match.get('cpe23Uri', ''), bool(match.get('vulnerable', True)),
+            match.get('versionStartIncluding'), match.get('versionStartExcluding'),
+            match.get('versionEndIncluding'), match.get('versionEndExcluding')
+        ))
+    return record
+
+
+def parse_feed_item(item: Dict[str, Any]) -> Optional[CveRecord]:
+    """CveRecord from an item of either feed layout"""
+    if isinstance(item.get('cve'), dict) and 'id' in item['cve']:
+        return _from_v2(item)
+    return _from_v1(item)
+
+
+class FeedReader:
+    """Push decoder: gzip (or plain) JSON feed chunks in, CveRecords out"""
+
+    def __init__(self, compressed: bool = True):
+        self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if compressed else None
+        self._items = JsonItemStream(FEED_ITEM_KEYS)
+        self.sha256 = hashlib.sha256()
+
+    def feed(self, chunk: bytes) -> List[CveRecord]:
+        data = self._inflate.decompress(chunk) if self._inflate else chunk
+        return self._records(data)
+
+    def close(self) -> List[CveRecord]:
+        data = self._inflate.flush() if self._inflate else b''
+        records = self._records(data)
+        records.extend(filter(None, (parse_feed_item(item) for item in self._items.close())))
+        return records
+
+    def _records(self, data: bytes) -> List[CveRecord]:
+        if not data:
+            return []
+        self.sha256.update(data)
+        return [record for record in map(parse_feed_item, self._items.feed(data)) if record is not None]
+
+
+class CveStore:
+    """SQLite CVE store with CVE id, CPE product/version, CVSS and date indexes"""
+
+    def __init__(self, path: Optional[Path] = None, feed_url: str = NVD_FEED_URL, batch_size: int = 1000):
+        self.path = Path(path) if path else None
+        self.feed_url = feed_url
+        self.batch_size = batch_size
+        self._db = None
+        self.upserts = 0
+        self.lookups = 0
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path is None:
+                self.path = harvest_data_dir('cve') / 'cves.sqlite'
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SCHEMA)
+            self._check_key_version()
+        return self._db
+
+    def _check_key_version(self):
+        if self._db.execute("PRAGMA user_version").fetchone()[0] == KEY_VERSION:
+            return
+        if self._db.execute("SELECT 1 FROM cves LIMIT 1").fetchone():
+            # Range bounds are stored only as keys, so the feeds have to be read again
+            logger.warning(f"CVE store {self.path} uses an older version ordering; cleared for a resync")
+            with self._db:
+                self._db.execute("DELETE FROM cpe_matches")
+                self._db.execute("DELETE FROM cves")
+                self._db.execute("DELETE FROM feeds")
+        self._db.execute(f"PRAGMA user_version = {KEY_VERSION}")
+
+    # Ingest
+
+    def upsert(self, records: Iterable[CveRecord]) -> int:
+        """Insert or update CVEs and their CPE matches; rejected CVEs are removed
+
+        A record older than the stored one (by lastModified) is ignored, so
+        feeds can be applied in any order. Returns the number of CVEs written.
+        """
+        count = 0
+        with self.db:
+            for record in records:
+                if record.rejected:
+                    removed = self.db.execute(
+                        "DELETE FROM cves WHERE id = ? AND (? IS NULL OR modified IS NULL OR modified <= ?)",
+                        (record.id, record.modified, record.modified)
+                    )
+                    if removed.rowcount:
+                        self.db.execute("DELETE FROM cpe_matches WHERE cve_id = ?", (record.id,))
+                    continue
+                written = self.db.execute(
+                    "INSERT INTO cves VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET"
+                    " published = excluded.published, modified = excluded.modified, cvss = excluded.cvss,"
+                    " severity = excluded.severity, vector = excluded.vector,"
+                    " description = excluded.description, refs = excluded.refs"
+                    " WHERE cves.modified IS NULL OR excluded.modified > cves.modified",
+                    (record.id, record.published, record.modified, record.cvss, record.severity,
+                     record.vector, record.description, json.dumps(record.references))
+                )
+                if not written.rowcount:
+                    continue
+                self.db.execute("DELETE FROM cpe_matches WHERE cve_id = ?", (record.id,))
+                rows = []
+                for cpe, vulnerable, start_incl, start_excl, end_incl, end_excl in record.matches:
+                    vendor, product, version = parse_cpe(cpe)
+                    if not product:
+                        continue
+                    rows.append((
+                        record.id, vendor, product, version, version_key(version),
+                        version_key(start_incl), version_key(start_excl),
+                        version_key(end_incl), version_key(end_excl), int(vulnerable), cpe
+                    ))
+                self.db.executemany("INSERT INTO cpe_matches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                count += 1
+        self.upserts += count
+        return count
+
+    async def ingest_chunks(self, chunks: AsyncIterator[bytes], compressed: bool = True) -> Tuple[int, str]:
+        """Ingest a feed arriving as byte chunks; returns (records, sha256 of the JSON)"""
+        reader = FeedReader(compressed)
+        pending: List[CveRecord] = []
+        total = 0
+        async for chunk in chunks:
+            pending.extend(reader.feed(chunk))
+            if len(pending) >= self.batch_size:
+                total += self.upsert(pending)
+                pending = []
+                await asyncio.sleep(0)
+        pending.extend(reader.close())
+        total += self.upsert(pending)
+        return total, reader.sha256.hexdigest()
+
+    async def ingest_file(self, path: Path) -> int:
+        path = Path(path)
+
+        async def chunks():
+            with open(path, 'rb') as feed:
+                while True:
+                    chunk = feed.read(1024 * 1024)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        records, sha256 = await self.ingest_chunks(chunks(), compressed=path.suffix == '.gz')
+        self._record_feed(path.name, sha256, None, records)
+        return records
+
+    async def sync_feed(self, session, name: str, force: bool = False) -> int:
+        """Ingest one NVD feed ('2024', 'modified', 'recent') unless its checksum is unchanged"""
+        url = self.feed_url.format(name=name)
+        meta = await self._meta(session, url)
+        known = self.db.execute("SELECT sha256 FROM feeds WHERE name = ?", (name,)).fetchone()
+        if not force and meta.get('sha256') and known and known[0] == meta['sha256'].lower():
+            logger.info(f"Feed {name} unchanged")
+            return 0
+
+        started = time.perf_counter()
+        async with session.get(url) as response:
+            response.raise_for_status()
+            records, sha256 = await self.ingest_chunks(response.content.iter_chunked(256 * 1024))
+        self._record_feed(name, sha256, meta.get('lastModifiedDate'), records)
+        logger.info(f"Feed {name}: {records} CVEs in {time.perf_counter() - started:.1f}s")
+        return records
+
+    async def _meta(self, session, feed_url: str) -> Dict[str, str]:
+        meta_url = feed_url[:-len('.json.gz')] + '.meta' if feed_url.endswith('.json.gz') else feed_url + '.meta'
+        try:
+            async with session.get(meta_url) as response:
+                if response.status != 200:
+                    return {}
+                text = await response.text()
+        except Exception as e:
+            logger.warning(f"No feed metadata from {meta_url}: {e!r}")
+            return {}
+        return dict(line.split(':', 1) for line in text.splitlines() if ':' in line)
+
+    def _record_feed(self, name: str, sha256: str, last_modified: Optional[str], records: int):
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?)",
+                (name, sha256, last_modified, records, time.time())
+            )
+
+    async def sync(self, names: Iterable[str], force: bool = False) -> Dict[str, int]:
+        """Sync several feeds in order; the newest revision of a CVE they share wins"""
+        session = await shared_session_pool.acquire()
+        try:
+            return {name: await self.sync_feed(session, name, force) for name in names}
+        finally:
+            await shared_session_pool.release()
+
+    async def update(self) -> Dict[str, int]:
+        """Apply the recent and modified feeds to an already synced store"""
+        row = self.db.execute("SELECT MIN(ingested_at) FROM feeds WHERE name GLOB '[0-9]*'").fetchone()
+        if row[0] is None:
+            logger.warning("No yearly feeds ingested yet; the modified feed only covers eight days")
+        elif time.time() - row[0] > 8 * 86400 and self._last_update() < time.time() - 8 * 86400:
+            logger.warning("Last update is older than the modified feed window; resync the yearly feeds")
+        return await self.sync(['recent', 'modified'])
+
+    def _last_update(self) -> float:
+        row = self.db.execute("SELECT MAX(ingested_at) FROM feeds WHERE name = 'modified'").fetchone()
+        return row[0] or 0.0
+
+    # Lookups
+
+    def get(self, cve_id: str) -> Optional[Dict[str, Any]]:
+        """One CVE with its CPE matches"""
+        self.lookups += 1
+        row = self.db.execute("SELECT * FROM cves WHERE id = ?", (cve_id.upper(),)).fetchone()
+        if row is None:
+            return None
+        cve = self._cve_dict(row)
+        cve['cpe_matches'] = [
+            {'cpe': cpe, 'vulnerable': bool(vulnerable)}
+            for cpe, vulnerable in self.db.execute(
+                "SELECT cpe, vulnerable FROM cpe_matches WHERE cve_id = ?", (cve['id'],)
+            )
+        ]
+        return cve
+
+    def affected(self, vendor: Optional[str], product: str, version: str,
+                 min_cvss: Optional[float] = None) -> List[Dict[str, Any]]:
+        """CVEs whose vulnerable CPE matches cover product (and vendor) at version, worst first"""
+        self.lookups += 1
+        key = version_key(version)
+        if key == NOT_APPLICABLE:
+            return []
+        query = (
+            "SELECT DISTINCT c.* FROM cpe_matches m JOIN cves c ON c.id = m.cve_id"
+            " WHERE m.product = ? AND m.vulnerable = 1"
+        )
+        params: List[Any] = [product.lower()]
+        if vendor:
+            query += " AND m.vendor = ?"
+            params.append(vendor.lower())
+        if key is None:
+            query += " AND m.version_key IS NULL"
+        else:
+            query += (
+                " AND (m.version_key = ? OR (m.version_key IS NULL"
+                " AND (m.start_incl IS NULL OR m.start_incl <= ?) AND (m.start_excl IS NULL OR m.start_excl < ?)"
+                " AND (m.end_incl IS NULL OR m.end_incl >= ?) AND (m.end_excl IS NULL OR m.end_excl > ?)))"
+            )
+            params.extend([key] * 5)
+        if min_cvss is not None:
+            query += " AND c.cvss >= ?"
+            params.append(min_cvss)
+        query += " ORDER BY c.cvss DESC"
+        return [self._cve_dict(row) for row in self.db.execute(query, params)]
+
+    def affected_cpe(self, cpe: str, min_cvss: Optional[float] = None) -> List[Dict[str, Any]]:
+        """affected() for a CPE 2.3 string naming a concrete version"""
+        vendor, product, version = parse_cpe(cpe)
+        return self.affected(vendor, product, version, min_cvss)
+
+    def search(self, min_cvss: Optional[float] = None, published_after: Optional[str] = None,
+               published_before: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """CVEs by score and publication date, newest first"""
+        self.lookups += 1
+        clauses, params = [], []
+        if min_cvss is not None:
+            clauses.append("cvss >= ?")
+            params.append(min_cvss)
+        if published_after:
+            clauses.append("published >= ?")
+            params.append(published_after)
+        if published_before:
+            clauses.append("published < ?")
+            params.append(published_before)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self.db.execute(f"SELECT * FROM cves{where} ORDER BY published DESC LIMIT ?", (*params, limit))
+        return [self._cve_dict(row) for row in rows]
+
+    @staticmethod
+    def _cve_dict(row) -> Dict[str, Any]:
+        return {
+            'id': row[0], 'published': row[1], 'modified': row[2], 'cvss': row[3], 'severity': row[4],
+            'vector': row[5], 'description': row[6], 'references': json.loads(row[7] or '[]')
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'path': str(self.path) if self.path else None,
+            'cves': self.db.execute("SELECT COUNT(*) FROM cves").fetchone()[0],
+            'cpe_matches': self.db.execute("SELECT COUNT(*) FROM cpe_matches").fetchone()[0],
+            'feeds': {
+                name: {'records': records, 'last_modified': last_modified, 'ingested_at': ingested_at}
+                for name, records, last_modified, ingested_at in self.db.execute(
+                    "SELECT name, records, last_modified, ingested_at FROM feeds"
+                )
+            },
+            'upserts': self.upserts,
+            'lookups': self.lookups
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--db', type=Path, default=None, help='store path')
+    parser.add_argument('--sync', nargs='+', metavar='FEED', help="NVD feeds to ingest, e.g. 2023 2024")
+    parser.add_argument('--force', action='store_true', help='re-ingest feeds even if unchanged')
+    parser.add_argument('--update', action='store_true', help='apply the recent and modified feeds')
+    parser.add_argument('--feed', type=Path, nargs='+', help='local feed files (.json or .json.gz)')
+    parser.add_argument('--get', metavar='CVE_ID')
+    parser.add_argument('--affected', nargs=3, metavar=('VENDOR', 'PRODUCT', 'VERSION'))
+    parser.add_argument('--min-cvss', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    store = CveStore(args.db)
+
+    async def ingest():
+        if args.feed:
+            for path in args.feed:
+                print(f"{path}: {await store.ingest_file(path)} CVEs")
+        if args.sync:
+            print(json.dumps(await store.sync(args.sync, args.force)))
+        if args.update:
+            print(json.dumps(await store.update()))
+
+    if args.feed or args.sync or args.update:
+        asyncio.run(ingest())
+    if args.get:
+        print(json.dumps(store.get(args.get), indent=2))
+    if args.affected:
+        vendor, product, version = args.affected
+        started = time.perf_counter()
+        results = store.affected(None if vendor == '*' else vendor, product, version, args.min_cvss)
+        elapsed = (time.perf_counter() - started) * 1000
+        for cve in results:
+            print(f"{cve['id']}  {cve['cvss']}  {(cve['description'] or '')[:100]}")
+        print(f"{len(results)} CVEs in {elapsed:.2f} ms")
+    if not (args.feed or args.sync or args.update or args.get or args.affected):
+        print(json.dumps(store.get_status(), indent=2))
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - DEDUP INDEX
+Persistent content-addressed duplicate filter for harvest ingestion
+
+An item with its own permalink is recorded under its canonical URL; one
+without (e.g. a feed entry whose link is the feed itself) under a hash of its
+normalized content, scoped to its source so unrelated items that share
+boilerplate text in different sources stay distinct. Lookups go through an
+in-memory Bloom filter first, so the on-disk SQLite table is only consulted
+for probable duplicates.
+"""
+
+import hashlib
+import logging
+import math
+import re
+import sqlite3
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from harvest_paths import harvest_data_dir
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_TRACKING_PARAMS = frozenset({'fbclid', 'gclid', 'ref', 'mc_cid', 'mc_eid'})
+_TRACKING_PREFIX = 'utm_'
+
+
+def _is_tracking(param: str) -> bool:
+    param = param.lower()
+    return param in _TRACKING_PARAMS or param.startswith(_TRACKING_PREFIX)
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so trivially different links compare equal"""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(k)
+    )
+    path = parts.path.rstrip('/') or '/'
+    netloc = parts.netloc.lower()
+    if netloc.startswith('www.'):
+        netloc = netloc[4:]
+    return urlunsplit((parts.scheme.lower(), netloc, path, urlencode(query), ''))
+
+
+def content_key(content: str, scope: str = '') -> bytes:
+    normalized = _WHITESPACE.sub(' ', content).strip().lower()
+    return b'c' + hashlib.blake2b(f"{scope}\0{normalized}".encode('utf-8'), digest_size=16).digest()
+
+
+def url_key(url: str) -> bytes:
+    return b'u' + hashlib.blake2b(canonical_url(url).encode('utf-8'), digest_size=16).digest()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over pre-hashed keys"""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: bytes) -> Iterable[int]:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: bytes):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path: Path, count: int):
+        """Write the bit array with a header recording how many keys it covers"""
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(struct.pack('<QIQ', self.size, self.hashes, count))
+            f.write(self.bits)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, capacity: int, count: int) -> Optional['BloomFilter']:
+        """Load a saved filter if it matches the current key count"""
+        if not path.exists():
+            return None
+        bloom = cls(capacity)
+        with open(path, 'rb') as f:
+            size, hashes, saved_count = struct.unpack('<QIQ', f.read(20))
+            if (size, hashes, saved_count) != (bloom.size, bloom.hashes, count):
+                return None
+            bloom.bits = bytearray(f.read())
+        return bloom
+
+
+class DedupIndex:
+    """Bloom filter in front of an on-disk table of seen item keys"""
+
+    def __init__(self, path: Optional[Path] = None, capacity: int = 1_000_000):
+        self.path = Path(path) if path else None
+        self.capacity = capacity
+        self.duplicates = 0
+        self._db = None
+        self._bloom = None
+        # Admitted rows not yet in the table, by key
+        self._deferred: Dict[bytes, tuple] = {}
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path is None:
+                self.path = harvest_data_dir('dedup') / 'seen.sqlite'
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS seen (key BLOB PRIMARY KEY, url TEXT, first_seen REAL)"
+                " WITHOUT ROWID"
+            )
+        return self._db
+
+    @property
+    def bloom(self) -> BloomFilter:
+        if self._bloom is None:
+            count = self.db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+            self._bloom = BloomFilter.load(self.path.with_suffix('.bloom'), self.capacity, count)
+            if self._bloom is None:
+                logger.info(f"Rebuilding dedup Bloom filter from {count} keys")
+                self._bloom = BloomFilter(self.capacity)
+                for (key,) in self.db.execute("SELECT key FROM seen"):
+                    self._bloom.add(key)
+        return self._bloom
+
+    @staticmethod
+    def keys_for(content: str, url: str, source: str):
+        """URL key for items with their own permalink, else a content key within the source"""
+        if url and url != source:
+            return [url_key(url)]
+        return [content_key(content, source)]
+
+    def _seen(self, key: bytes) -> bool:
+        if key not in self.bloom:
+            return False
+        if key in self._deferred:
+            return True
+        return self.db.execute("SELECT 1 FROM seen WHERE key = ?", (key,)).fetchone() is not None
+
+    def contains(self, content: str, url: str, source: str) -> bool:
+        """Whether an item with this content or permalink was already ingested"""
+        if any(self._seen(key) for key in self.keys_for(content, url, source)):
+            self.duplicates += 1
+            return True
+        return False
+
+    def admit(self, items: Iterable[Any], defer: bool = False) -> List[Any]:
+        """Record accepted items, returning only those not seen before
+
+        This re-checks items that passed contains() earlier, which catches
+        duplicates fetched concurrently by different targets or harvesters.
+        With ``defer`` the items count as seen in this process but are only
+        written to the table by persist(), so a caller can wait until they
+        are durably stored elsewhere; a crash before that admits them again.
+        """
+        now = time.time()
+        admitted = []
+        pending = set()
+        rows = []
+        for item in items:
+            keys = self.keys_for(item['content'], item['url'], item['source'])
+            if any(key in pending or self._seen(key) for key in keys):
+                self.duplicates += 1
+                continue
+            for key in keys:
+                self.bloom.add(key)
+                pending.add(key)
+                rows.append((key, item['url'], now))
+            admitted.append(item)
+        if rows and defer:
+            self._deferred.update((row[0], row) for row in rows)
+        elif rows:
+            self.db.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?, ?)", rows)
+            self.db.commit()
+        return admitted
+
+    def deferred(self) -> List[bytes]:
+        """Keys admitted with ``defer`` and not yet persisted"""
+        return list(self._deferred)
+
+    def persist(self, keys: Iterable[bytes]) -> int:
+        """Write deferred admissions to the table"""
+        rows = [self._deferred.pop(key) for key in keys if key in self._deferred]
+        if rows:
+            self.db.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?, ?)", rows)
+            self.db.commit()
+        return len(rows)
+
+    def forget(self, items: Iterable[Any]) -> int:
+        """Withdraw admitted items that were never delivered, so a later run admits them again
+
+        Their Bloom filter bits stay set; lookups fall through to the table,
+        which no longer has the keys.
+        """
+        keys = [(key,) for item in items for key in self.keys_for(item['content'], item['url'], item['source'])]
+        if not keys:
+            return 0
+        for (key,) in keys:
+            self._deferred.pop(key, None)
+        self.db.executemany("DELETE FROM seen WHERE key = ?", keys)
+        self.db.commit()
+        return len(keys)
+
+    def flush(self):
+        """Persist the Bloom filter so the next process can skip rebuilding it"""
+        if self._bloom is not None:
+            count = self.db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+            self._bloom.save(self.path.with_suffix('.bloom'), count)
+
+    def get_status(self):
+        """Get index statistics"""
+        return {
+            'keys': self.db.execute("SELECT COUNT(*) FROM seen").fetchone()[0],
+            'deferred': len(self._deferred),
+            'duplicates_dropped': self.duplicates
+        }
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+# Process-wide index
+shared_dedup_index = DedupIndex()
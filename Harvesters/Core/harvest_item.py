@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - HARVEST ITEM
+Compact slotted record for harvested items
+
+HarvestItem replaces the per-item 7-key dict. Category and source strings are
+interned so millions of items share one copy, and the harvest time is an
+integer epoch-nanosecond stamp taken once per response. The record behaves as
+a read-only mapping with the legacy keys, so ``item['title']``,
+``item.get('quality_score')`` and ``dict(item)`` keep working; to_dict()
+builds a real dict when one is needed.
+"""
+
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any, Dict, Iterator, List
+
+FIELDS = ('content', 'title', 'url', 'category', 'source', 'harvested_at', 'quality_score')
+
+
+class HarvestItem(Mapping):
+    """Slotted harvested item with a dict-compatible read interface"""
+
+    __slots__ = ('content', 'title', 'url', 'category', 'source', 'harvested_ns', 'quality_score')
+
+    def __init__(self, content: str, title: str, url: str, category: str, source: str,
+                 harvested_ns: int, quality_score: float):
+        self.content = content
+        self.title = title
+        self.url = url
+        self.category = sys.intern(category)
+        self.source = sys.intern(source)
+        self.harvested_ns = harvested_ns
+        self.quality_score = quality_score
+
+    @property
+    def harvested_at(self) -> str:
+        return datetime.fromtimestamp(self.harvested_ns / 1e9).isoformat()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"HarvestItem(title={self.title!r}, url={self.url!r}, quality_score={self.quality_score})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Build the legacy dict representation"""
+        return {key: getattr(self, key) for key in FIELDS}
+
+    def to_row(self) -> List[Any]:
+        """Compact positional form for storage"""
+        return [self.content, self.title, self.url, self.category, self.source,
+                self.harvested_ns, self.quality_score]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> 'HarvestItem':
+        return cls(*row)
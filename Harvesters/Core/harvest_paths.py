@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - HARVEST PATHS
+Location of on-disk harvester state (caches, indexes, sinks)
+"""
+
+import os
+from pathlib import Path
+
+
+def harvest_data_dir(*parts: str) -> Path:
+    """Return (and create) a directory under the harvest state root
+
+    The root defaults to ``~/.echo_prime/harvest`` and can be moved with the
+    ``ECHO_HARVEST_DIR`` environment variable.
+    """
+    root = Path(os.environ.get('ECHO_HARVEST_DIR', Path.home() / '.echo_prime' / 'harvest'))
+    path = root.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
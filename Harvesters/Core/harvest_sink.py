@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - HARVEST SINK
+Segmented append-only on-disk storage for harvested items
+
+Items are partitioned by category and UTC date and appended to rolling
+segment files. Each flushed batch is written as one independent gzip member
+and fsync'd, and a fixed-width sidecar index records the member's byte range,
+time span and item count. Readers use the index to decompress only the
+members that overlap a requested time range.
+
+Compression, writes and fsync run on a single writer thread whenever an
+event loop is running, so a flush never stalls in-flight fetches; batches
+are still appended in the order they were flushed. Coroutines wait for
+durability with ``await sink.aflush()``; ``flush()`` blocks until it.
+
+Layout::
+
+    <root>/<category>/<YYYY-MM-DD>/segment-000001.jsonl.gz
+    <root>/<category>/<YYYY-MM-DD>/segment-000001.idx
+"""
+
+import asyncio
+import concurrent.futures
+import gzip
+import json
+import logging
+import os
+import struct
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from harvest_item import HarvestItem
+from harvest_paths import harvest_data_dir
+
+logger = logging.getLogger(__name__)
+
+# byte offset, compressed length, first harvested_ns, last harvested_ns, item count
+INDEX_ENTRY = struct.Struct('<QQqqI')
+
+
+def _partition_date(harvested_ns: int) -> str:
+    return datetime.fromtimestamp(harvested_ns / 1e9, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class SegmentWriter:
+    """Appends gzip members to one partition's current segment"""
+
+    def __init__(self, directory: Path, max_segment_bytes: int):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        existing = sorted(self.directory.glob('segment-*.jsonl.gz'))
+        self.sequence = int(existing[-1].name[8:14]) if existing else 1
+
+    @property
+    def segment_path(self) -> Path:
+        return self.directory / f'segment-{self.sequence:06d}.jsonl.gz'
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / f'segment-{self.sequence:06d}.idx'
+
+    def append(self, items: List[HarvestItem]) -> int:
+        if self.segment_path.exists() and self.segment_path.stat().st_size >= self.max_segment_bytes:
+            self.sequence += 1
+
+        lines = ''.join(json.dumps(item.to_row()) + '\n' for item in items)
+        member = gzip.compress(lines.encode('utf-8'))
+        stamps = [item.harvested_ns for item in items]
+
+        with open(self.segment_path, 'ab') as segment:
+            offset = segment.tell()
+            segment.write(member)
+            segment.flush()
+            os.fsync(segment.fileno())
+
+        with open(self.index_path, 'ab') as index:
+            index.write(INDEX_ENTRY.pack(offset, len(member), min(stamps), max(stamps), len(items)))
+            index.flush()
+            os.fsync(index.fileno())
+        return len(items)
+
+
+class HarvestSink:
+    """Durable, batched, partitioned store for harvested items"""
+
+    def __init__(self, root: Optional[Path] = None, batch_size: int = 500,
+                 max_segment_bytes: int = 64 * 1024 * 1024):
+        self.root = Path(root) if root else None
+        self.batch_size = batch_size
+        self.max_segment_bytes = max_segment_bytes
+        self.items_written = 0
+        self._buffers: Dict[Tuple[str, str], List[HarvestItem]] = {}
+        self._writers: Dict[Tuple[str, str], SegmentWriter] = {}
+        # Appends handed to the writer thread and not yet collected
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pending: List[concurrent.futures.Future] = []
+
+    def _root(self) -> Path:
+        if self.root is None:
+            self.root = harvest_data_dir('sink')
+        return self.root
+
+    def write(self, items: Iterable[HarvestItem]):
+        """Buffer items, flushing any partition whose batch is full"""
+        for item in items:
+            partition = (item.category, _partition_date(item.harvested_ns))
+            buffer = self._buffers.setdefault(partition, [])
+            buffer.append(item)
+            if len(buffer) >= self.batch_size:
+                self._flush_partition(partition)
+
+    def flush(self):
+        """Write every buffered batch to disk, blocking until it is fsync'd"""
+        for partition in list(self._buffers):
+            self._flush_partition(partition)
+        concurrent.futures.wait(self._pending)
+        self._collect()
+
+    async def aflush(self):
+        """flush() for coroutines: waits for the writer thread without blocking the loop"""
+        for partition in list(self._buffers):
+            self._flush_partition(partition)
+        if self._pending:
+            await asyncio.wait([asyncio.wrap_future(future) for future in self._pending])
+        self._collect()
+
+    def _flush_partition(self, partition: Tuple[str, str]):
+        items = self._buffers.pop(partition, None)
+        if not items:
+            return
+        writer = self._writers.get(partition)
+        if writer is None:
+            writer = SegmentWriter(self._root().joinpath(*partition), self.max_segment_bytes)
+            self._writers[partition] = writer
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop to protect; append in place once earlier appends landed
+            concurrent.futures.wait(self._pending)
+            self._collect()
+            self.items_written += writer.append(items)
+            return
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='harvest-sink')
+        self._pending.append(self._executor.submit(writer.append, items))
+        self._collect()
+
+    def _collect(self):
+        """Count finished appends, raising the first write error"""
+        done = [future for future in self._pending if future.done()]
+        if not done:
+            return
+        self._pending = [future for future in self._pending if not future.done()]
+        for future in done:
+            self.items_written += future.result()
+
+    def read(self, category: str, start_ns: Optional[int] = None,
+             end_ns: Optional[int] = None) -> Iterator[HarvestItem]:
+        """Yield stored items of a category harvested within [start_ns, end_ns]"""
+        category_dir = self._root() / category
+        if not category_dir.exists():
+            return
+
+        first_day = _partition_date(start_ns) if start_ns is not None else None
+        last_day = _partition_date(end_ns) if end_ns is not None else None
+
+        for day_dir in sorted(p for p in category_dir.iterdir() if p.is_dir()):
+            if (first_day and day_dir.name < first_day) or (last_day and day_dir.name > last_day):
+                continue
+            for index_path in sorted(day_dir.glob('segment-*.idx')):
+                yield from self._read_segment(index_path, start_ns, end_ns)
+
+    def _read_segment(self, index_path: Path, start_ns: Optional[int],
+                      end_ns: Optional[int]) -> Iterator[HarvestItem]:
+        segment_path = index_path.with_suffix('.jsonl.gz')
+        entries = index_path.read_bytes()
+        with open(segment_path, 'rb') as segment:
+            for pos in range(0, len(entries) - INDEX_ENTRY.size + 1, INDEX_ENTRY.size):
+                offset, length, first_ns, last_ns, _ = INDEX_ENTRY.unpack_from(entries, pos)
+                if (start_ns is not None and last_ns < start_ns) or (end_ns is not None and first_ns > end_ns):
+                    continue
+                segment.seek(offset)
+                for line in gzip.decompress(segment.read(length)).splitlines():
+                    item = HarvestItem.from_row(json.loads(line))
+                    if (start_ns is None or item.harvested_ns >= start_ns) and \
+                            (end_ns is None or item.harvested_ns <= end_ns):
+                        yield item
+
+    async def stream(self, category: str, start_ns: Optional[int] = None,
+                     end_ns: Optional[int] = None) -> AsyncIterator[HarvestItem]:
+        """Async variant of read() for BaseTrainer.train()"""
+        for count, item in enumerate(self.read(category, start_ns, end_ns)):
+            if count % 1000 == 0:
+                await asyncio.sleep(0)
+            yield item
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get sink status"""
+        return {
+            'root': str(self.root) if self.root else None,
+            'items_written': self.items_written,
+            'buffered': sum(len(items) for items in self._buffers.values()),
+            'pending_appends': len(self._pending),
+            'open_partitions': len(self._writers)
+        }
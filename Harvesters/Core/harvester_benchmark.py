@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - HARVESTER BENCHMARK
+Offline throughput benchmark for BaseHarvester against a local replay server
+
+A local aiohttp server stands in for the real APIs, replaying recorded JSON
+and HTML fixtures (or synthetic ones) with configurable latency, error rate
+and payload size. The benchmark drives harvest() and harvest_stream() with
+isolated on-disk state and reports items/sec, p50/p99 request latency and
+peak RSS. A saved baseline turns it into a regression gate that needs no
+network access:
+
+    python harvester_benchmark.py --save-baseline bench.json
+    python harvester_benchmark.py --baseline bench.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+# Core helpers live alongside this module
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from base_harvester import BaseHarvester
+from adaptive_concurrency import AdaptiveConcurrency
+from circuit_breaker import BreakerRegistry
+from dedup_index import DedupIndex
+from harvest_metrics import LatencyHistogram
+from rate_limiter import HostRateLimiter
+from response_cache import ResponseCache
+from watermark_store import WatermarkStore
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+MODES = ('harvest', 'stream')
+
+
+def synthetic_fixtures(count: int = 4, items: int = 20, content_bytes: int = 800) -> Dict[str, tuple]:
+    """Generated JSON and HTML payloads, as (content type, body template) pairs"""
+    fixtures = {}
+    for index in range(count):
+        fixtures[f'json-{index}'] = ('application/json', json.dumps({
+            'results': [
+                {
+                    'id': f'{index}-{n}',
+                    'title': f'Benchmark record {index}-{n} {{request}}',
+                    'content': f'{{request}} record {index}-{n} ' + 'lorem ipsum ' * (content_bytes // 12),
+                    'url': f'https://replay.local/{index}/{n}?r={{request}}',
+                    'author': 'replay',
+                    'published': '2026-01-01T00:00:00Z',
+                    'updated_at': n
+                }
+                for n in range(items)
+            ]
+        }))
+    fixtures['html-0'] = ('text/html', (
+        '<html><head><title>Replay {request}</title></head><body>'
+        + '<p>Replay page {request} ' + 'lorem ipsum ' * (content_bytes // 12) + '</p>'
+        + '</body></html>'
+    ))
+    return fixtures
+
+
+def load_fixtures(directory: Path) -> Dict[str, tuple]:
+    """Recorded fixtures: every *.json and *.html file in a directory"""
+    fixtures = {}
+    for path in sorted(directory.iterdir()):
+        if path.suffix == '.json':
+            fixtures[path.stem] = ('application/json', path.read_text())
+        elif path.suffix in ('.html', '.htm'):
+            fixtures[path.stem] = ('text/html', path.read_text())
+    if not fixtures:
+        raise ValueError(f"No .json or .html fixtures in {directory}")
+    return fixtures
+
+
+class ReplayServer:
+    """Local stand-in API serving fixtures at /<fixture>/<n>
+
+    ``{request}`` in a fixture body is replaced with a per-request counter so
+    repeated fetches are not collapsed by the dedup index. Latency is
+    uniformly jittered around ``latency``; ``error_rate`` of requests get a
+    503 with Retry-After: 0.
+    """
+
+    def __init__(self, fixtures: Dict[str, tuple], latency: float = 0.02, jitter: float = 0.5,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.port = None
+        self._runner = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def endpoints(self, count: int) -> List[str]:
+        """``count`` distinct endpoint paths cycling through the fixtures"""
+        names = list(self.fixtures)
+        return [f'/{names[index % len(names)]}/{index}' for index in range(count)]
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        number = self.requests
+        spread = self.latency * self.jitter
+        await asyncio.sleep(max(0.0, self.random.uniform(self.latency - spread, self.latency + spread)))
+
+        if self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503, headers={'Retry-After': '0'})
+
+        fixture = self.fixtures.get(request.match_info['fixture'])
+        if fixture is None:
+            return web.Response(status=404)
+        content_type, body = fixture
+        body = body.replace('{request}', str(number)).encode()
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type=content_type)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/{fixture}/{index}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def isolate(harvester: BaseHarvester, state_dir: Path, rate_limit: float):
+    """Point a harvester at private state so runs cannot see each other's cache or dedup keys"""
+    state_dir.mkdir(parents=True, exist_ok=True)
+    harvester.cache = ResponseCache(state_dir / 'responses.sqlite')
+    harvester.dedup = DedupIndex(state_dir / 'seen.sqlite')
+    harvester.watermarks = WatermarkStore(state_dir / 'watermarks.sqlite')
+    harvester.concurrency = AdaptiveConcurrency(state_dir / 'concurrency.json')
+    harvester.breakers = BreakerRegistry()
+    harvester.host_limiter = HostRateLimiter(rate_limit)
+
+
+async def run_once(server: ReplayServer, mode: str, targets: int, state_dir: Path,
+                   rate_limit: float) -> Dict[str, Any]:
+    """One harvest over ``targets`` endpoints; returns throughput and latency figures"""
+    harvester = BaseHarvester()
+    harvester.api_config['base_urls'] = [server.base_url]
+    harvester.api_config['endpoints'] = server.endpoints(targets)
+    isolate(harvester, state_dir, rate_limit)
+
+    async with harvester:
+        started = time.perf_counter()
+        if mode == 'stream':
+            items = 0
+            async for _ in harvester.harvest_stream(max_items=targets):
+                items += 1
+        else:
+            items = len(await harvester.harvest(max_items=targets))
+        elapsed = time.perf_counter() - started
+
+    latency = LatencyHistogram()
+    for metrics in harvester.metrics.targets.values():
+        latency.merge(metrics.latency)
+    totals = harvester.metrics.get_status()['totals']
+
+    harvester.cache.close()
+    harvester.dedup.close()
+    harvester.watermarks.close()
+
+    return {
+        'items': items,
+        'seconds': elapsed,
+        'items_per_sec': items / elapsed if elapsed else 0.0,
+        'requests': totals['requests'],
+        'errors': totals['errors'],
+        'bytes_in': totals['bytes_in'],
+        'latency_p50': latency.quantile(0.5),
+        'latency_p99': latency.quantile(0.99)
+    }
+
+
+async def benchmark(fixtures: Dict[str, tuple], modes=MODES, targets: int = 200, repeats: int = 3,
+                    latency: float = 0.02, error_rate: float = 0.0, rate_limit: float = 10_000,
+                    seed: int = 0) -> Dict[str, Any]:
+    """Run every mode ``repeats`` times and keep each mode's best run"""
+    server = ReplayServer(fixtures, latency=latency, error_rate=error_rate, seed=seed)
+    await server.start()
+    results = {}
+
+    try:
+        with tempfile.TemporaryDirectory(prefix='harvest-bench-') as tmp:
+            for mode in modes:
+                runs = [
+                    await run_once(server, mode, targets, Path(tmp) / f'{mode}-{repeat}', rate_limit)
+                    for repeat in range(repeats)
+                ]
+                best = max(runs, key=lambda run: run['items_per_sec'])
+                best['runs'] = [round(run['items_per_sec'], 1) for run in runs]
+                results[mode] = best
+    finally:
+        await server.stop()
+
+    return {
+        'config': {
+            'targets': targets, 'repeats': repeats, 'latency': latency,
+            'error_rate': error_rate, 'fixtures': len(fixtures)
+        },
+        'modes': results,
+        'server': {'requests': server.requests, 'errors': server.errors, 'bytes_sent': server.bytes_sent},
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def check_regression(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Failures where throughput fell, or p99 latency or peak RSS grew, beyond ``tolerance``"""
+    failures = []
+    for mode, result in report['modes'].items():
+        base = baseline.get('modes', {}).get(mode)
+        if not base:
+            continue
+        floor = base['items_per_sec'] * (1 - tolerance)
+        if result['items_per_sec'] < floor:
+            failures.append(f"{mode}: {result['items_per_sec']:.1f} items/sec below {floor:.1f}")
+        if base.get('latency_p99') and result['latency_p99'] is not None:
+            ceiling = base['latency_p99'] * (1 + tolerance)
+            if result['latency_p99'] > ceiling:
+                failures.append(f"{mode}: p99 {result['latency_p99']:.3f}s above {ceiling:.3f}s")
+    if baseline.get('peak_rss_mb') and report['peak_rss_mb'] is not None:
+        ceiling = baseline['peak_rss_mb'] * (1 + tolerance)
+        if report['peak_rss_mb'] > ceiling:
+            failures.append(f"peak RSS {report['peak_rss_mb']} MiB above {ceiling:.1f} MiB")
+    return failures
+
+
+def _format(report: Dict[str, Any]) -> str:
+    lines = [f"{'mode':<8} {'items':>7} {'items/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}"]
+    for mode, result in report['modes'].items():
+        p50 = (result['latency_p50'] or 0) * 1000
+        p99 = (result['latency_p99'] or 0) * 1000
+        lines.append(
+            f"{mode:<8} {result['items']:>7} {result['items_per_sec']:>9.1f} "
+            f"{p50:>8.1f} {p99:>8.1f} {result['errors']:>7}"
+        )
+    lines.append(f"peak RSS: {report['peak_rss_mb']} MiB")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--fixtures', type=Path, help='directory of recorded .json/.html responses')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--targets', type=int, default=200)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.02, help='mean server latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered 503')
+    parser.add_argument('--items', type=int, default=20, help='items per synthetic JSON response')
+    parser.add_argument('--payload-bytes', type=int, default=800, help='content size per synthetic item')
+    parser.add_argument('--rate-limit', type=float, default=10_000, help='per-host requests/sec')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='print the full report as JSON')
+    parser.add_argument('--save-baseline', type=Path)
+    parser.add_argument('--baseline', type=Path, help='fail if results regress against this report')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    fixtures = (
+        load_fixtures(args.fixtures) if args.fixtures
+        else synthetic_fixtures(items=args.items, content_bytes=args.payload_bytes)
+    )
+    report = asyncio.run(benchmark(
+        fixtures, modes=args.modes, targets=args.targets, repeats=args.repeats,
+        latency=args.latency, error_rate=args.error_rate, rate_limit=args.rate_limit, seed=args.seed
+    ))
+    print(json.dumps(report, indent=2) if args.json else _format(report))
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+
+    if args.baseline:
+        failures = check_regression(report, json.loads(args.baseline.read_text()), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - HTML TEXT EXTRACTION
+Streaming boilerplate-stripping HTML-to-text for harvester responses
+
+The extractor is fed raw body chunks as they arrive and never builds a DOM.
+Script, style, navigation and other chrome subtrees are skipped, entities
+are decoded, and text is collected per block element. Blocks that are mostly
+link text (menus, tag clouds, "related" lists) are dropped, and when the page
+marks up an <article> or <main> region only that region is kept. The page
+title, canonical URL and author/date metadata come from the head.
+"""
+
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+# Subtrees that never hold main content
+SKIP_TAGS = frozenset({
+    'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'object',
+    'nav', 'header', 'footer', 'aside', 'form', 'button', 'select', 'textarea', 'menu'
+})
+
+# Elements whose boundaries separate blocks of text
+BLOCK_TAGS = frozenset({
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'tr', 'td', 'th', 'table',
+    'section', 'article', 'main', 'blockquote', 'pre', 'figure', 'figcaption',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr'
+})
+
+MAIN_TAGS = frozenset({'article', 'main'})
+
+VOID_TAGS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'source', 'track', 'wbr'
+})
+
+# class/id words marking chrome rather than content
+BOILERPLATE_WORDS = frozenset({
+    'nav', 'navbar', 'menu', 'breadcrumb', 'breadcrumbs', 'footer', 'header', 'sidebar', 'cookie',
+    'consent', 'banner', 'advert', 'ad', 'ads', 'promo', 'share', 'social', 'related', 'comment',
+    'comments', 'newsletter', 'subscribe', 'popup', 'modal'
+})
+
+# State classes ("has-sidebar", "is-menu-open") describe a page, not chrome
+STATE_PREFIXES = frozenset({'has', 'is', 'no', 'with', 'show', 'hide'})
+
+# Document-level containers are never skipped on a class/id hint
+NO_HINT_TAGS = frozenset({'html', 'body', 'main', 'article'})
+
+_HINT_SPLIT = re.compile(r'[-_]')
+
+# Scope boundaries for implied end tags
+_SCOPE = frozenset({'html', 'body', 'table', 'td', 'th', 'caption', 'template', 'object', 'button'})
+
+# Start tags that close an open <p>
+_P_CLOSERS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'details', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr',
+    'li', 'main', 'menu', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'ul'
+})
+
+# start tag -> (open elements it implicitly ends, elements that stop the search)
+IMPLIED_END = {
+    'li': (frozenset({'li'}), _SCOPE | {'ul', 'ol', 'menu'}),
+    'dt': (frozenset({'dt', 'dd'}), _SCOPE | {'dl'}),
+    'dd': (frozenset({'dt', 'dd'}), _SCOPE | {'dl'}),
+    'tr': (frozenset({'tr'}), frozenset({'html', 'table', 'thead', 'tbody', 'tfoot'})),
+    'td': (frozenset({'td', 'th'}), frozenset({'html', 'table', 'tr'})),
+    'th': (frozenset({'td', 'th'}), frozenset({'html', 'table', 'tr'})),
+    'thead': (frozenset({'thead', 'tbody', 'tfoot'}), frozenset({'html', 'table'})),
+    'tbody': (frozenset({'thead', 'tbody', 'tfoot'}), frozenset({'html', 'table'})),
+    'tfoot': (frozenset({'thead', 'tbody', 'tfoot'}), frozenset({'html', 'table'})),
+    'option': (frozenset({'option'}), frozenset({'html', 'select', 'datalist', 'optgroup'}))
+}
+
+AUTHOR_META = ('author', 'article:author', 'dc.creator', 'citation_author')
+DATE_META = ('article:published_time', 'date', 'dc.date', 'citation_publication_date', 'pubdate')
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Blocks with more link text than this fraction are navigation
+MAX_LINK_DENSITY = 0.5
+
+
+class ExtractedText:
+    """Main-content text and head metadata of one HTML page"""
+
+    __slots__ = ('title', 'text', 'canonical_url', 'author', 'published_date', 'length')
+
+    def __init__(self, title: Optional[str], text: str, canonical_url: Optional[str],
+                 author: Optional[str], published_date: Optional[str], length: int):
+        self.title = title
+        self.text = text
+        self.canonical_url = canonical_url
+        self.author = author
+        self.published_date = published_date
+        # Full text length; ``text`` itself may be truncated
+        self.length = length
+
+    def to_raw_item(self) -> Dict[str, Optional[str]]:
+        """Raw-item view for quality scoring"""
+        return {
+            'title': self.title,
+            'content': self.text,
+            'author': self.author,
+            'published_date': self.published_date
+        }
+
+
+class HtmlTextExtractor(HTMLParser):
+    """Push parser turning HTML chunks into main-content text"""
+
+    def __init__(self, encoding: Optional[str] = None, max_chars: int = 100_000):
+        super().__init__(convert_charrefs=True)
+        self._decoder = codecs.getincrementaldecoder(_codec(encoding))(errors='replace')
+        self.max_chars = max_chars
+        # Open elements, and the stack index of the element being skipped
+        self.stack: List[str] = []
+        self.skip_at: Optional[int] = None
+        self.main_depth = 0
+        self.link_depth = 0
+        self.in_title = False
+        self.title_parts: List[str] = []
+        self.meta: Dict[str, str] = {}
+        self.canonical_url: Optional[str] = None
+        self.block: List[str] = []
+        self.block_chars = 0
+        self.block_link_chars = 0
+        self.block_in_main = False
+        self.main_blocks: List[str] = []
+        self.other_blocks: List[str] = []
+        self.main_chars = 0
+        self.other_chars = 0
+
+    def feed_bytes(self, chunk: bytes):
+        self.feed(self._decoder.decode(chunk))
+
+    def finish(self) -> ExtractedText:
+        """Flush pending input and return the extracted page"""
+        self.feed(self._decoder.decode(b'', final=True))
+        self.close()
+        self._pop_to(0)
+        self._end_block()
+
+        # Prefer a marked-up main region when it carries real text
+        if self.main_chars >= 200 or (self.main_chars and not self.other_chars):
+            blocks, length = self.main_blocks, self.main_chars
+        else:
+            blocks, length = self.main_blocks + self.other_blocks, self.main_chars + self.other_chars
+
+        title = _clean(''.join(self.title_parts)) or self.meta.get('og:title')
+        canonical = self.canonical_url or self.meta.get('og:url')
+        return ExtractedText(
+            title=title or None,
+            text='\n'.join(blocks)[:self.max_chars],
+            canonical_url=canonical,
+            author=next((self.meta[name] for name in AUTHOR_META if self.meta.get(name)), None),
+            published_date=next((self.meta[name] for name in DATE_META if self.meta.get(name)), None),
+            length=length
+        )
+
+    def handle_starttag(self, tag, attrs):
+        if tag in IMPLIED_END:
+            self._close_implied(*IMPLIED_END[tag])
+        if tag in _P_CLOSERS:
+            self._close_implied(frozenset({'p'}), _SCOPE)
+        if tag not in VOID_TAGS:
+            self.stack.append(tag)
+        if self.skip_at is not None:
+            return
+
+        attributes = dict(attrs)
+        if tag == 'meta':
+            name = (attributes.get('name') or attributes.get('property') or '').lower()
+            if name and attributes.get('content'):
+                self.meta.setdefault(name, attributes['content'].strip())
+            return
+        if tag == 'link':
+            if 'canonical' in (attributes.get('rel') or '').lower().split() and attributes.get('href'):
+                self.canonical_url = self.canonical_url or attributes['href'].strip()
+            return
+        if tag == 'title':
+            self.in_title = True
+            return
+
+        if tag in ('header', 'footer') and self.main_depth:
+            # An article's own header holds its headline and byline
+            pass
+        elif tag in SKIP_TAGS or (tag not in VOID_TAGS and tag not in NO_HINT_TAGS and _boilerplate(attributes)):
+            self._end_block()
+            if tag not in VOID_TAGS:
+                self.skip_at = len(self.stack) - 1
+            return
+
+        if tag in BLOCK_TAGS:
+            self._end_block()
+        if tag in MAIN_TAGS:
+            self.main_depth += 1
+        elif tag == 'a':
+            self.link_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        # End tags close the nearest open element of that name and anything
+        # left open inside it; stray end tags are ignored
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index] == tag:
+                self._pop_to(index)
+                return
+        if tag in BLOCK_TAGS and self.skip_at is None:
+            self._end_block()
+
+    def _close_implied(self, closes: frozenset, boundary: frozenset):
+        for index in range(len(self.stack) - 1, -1, -1):
+            if self.stack[index] in closes:
+                self._pop_to(index)
+                return
+            if self.stack[index] in boundary:
+                return
+
+    def _pop_to(self, index: int):
+        """Close open elements down to and including stack[index]"""
+        while len(self.stack) > index:
+            position = len(self.stack) - 1
+            tag = self.stack.pop()
+            if self.skip_at is not None:
+                if position == self.skip_at:
+                    self.skip_at = None
+                continue
+            if tag == 'title':
+                self.in_title = False
+            elif tag in BLOCK_TAGS:
+                self._end_block()
+                if tag in MAIN_TAGS and self.main_depth:
+                    self.main_depth -= 1
+            elif tag == 'a' and self.link_depth:
+                self.link_depth -= 1
+
+    def handle_data(self, data):
+        if self.skip_at is not None:
+            return
+        if self.in_title:
+            self.title_parts.append(data)
+            return
+        if not data.strip():
+            if self.block:
+                self.block.append(' ')
+            return
+        if not self.block:
+            self.block_in_main = self.main_depth > 0
+        self.block.append(data)
+        self.block_chars += len(data)
+        if self.link_depth:
+            self.block_link_chars += len(data)
+
+    def _end_block(self):
+        if not self.block:
+            return
+        text = _clean(''.join(self.block))
+        link_density = self.block_link_chars / self.block_chars if self.block_chars else 0.0
+        self.block = []
+        self.block_chars = 0
+        self.block_link_chars = 0
+        if not text or link_density > MAX_LINK_DENSITY:
+            return
+
+        if self.block_in_main:
+            if self.main_chars < self.max_chars:
+                self.main_blocks.append(text)
+            self.main_chars += len(text)
+        else:
+            if self.other_chars < self.max_chars:
+                self.other_blocks.append(text)
+            self.other_chars += len(text)
+
+
+def extract_html(body: bytes, encoding: Optional[str] = None, max_chars: int = 100_000) -> ExtractedText:
+    """Extract a whole in-memory page"""
+    extractor = HtmlTextExtractor(encoding, max_chars)
+    extractor.feed_bytes(body)
+    return extractor.finish()
+
+
+def _boilerplate(attributes: Dict[str, Optional[str]]) -> bool:
+    """Whether class/id tokens mark chrome: a boilerplate word leading or
+    ending a token ("site-header", "menu-item"), never mid-token or in a
+    state class ("has-header-image")"""
+    for value in (attributes.get('class'), attributes.get('id')):
+        for token in (value or '').lower().split():
+            words = _HINT_SPLIT.split(token)
+            if words[0] in STATE_PREFIXES:
+                continue
+            if words[0] in BOILERPLATE_WORDS or words[-1] in BOILERPLATE_WORDS:
+                return True
+    return False
+
+
+def _codec(encoding: Optional[str]) -> str:
+    try:
+        return codecs.lookup(encoding).name if encoding else 'utf-8'
+    except LookupError:
+        return 'utf-8'
+
+
+def _clean(text: str) -> str:
+    return _WHITESPACE.sub(' ', text).strip()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - STREAMING JSON ITEMS
+Incremental item-at-a-time JSON parsing for harvester responses
+
+The parser is fed raw response chunks and yields each element of the item
+array as soon as its closing bracket arrives. The item array is either the
+top-level array or the first ``results``/``items``/``data`` array (or other
+configured item keys) of a top-level object, so only one item is ever buffered at a time. Documents with
+no such array fall back to a full parse on close(). The rest of an object
+document (paging cursors, totals) is kept and available from envelope().
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Union
+
+ITEM_KEYS = (b'results', b'items', b'data')
+
+_STRUCTURAL = re.compile(rb'["\[\]{},]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_NON_WHITESPACE = re.compile(rb'\S')
+_SCALAR_END = re.compile(rb'[,\]\s]')
+
+_QUOTE = ord('"')
+_BACKSLASH = ord('\\')
+
+
+def lookup_path(document: Any, path: str) -> Any:
+    """Value at a dotted path such as ``cve.descriptions.0.value``, or None"""
+    value = document
+    for part in path.split('.'):
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, list) and part.lstrip('-').isdigit() and -len(value) <= int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return None
+    return value
+
+
+def map_fields(item: Dict[str, Any], fields: Dict[str, Union[str, List[str]]]) -> Dict[str, Any]:
+    """Project a raw item onto harvester fields
+    
+    Each field maps to a dotted path, or a list of paths tried in order.
+    """
+    mapped = {}
+    for field, paths in fields.items():
+        for path in ([paths] if isinstance(paths, str) else paths):
+            value = lookup_path(item, path)
+            if value not in (None, ''):
+                mapped[field] = value
+                break
+    return mapped
+
+
+class JsonItemStream:
+    """Push parser that extracts item array elements from JSON chunks"""
+
+    def __init__(self, item_keys=ITEM_KEYS):
+        self.item_keys = item_keys
+        self.buf = bytearray()
+        self.pos = 0
+        self.depth = 0
+        self.mode: Optional[str] = None
+        self.in_string = False
+        self.expect_key = False
+        self.key_start: Optional[int] = None
+        self.last_key: Optional[bytes] = None
+        self.array_depth: Optional[int] = None
+        self.found = False
+        self.item_start: Optional[int] = None
+        self.item_scalar = False
+        self.items_seen = 0
+        self.head: Optional[bytes] = None
+        self.tail_start: Optional[int] = None
+        self._envelope: Dict[str, Any] = {}
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Consume a chunk and return the items it completed"""
+        self.buf += chunk
+        items = []
+        self._scan(items)
+        self._compact()
+        return items
+
+    def close(self) -> List[Any]:
+        """Finish the document and return anything still pending"""
+        if self.found or self.mode == 'array':
+            return []
+        if not self.buf.strip():
+            return []
+
+        data = json.loads(bytes(self.buf))
+        self.buf = bytearray()
+        if isinstance(data, dict):
+            self._envelope = data
+            key = next((k.decode() for k in self.item_keys if k.decode() in data), None)
+            data = data[key] if key is not None else [data]
+        items = data if isinstance(data, list) else [data]
+        self.items_seen += len(items)
+        return items
+    
+    def envelope(self) -> Dict[str, Any]:
+        """Top-level object around the item array (the array itself is None)
+        
+        Only meaningful once the whole document has been fed and closed.
+        """
+        if self.head is not None and self.tail_start is not None:
+            self._envelope = json.loads(self.head + b'null' + bytes(self.buf[self.tail_start:]))
+            self.head = None
+        return self._envelope
+
+    def _complete_item(self, end: int, items: List[Any]):
+        items.append(json.loads(bytes(self.buf[self.item_start:end])))
+        self.items_seen += 1
+        self.item_start = None
+        self.item_scalar = False
+
+    def _in_item_gap(self) -> bool:
+        return self.array_depth is not None and self.depth == self.array_depth and self.item_start is None
+
+    def _scan(self, items: List[Any]):
+        buf = self.buf
+        while True:
+            if self.in_string:
+                m = _STRING_SPECIAL.search(buf, self.pos)
+                if not m:
+                    self.pos = len(buf)
+                    return
+                j = m.start()
+                if buf[j] == _BACKSLASH:
+                    if j + 1 >= len(buf):
+                        self.pos = j
+                        return
+                    self.pos = j + 2
+                    continue
+                self.in_string = False
+                self.pos = j + 1
+                if self.key_start is not None:
+                    self.last_key = bytes(buf[self.key_start:j])
+                    self.key_start = None
+                if self.item_start is not None and self.depth == self.array_depth:
+                    self._complete_item(self.pos, items)
+                continue
+
+            if self.item_scalar:
+                m = _SCALAR_END.search(buf, self.pos)
+                if not m:
+                    self.pos = len(buf)
+                    return
+                self._complete_item(m.start(), items)
+                self.pos = m.start()
+                continue
+
+            if self._in_item_gap():
+                m = _NON_WHITESPACE.search(buf, self.pos)
+                if not m:
+                    self.pos = len(buf)
+                    return
+                j = m.start()
+                c = buf[j:j + 1]
+                self.pos = j + 1
+                if c == b',':
+                    continue
+                if c == b']':
+                    self.depth -= 1
+                    self.array_depth = None
+                    self.found = True
+                    if self.mode == 'object':
+                        self.tail_start = self.pos
+                    continue
+                self.item_start = j
+                if c in (b'{', b'['):
+                    self.depth += 1
+                elif buf[j] == _QUOTE:
+                    self.in_string = True
+                else:
+                    self.item_scalar = True
+                    self.pos = j
+                continue
+
+            m = _STRUCTURAL.search(buf, self.pos)
+            if not m:
+                self.pos = len(buf)
+                return
+            j = m.start()
+            c = buf[j:j + 1]
+            self.pos = j + 1
+
+            if buf[j] == _QUOTE:
+                self.in_string = True
+                if self.expect_key and self.depth == 1:
+                    self.key_start = j + 1
+                    self.expect_key = False
+            elif c in (b'{', b'['):
+                if self.depth == 0:
+                    self.mode = 'object' if c == b'{' else 'array'
+                    self.expect_key = c == b'{'
+                    if c == b'[':
+                        self.array_depth = 1
+                elif (self.depth == 1 and self.mode == 'object' and c == b'['
+                      and not self.found and self.last_key in self.item_keys):
+                    self.array_depth = 2
+                    self.head = bytes(buf[:j])
+                self.depth += 1
+            elif c in (b'}', b']'):
+                self.depth -= 1
+                if self.item_start is not None and self.depth == self.array_depth:
+                    self._complete_item(self.pos, items)
+            elif c == b',':
+                if self.depth == 1 and self.mode == 'object':
+                    self.expect_key = True
+
+    def _compact(self):
+        """Drop bytes that can no longer be part of an item or the envelope"""
+        keep_envelope = self.mode in (None, 'object') and self.array_depth is None
+        if keep_envelope or self.key_start is not None:
+            return
+        start = self.item_start if self.item_start is not None else self.pos
+        if start:
+            del self.buf[:start]
+            self.pos -= start
+            if self.item_start is not None:
+                self.item_start = 0
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - MODULE REGISTRY
+Lazy index of every harvester and trainer provider module
+
+Importing a harvester or trainer module runs its module-level setup (an
+instance, log lines, sys.path changes), and there are hundreds of them. The
+registry instead reads a manifest generated by statically parsing each
+module for its get_harvester_class()/get_trainer_class() providers, and
+imports a module only when its class is first requested. The manifest is
+not checked in: it is built on first use and rebuilt with --build.
+
+    python module_registry.py --build       regenerate the manifest
+    python module_registry.py --benchmark   compare eager and lazy start-up
+"""
+
+import argparse
+import ast
+import hashlib
+import importlib.util
+import json
+import logging
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_MANIFEST = Path(__file__).resolve().parent / 'registry_manifest.json'
+
+# Top-level trees and the kind of module each holds
+TREES = {'Harvesters': 'harvester', 'Trainers': 'trainer'}
+
+PROVIDERS = ('get_harvester_class', 'get_trainer_class')
+
+MANIFEST_VERSION = 1
+
+
+def _provided_class(function: ast.FunctionDef) -> Optional[str]:
+    for node in ast.walk(function):
+        if isinstance(node, ast.Return) and isinstance(node.value, ast.Name):
+            return node.value.id
+    return None
+
+
+def _class_attributes(cls: ast.ClassDef) -> Dict[str, str]:
+    """String constants assigned to self.name/category/domain in __init__"""
+    attributes = {}
+    for node in cls.body:
+        if not (isinstance(node, ast.FunctionDef) and node.name == '__init__'):
+            continue
+        for statement in ast.walk(node):
+            if not (isinstance(statement, ast.Assign) and len(statement.targets) == 1):
+                continue
+            target = statement.targets[0]
+            if (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                    and target.value.id == 'self' and target.attr in ('name', 'category', 'domain')
+                    and isinstance(statement.value, ast.Constant)
+                    and isinstance(statement.value.value, str)):
+                attributes.setdefault(target.attr, statement.value.value)
+    return attributes
+
+
+def scan_module(path: Path, root: Path) -> Optional[Dict[str, Any]]:
+    """Manifest entry for a module, or None if it has no providers"""
+    source = path.read_bytes()
+    try:
+        tree = ast.parse(source, filename=str(path))
+    except (SyntaxError, ValueError) as e:
+        logger.warning(f"Skipping unparseable module {path}: {e}")
+        return None
+
+    providers = {
+        node.name: _provided_class(node) for node in tree.body
+        if isinstance(node, ast.FunctionDef) and node.name in PROVIDERS
+    }
+    if not providers:
+        return None
+
+    relative = path.relative_to(root)
+    classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+    provided = providers.get('get_trainer_class') if relative.parts[0] == 'Trainers' \
+        else providers.get('get_harvester_class')
+    provided = provided or next(iter(name for name in providers.values() if name), None)
+    attributes = _class_attributes(classes[provided]) if provided in classes else {}
+
+    return {
+        'id': relative.with_suffix('').as_posix().split('/', 1)[1],
+        'kind': TREES[relative.parts[0]],
+        'path': relative.as_posix(),
+        'domain': relative.parts[1] if len(relative.parts) > 2 else None,
+        'class': provided,
+        'harvester_class': providers.get('get_harvester_class'),
+        'trainer_class': providers.get('get_trainer_class'),
+        'name': attributes.get('name'),
+        'category': attributes.get('category', attributes.get('domain')),
+        'digest': _digest(source)
+    }
+
+
+def _digest(source: bytes) -> str:
+    return hashlib.blake2b(source, digest_size=8).hexdigest()
+
+
+def _loaded(path: Path):
+    """The module already imported from ``path``, under whatever name"""
+    for module in list(sys.modules.values()):
+        filename = getattr(module, '__file__', None)
+        if filename and Path(filename).resolve() == path:
+            return module
+    return None
+
+
+def _on_search_path(path: Path) -> bool:
+    """Whether ``path`` is importable as a top-level module by its own name"""
+    if not path.stem.isidentifier() or path.stem in sys.modules:
+        return False
+    return path.parent in {Path(entry or '.').resolve() for entry in sys.path}
+
+
+def build_manifest(root: Path = REPO_ROOT) -> Dict[str, Any]:
+    """Statically index every provider module under the Harvesters and Trainers trees"""
+    entries = []
+    for tree in TREES:
+        for path in sorted((root / tree).rglob('*.py')):
+            if '__pycache__' in path.parts:
+                continue
+            entry = scan_module(path, root)
+            if entry is not None:
+                entries.append(entry)
+    return {'version': MANIFEST_VERSION, 'generated_at': time.time(), 'modules': entries}
+
+
+class ModuleRegistry:
+    """Manifest-backed registry that imports provider modules on demand"""
+
+    def __init__(self, manifest_path: Optional[Path] = None, root: Optional[Path] = None):
+        self.manifest_path = Path(manifest_path) if manifest_path else DEFAULT_MANIFEST
+        self.root = Path(root) if root else REPO_ROOT
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._modules: Dict[str, Any] = {}
+        self.imports = 0
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Manifest entries keyed by '<kind>:<id>', built on first use if missing"""
+        if self._entries is None:
+            if self.manifest_path.exists():
+                manifest = json.loads(self.manifest_path.read_text())
+            else:
+                logger.info(f"No registry manifest at {self.manifest_path}, building one")
+                manifest = self.rebuild()
+            self._entries = {f"{entry['kind']}:{entry['id']}": entry for entry in manifest['modules']}
+        return self._entries
+
+    def rebuild(self) -> Dict[str, Any]:
+        """Regenerate and save the manifest"""
+        manifest = build_manifest(self.root)
+        tmp = self.manifest_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(manifest, indent=1))
+        tmp.replace(self.manifest_path)
+        self._entries = None
+        return manifest
+
+    def stale(self) -> List[str]:
+        """Ids of indexed modules changed on disk since the manifest was built"""
+        changed = []
+        for key, entry in self.entries.items():
+            try:
+                source = (self.root / entry['path']).read_bytes()
+            except FileNotFoundError:
+                changed.append(key)
+                continue
+            if _digest(source) != entry['digest']:
+                changed.append(key)
+        return changed
+
+    def harvesters(self, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._select('harvester', domain)
+
+    def trainers(self, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        return self._select('trainer', domain)
+
+    def _select(self, kind: str, domain: Optional[str]) -> List[Dict[str, Any]]:
+        return [
+            entry for entry in self.entries.values()
+            if entry['kind'] == kind and (domain is None or entry['domain'] == domain)
+        ]
+
+    def find(self, kind: str, name: str) -> Dict[str, Any]:
+        """Entry by id (e.g. 'Cybersecurity/cve_database_harvester') or unique class name"""
+        entry = self.entries.get(f"{kind}:{name}")
+        if entry is not None:
+            return entry
+        matches = [e for e in self.entries.values() if e['kind'] == kind and e['class'] == name]
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise KeyError(f"{name} is ambiguous; use one of {[e['id'] for e in matches]}")
+        raise KeyError(f"No {kind} named {name}")
+
+    def load_module(self, entry: Dict[str, Any]):
+        """Import an entry's module (once)
+
+        A module that is, or can be, imported normally (e.g. Core modules,
+        whose directory is on sys.path) is shared with that import so its
+        classes exist once; anything else is loaded under a name unique to
+        its path.
+        """
+        module = self._modules.get(entry['path'])
+        if module is None:
+            path = (self.root / entry['path']).resolve()
+            module = _loaded(path)
+            if module is None and _on_search_path(path):
+                module = importlib.import_module(path.stem)
+                self.imports += 1
+            if module is not None:
+                self._modules[entry['path']] = module
+                return module
+            module_name = 'echo_registry.' + entry['path'][:-3].replace('/', '.')
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            try:
+                spec.loader.exec_module(module)
+            except BaseException:
+                del sys.modules[module_name]
+                raise
+            self._modules[entry['path']] = module
+            self.imports += 1
+        return module
+
+    def get_harvester_class(self, name: str) -> type:
+        return self._provided(self.find('harvester', name), 'get_harvester_class')
+
+    def get_trainer_class(self, name: str) -> type:
+        return self._provided(self.find('trainer', name), 'get_trainer_class')
+
+    def _provided(self, entry: Dict[str, Any], provider: str) -> type:
+        return getattr(self.load_module(entry), provider)()
+
+    def get_status(self) -> Dict[str, Any]:
+        entries = self.entries.values()
+        return {
+            'manifest': str(self.manifest_path),
+            'harvesters': sum(1 for e in entries if e['kind'] == 'harvester'),
+            'trainers': sum(1 for e in entries if e['kind'] == 'trainer'),
+            'imported': self.imports
+        }
+
+
+# Process-wide registry
+shared_registry = ModuleRegistry()
+
+
+_EAGER = """
+import io, logging, sys, time
+sys.path.insert(0, {core!r})
+logging.basicConfig(level=logging.INFO, stream=io.StringIO())
+started = time.perf_counter()
+import module_registry
+registry = module_registry.ModuleRegistry({manifest!r})
+failed = 0
+for entry in list(registry.entries.values()):
+    try:
+        registry.load_module(entry)
+    except Exception:
+        failed += 1
+print(time.perf_counter() - started, registry.imports, failed)
+"""
+
+_LAZY = """
+import io, logging, sys, time
+sys.path.insert(0, {core!r})
+logging.basicConfig(level=logging.INFO, stream=io.StringIO())
+started = time.perf_counter()
+import module_registry
+registry = module_registry.ModuleRegistry({manifest!r})
+registry.harvesters()
+registry.get_harvester_class({target!r})
+print(time.perf_counter() - started, registry.imports, 0)
+"""
+
+
+def benchmark_imports(manifest: Path = DEFAULT_MANIFEST, target: str = 'Core/base_harvester',
+                      repeats: int = 3) -> Dict[str, Dict[str, float]]:
+    """Cold-start time importing every provider versus one through the registry
+
+    Each measurement runs in a fresh interpreter; the best of ``repeats``
+    is reported.
+    """
+    core = str(Path(__file__).resolve().parent)
+    results = {}
+    for label, template in (('eager', _EAGER), ('lazy', _LAZY)):
+        code = template.format(core=core, manifest=str(manifest), target=target)
+        runs = []
+        for _ in range(repeats):
+            output = subprocess.run(
+                [sys.executable, '-c', code], capture_output=True, text=True, check=True
+            ).stdout.split()
+            runs.append((float(output[0]), int(output[1]), int(output[2])))
+        seconds, imported, failed = min(runs)
+        results[label] = {'seconds': round(seconds, 3), 'modules_imported': imported, 'import_failures': failed}
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--build', action='store_true', help='regenerate the manifest')
+    parser.add_argument('--benchmark', action='store_true', help='compare eager and lazy cold start')
+    parser.add_argument('--manifest', type=Path, default=DEFAULT_MANIFEST)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    registry = ModuleRegistry(args.manifest)
+    if args.build:
+        manifest = registry.rebuild()
+        print(f"Indexed {len(manifest['modules'])} modules into {args.manifest}")
+    if args.benchmark:
+        print(json.dumps(benchmark_imports(args.manifest, repeats=args.repeats), indent=2))
+    if not (args.build or args.benchmark):
+        print(json.dumps(registry.get_status(), indent=2))
+        stale = registry.stale()
+        if stale:
+            print(f"{len(stale)} modules changed since the manifest was built; rerun with --build")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
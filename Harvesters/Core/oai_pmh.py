@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - OAI-PMH BULK INGEST
+Incremental arXiv metadata ingest through OAI-PMH ListRecords
+
+One pass walks ListRecords for a datestamp window, following resumption
+tokens, and fans each record out to every arXiv harvester whose subject or
+set filter matches (general, AI, and the two quantum collections), so the
+archive is read once instead of polled by each harvester. Responses are
+parsed as they stream in and each record element is discarded once read,
+so memory stays flat however large the window is.
+
+Long ranges are split into windows of ``window_days``. The end of each
+completed window is saved as a watermark, and the current resumption token
+is saved after every page, so an interrupted backfill resumes where it
+stopped and the next incremental run starts from the last watermark. A
+page's records enter the dedup index only after the sink has flushed them,
+so a crash never leaves records marked seen that were not stored.
+
+    python oai_pmh.py                          incremental pass since the last run
+    python oai_pmh.py --from 2015-01-01        backfill from a date
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+from circuit_breaker import RETRY_STATUSES, RetryPolicy, parse_retry_after
+from dedup_index import shared_dedup_index
+from harvest_item import HarvestItem
+from harvest_sink import HarvestSink
+from quality_scoring import BatchQualityScorer
+from rate_limiter import HostRateLimiter
+from session_pool import shared_session_pool
+from watermark_store import shared_watermark_store
+
+logger = logging.getLogger(__name__)
+
+ARXIV_OAI_URL = 'https://oaipmh.arxiv.org/oai'
+
+# arXiv asks harvesters for no more than one request every few seconds
+ARXIV_RATE_LIMIT = 1 / 3
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class OaiError(Exception):
+    """OAI-PMH error response other than noRecordsMatch"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+
+
+class OaiRecord:
+    """Header and the metadata fields the harvesters use of one record"""
+
+    __slots__ = ('identifier', 'datestamp', 'sets', 'deleted', 'record_id', 'title', 'abstract',
+                 'authors', 'subjects', 'published')
+
+    def __init__(self, identifier: str, datestamp: str, sets: List[str], deleted: bool = False):
+        self.identifier = identifier
+        self.datestamp = datestamp
+        self.sets = sets
+        self.deleted = deleted
+        self.record_id: Optional[str] = None
+        self.title: Optional[str] = None
+        self.abstract: Optional[str] = None
+        self.authors: List[str] = []
+        self.subjects: List[str] = []
+        self.published: Optional[str] = None
+
+    @property
+    def url(self) -> str:
+        record_id = self.record_id or self.identifier.rsplit(':', 1)[-1]
+        return f"https://arxiv.org/abs/{record_id}"
+
+    def to_raw_item(self) -> Dict[str, Any]:
+        """Raw-item view for quality scoring"""
+        return {
+            'title': self.title,
+            'content': self.abstract,
+            'author': ', '.join(self.authors) or None,
+            'published_date': self.published
+        }
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def _text(element: ET.Element) -> str:
+    return _WHITESPACE.sub(' ', ''.join(element.itertext())).strip()
+
+
+def _parse_record(element: ET.Element) -> Optional[OaiRecord]:
+    header = next((child for child in element if _local(child.tag) == 'header'), None)
+    if header is None:
+        return None
+    fields = {_local(child.tag): child for child in header}
+    record = OaiRecord(
+        identifier=_text(fields['identifier']) if 'identifier' in fields else '',
+        datestamp=_text(fields['datestamp']) if 'datestamp' in fields else '',
+        sets=[_text(child) for child in header if _local(child.tag) == 'setSpec'],
+        deleted=header.get('status') == 'deleted'
+    )
+
+    metadata = next((child for child in element if _local(child.tag) == 'metadata'), None)
+    if metadata is None:
+        return record
+    # Both the arXiv and the oai_dc metadata formats are understood
+    for node in metadata.iter():
+        name = _local(node.tag)
+        if name == 'id' and record.record_id is None:
+            record.record_id = _text(node)
+        elif name == 'title' and record.title is None:
+            record.title = _text(node)
+        elif name in ('abstract', 'description') and record.abstract is None:
+            record.abstract = _text(node)
+        elif name == 'categories':
+            record.subjects.extend(_text(node).split())
+        elif name == 'subject':
+            record.subjects.append(_text(node))
+        elif name == 'author':
+            parts = {_local(part.tag): _text(part) for part in node}
+            author = ' '.join(filter(None, (parts.get('forenames'), parts.get('keyname')))) or _text(node)
+            if author:
+                record.authors.append(author)
+        elif name == 'creator':
+            record.authors.append(_text(node))
+        elif name in ('created', 'date') and record.published is None:
+            record.published = _text(node)
+    return record
+
+
+class OaiPmhParser:
+    """Push parser turning ListRecords response chunks into records
+
+    Each record element is dropped from the tree as soon as it has been
+    read, so only the record being parsed is held in memory.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._container: Optional[ET.Element] = None
+        self.resumption_token: Optional[str] = None
+        self.complete_list_size: Optional[int] = None
+        self.error: Optional[Tuple[str, str]] = None
+
+    def feed(self, chunk: bytes) -> List[OaiRecord]:
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[OaiRecord]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[OaiRecord]:
+        records = []
+        for event, element in self._parser.read_events():
+            name = _local(element.tag)
+            if event == 'start':
+                if name == 'ListRecords':
+                    self._container = element
+                continue
+            if name == 'record' and self._container is not None:
+                record = _parse_record(element)
+                if record is not None:
+                    records.append(record)
+                self._container.clear()
+            elif name == 'resumptionToken':
+                self.resumption_token = (element.text or '').strip() or None
+                size = element.get('completeListSize')
+                self.complete_list_size = int(size) if size and size.isdigit() else None
+            elif name == 'error':
+                self.error = (element.get('code', 'unknown'), _text(element))
+        return records
+
+
+class ArxivRoute:
+    """An arXiv harvester and the records it takes"""
+
+    __slots__ = ('source', 'category', 'subjects', 'sets', 'scorer')
+
+    def __init__(self, source: str, category: str, subjects: Optional[Iterable[str]] = None,
+                 sets: Optional[Iterable[str]] = None):
+        # Catalog id of the harvester the items are attributed to
+        self.source = source
+        self.category = category
+        self.subjects = tuple(subjects) if subjects else ()
+        self.sets = tuple(sets) if sets else ()
+        self.scorer = BatchQualityScorer.for_category(category)
+
+    def matches(self, record: OaiRecord) -> bool:
+        """Whether a record belongs to this harvester; no filters takes everything"""
+        if not (self.subjects or self.sets):
+            return True
+        for subject in record.subjects:
+            if any(subject == prefix or subject.startswith(prefix + '.') for prefix in self.subjects):
+                return True
+        return any(spec == wanted or spec.startswith(wanted + ':') for spec in record.sets for wanted in self.sets)
+
+
+ARXIV_ROUTES = (
+    ArxivRoute('Academic_Papers/arxiv_general', 'Academic_Papers'),
+    ArxivRoute('AI_Research/arxiv_ai', 'AI_Research',
+               subjects=('cs.AI', 'cs.LG', 'cs.CL', 'cs.CV', 'cs.NE', 'cs.MA', 'stat.ML')),
+    ArxivRoute('Quantum/quantum_arxiv', 'Quantum', subjects=('quant-ph',), sets=('physics:quant-ph',)),
+    ArxivRoute('Quantum_Computing/quantum_arxiv', 'Quantum_Computing',
+               subjects=('quant-ph', 'cs.ET'), sets=('physics:quant-ph',)),
+)
+
+
+def _day(value: str) -> date:
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class ArxivBulkIngest:
+    """Windowed, resumable ListRecords walk fanned out to arXiv harvesters"""
+
+    def __init__(self, base_url: str = ARXIV_OAI_URL, metadata_prefix: str = 'arXiv',
+                 set_spec: Optional[str] = None, routes: Iterable[ArxivRoute] = ARXIV_ROUTES,
+                 sink: Optional[HarvestSink] = None, window_days: int = 30,
+                 rate_limit: float = ARXIV_RATE_LIMIT, chunk_size: int = 64 * 1024):
+        self.name = 'arxiv_oai'
+        self.base_url = base_url
+        self.metadata_prefix = metadata_prefix
+        self.set_spec = set_spec
+        self.routes = list(routes)
+        self.sink = sink if sink is not None else HarvestSink()
+        self.window_days = max(1, window_days)
+        self.chunk_size = chunk_size
+        self.host_limiter = HostRateLimiter(rate_limit)
+        # OAI servers throttle with 503 + Retry-After, so allow long waits
+        self.retry_policy = RetryPolicy(max_attempts=6, base_delay=5.0, max_delay=300.0)
+        self.dedup = shared_dedup_index
+        self.watermarks = shared_watermark_store
+        self.session = None
+
+        self.pages = 0
+        self.records = 0
+        self.deleted = 0
+        self.duplicates = 0
+        self.routed: Dict[str, int] = {route.source: 0 for route in self.routes}
+        self.last_harvest = None
+
+    @property
+    def target(self) -> str:
+        """Watermark key for this endpoint and set"""
+        return f"{self.base_url}#{self.set_spec or '*'}"
+
+    async def __aenter__(self):
+        self.session = await shared_session_pool.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.session:
+            self.session = None
+            await shared_session_pool.release()
+
+    def windows(self, start: date, end: date) -> List[Tuple[str, str]]:
+        """Inclusive (from, until) day ranges covering start..end"""
+        windows = []
+        while start <= end:
+            until = min(end, start + timedelta(days=self.window_days - 1))
+            windows.append((start.isoformat(), until.isoformat()))
+            start = until + timedelta(days=1)
+        return windows
+
+    async def run(self, from_date: Optional[str] = None, until_date: Optional[str] = None) -> Dict[str, Any]:
+        """Ingest from ``from_date`` (default: the last watermark) through ``until_date`` (default: today)"""
+        until = _day(until_date) if until_date else datetime.now(timezone.utc).date()
+        resume = self.watermarks.get(self.name, self.target + '#resume')
+        if from_date:
+            start = _day(from_date)
+        elif resume:
+            start = _day(resume['from'])
+        else:
+            watermark = self.watermarks.get(self.name, self.target)
+            # The watermark day is re-read: records can still be stamped with it after a run
+            start = _day(watermark) if watermark else until - timedelta(days=1)
+
+        for window_from, window_until in self.windows(start, until):
+            token = None
+            if resume and resume['from'] == window_from and resume['until'] == window_until:
+                token = resume.get('token')
+            await self._ingest_window(window_from, window_until, token)
+            resume = None
+            self.watermarks.set(self.name, self.target, window_until)
+        self.dedup.flush()
+        await self.sink.aflush()
+        self.last_harvest = datetime.now().isoformat()
+        return self.get_status()
+
+    async def _ingest_window(self, window_from: str, window_until: str, token: Optional[str]):
+        logger.info(f"OAI-PMH window {window_from}..{window_until}" + (" (resuming)" if token else ""))
+        resume_key = self.target + '#resume'
+        while True:
+            if token:
+                params = {'verb': 'ListRecords', 'resumptionToken': token}
+            else:
+                params = {'verb': 'ListRecords', 'metadataPrefix': self.metadata_prefix,
+                          'from': window_from, 'until': window_until}
+                if self.set_spec:
+                    params['set'] = self.set_spec
+            try:
+                token = await self._fetch_page(params)
+            except OaiError as e:
+                if e.code == 'badResumptionToken' and 'resumptionToken' in params:
+                    logger.warning("Resumption token expired, restarting window")
+                    token = None
+                    continue
+                raise
+            # The token moves past this page only once its items are stored
+            await self._checkpoint()
+            if token is None:
+                break
+            self.watermarks.set(self.name, resume_key,
+                                {'from': window_from, 'until': window_until, 'token': token})
+        self.watermarks.set(self.name, resume_key, None)
+
+    async def _checkpoint(self):
+        """Make written items durable, then record them in the dedup index"""
+        keys = self.dedup.deferred()
+        await self.sink.aflush()
+        self.dedup.persist(keys)
+
+    async def _fetch_page(self, params: Dict[str, str]) -> Optional[str]:
+        """Fetch, parse and fan out one ListRecords response; returns the next resumption token"""
+        delay = self.retry_policy.base_delay
+        for attempt in range(self.retry_policy.max_attempts):
+            await self.host_limiter.acquire(self.base_url)
+            retry_after = None
+            try:
+                async with self.session.get(self.base_url, params=params) as response:
+                    if response.status in RETRY_STATUSES:
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                        logger.warning(f"OAI-PMH HTTP {response.status} (attempt {attempt + 1})")
+                    elif response.status != 200:
+                        raise OaiError(f"HTTP {response.status}", await response.text())
+                    else:
+                        return await self._consume(response)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"OAI-PMH request error (attempt {attempt + 1}): {e!r}")
+            if attempt + 1 < self.retry_policy.max_attempts:
+                delay = self.retry_policy.next_delay(delay, retry_after)
+                if delay is None:
+                    raise OaiError('unavailable', f"{self.base_url} asked to retry after {retry_after:.0f}s")
+                await asyncio.sleep(delay)
+        raise OaiError('unavailable', f"{self.base_url} failed after {self.retry_policy.max_attempts} attempts")
+
+    async def _consume(self, response) -> Optional[str]:
+        parser = OaiPmhParser()
+        async for chunk in response.content.iter_chunked(self.chunk_size):
+            records = parser.feed(chunk)
+            if records:
+                self._fan_out(records)
+        self._fan_out(parser.close())
+        self.pages += 1
+
+        if parser.error is not None:
+            code, message = parser.error
+            if code == 'noRecordsMatch':
+                return None
+            raise OaiError(code, message)
+        if parser.complete_list_size is not None:
+            logger.info(f"OAI-PMH page {self.pages}: {self.records}/{parser.complete_list_size} records")
+        return parser.resumption_token
+
+    def _fan_out(self, records: List[OaiRecord]):
+        """Deduplicate records once, then hand each to every matching route"""
+        live = []
+        for record in records:
+            self.records += 1
+            if record.deleted or not record.abstract:
+                self.deleted += record.deleted
+                continue
+            live.append(record)
+        if not live:
+            return
+
+        harvested_ns = time.time_ns()
+        # One identity per paper, independent of which harvesters take it
+        primary = [
+            HarvestItem(record.abstract, record.title or 'Untitled', record.url, 'arXiv',
+                        self.name, harvested_ns, 0.0)
+            for record in live
+        ]
+        admitted = {item.url for item in self.dedup.admit(primary, defer=True)}
+        self.duplicates += len(live) - len(admitted)
+        live = [record for record in live if record.url in admitted]
+
+        for route in self.routes:
+            matched = [record for record in live if route.matches(record)]
+            if not matched:
+                continue
+            scores = route.scorer.score([record.to_raw_item() for record in matched])
+            self.sink.write(
+                HarvestItem(record.abstract, record.title or 'Untitled', record.url, route.category,
+                            route.source, harvested_ns, score)
+                for record, score in zip(matched, scores.tolist())
+            )
+            self.routed[route.source] += len(matched)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'target': self.target,
+            'watermark': self.watermarks.get(self.name, self.target),
+            'pages': self.pages,
+            'records': self.records,
+            'deleted': self.deleted,
+            'duplicates': self.duplicates,
+            'routed': dict(self.routed),
+            'sink': self.sink.get_status(),
+            'last_harvest': self.last_harvest
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--from', dest='from_date', help='first datestamp day (YYYY-MM-DD)')
+    parser.add_argument('--until', dest='until_date', help='last datestamp day (default: today)')
+    parser.add_argument('--set', dest='set_spec', help='restrict to one OAI set, e.g. cs')
+    parser.add_argument('--url', default=ARXIV_OAI_URL)
+    parser.add_argument('--prefix', default='arXiv', help='metadataPrefix (arXiv or oai_dc)')
+    parser.add_argument('--window-days', type=int, default=30)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def run():
+        async with ArxivBulkIngest(args.url, args.prefix, args.set_spec, window_days=args.window_days) as ingest:
+            return await ingest.run(args.from_date, args.until_date)
+
+    print(json.dumps(asyncio.run(run()), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - PAGINATION
+Follow paged API results with concurrent page prefetch
+
+Configured per harvester through ``api_config['pagination']``:
+
+    {'scheme': 'link'}                              RFC 8288 Link: <...>; rel="next"
+    {'scheme': 'cursor', 'param': 'cursor',         next-page token from a body field
+     'field': 'meta.next_cursor'}                   (dotted path) or a response header
+    {'scheme': 'offset', 'param': 'offset',         offset/limit windows
+     'limit_param': 'limit', 'page_size': 100}
+    {'scheme': 'page', 'param': 'page',             numbered pages
+     'start': 1, 'page_size': 100}
+
+Offset and page URLs are known in advance, so up to ``prefetch`` pages are
+fetched ahead of the one being processed. Link and header-cursor pages start
+the next request as soon as the current page's headers arrive, overlapping
+it with parsing of the current body. Every scheme stops after ``max_pages``.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from json_stream import lookup_path
+
+logger = logging.getLogger(__name__)
+
+SCHEMES = ('link', 'cursor', 'offset', 'page')
+
+_LINK = re.compile(r'<([^>]*)>\s*((?:;\s*[^;,]+)*)')
+_REL_NEXT = re.compile(r'rel\s*=\s*"?([^";]*)"?', re.IGNORECASE)
+
+
+class Page:
+    """Items from one page and the URL of the page after it, if any"""
+
+    __slots__ = ('items', 'next_url')
+
+    def __init__(self, items: List[Any], next_url: Optional[str] = None):
+        self.items = items
+        self.next_url = next_url
+
+
+# fetch(url, on_next) -> Page, or None if the page failed. on_next may be
+# called with the next page's URL before the page body has been parsed.
+PageFetcher = Callable[[str, Optional[Callable[[str], None]]], Awaitable[Optional[Page]]]
+
+
+def with_params(url: str, params: Dict[str, Any]) -> str:
+    """URL with the given query parameters set, replacing existing values"""
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if key not in params]
+    query.extend((key, str(value)) for key, value in params.items())
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def next_link(url: str, header: Optional[str]) -> Optional[str]:
+    """Absolute rel="next" URL from a Link header"""
+    if not header:
+        return None
+    for match in _LINK.finditer(header):
+        rel = _REL_NEXT.search(match.group(2))
+        if rel and 'next' in rel.group(1).lower().split():
+            return urljoin(url, match.group(1))
+    return None
+
+
+class Pagination:
+    """One harvester's pagination scheme"""
+
+    def __init__(self, scheme: str, param: Optional[str] = None, field: Optional[str] = None,
+                 header: Optional[str] = None, limit_param: Optional[str] = None,
+                 page_size: int = 100, start: Optional[int] = None, max_pages: int = 10,
+                 prefetch: int = 4):
+        if scheme not in SCHEMES:
+            raise ValueError(f"Unknown pagination scheme {scheme!r}; expected one of {SCHEMES}")
+        self.scheme = scheme
+        self.param = param or {'cursor': 'cursor', 'offset': 'offset', 'page': 'page'}.get(scheme)
+        self.field = field or 'next_cursor'
+        self.header = header
+        self.limit_param = limit_param
+        self.page_size = page_size
+        self.start = start if start is not None else (1 if scheme == 'page' else 0)
+        self.max_pages = max(1, max_pages)
+        self.prefetch = max(0, prefetch)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['Pagination']:
+        return cls(**config) if config else None
+
+    @property
+    def predictable(self) -> bool:
+        """Whether page URLs can be generated without seeing earlier pages"""
+        return self.scheme in ('offset', 'page')
+
+    def page_url(self, url: str, index: int) -> str:
+        """URL of the index-th page (0-based) of an offset or page scheme"""
+        step = self.page_size if self.scheme == 'offset' else 1
+        params = {self.param: self.start + index * step}
+        if self.limit_param:
+            params[self.limit_param] = self.page_size
+        return with_params(url, params)
+
+    def next_from_headers(self, url: str, headers) -> Optional[str]:
+        """Next page URL if the response headers already say where it is"""
+        if self.scheme == 'link':
+            return next_link(url, headers.get('Link'))
+        if self.scheme == 'cursor' and self.header:
+            token = headers.get(self.header)
+            return with_params(url, {self.param: token}) if token else None
+        return None
+
+    def next_from_body(self, url: str, envelope: Dict[str, Any], count: int) -> Optional[str]:
+        """Next page URL once the body has been parsed
+
+        ``count`` is the number of raw items on the page; a short page is
+        the last one of an offset or page scheme.
+        """
+        if self.predictable:
+            if count < self.page_size:
+                return None
+            current = dict(parse_qsl(urlsplit(url).query)).get(self.param)
+            step = self.page_size if self.scheme == 'offset' else 1
+            try:
+                position = int(current) + step if current is not None else self.start + step
+            except ValueError:
+                return None
+            params = {self.param: position}
+            if self.limit_param:
+                params[self.limit_param] = self.page_size
+            return with_params(url, params)
+        if self.scheme == 'cursor' and not self.header:
+            token = lookup_path(envelope, self.field)
+            if token in (None, ''):
+                return None
+            return with_params(url, {self.param: token})
+        return None
+
+    async def walk(self, fetch: PageFetcher, url: str) -> Tuple[List[Any], bool]:
+        """Fetch pages from ``url`` onward; returns (items, completed)
+
+        ``completed`` is False if a page failed, in which case the items of
+        the pages before it are still returned.
+        """
+        if self.predictable:
+            return await self._walk_window(fetch, url)
+        return await self._walk_chain(fetch, url)
+
+    async def _walk_window(self, fetch: PageFetcher, url: str) -> Tuple[List[Any], bool]:
+        items = []
+        tasks: Dict[int, asyncio.Future] = {}
+        scheduled = 0
+        index = 0
+        try:
+            while index < self.max_pages:
+                while scheduled < min(self.max_pages, index + 1 + self.prefetch):
+                    tasks[scheduled] = asyncio.ensure_future(fetch(self.page_url(url, scheduled), None))
+                    scheduled += 1
+                page = await tasks.pop(index)
+                index += 1
+                if page is None:
+                    return items, False
+                items.extend(page.items)
+                if page.next_url is None:
+                    break
+            return items, True
+        finally:
+            await _cancel(tasks.values())
+
+    async def _walk_chain(self, fetch: PageFetcher, url: str) -> Tuple[List[Any], bool]:
+        items = []
+        tasks: List[asyncio.Future] = []
+        seen = set()
+
+        def start(next_url: Optional[str]):
+            if next_url and next_url not in seen and len(tasks) < self.max_pages:
+                seen.add(next_url)
+                tasks.append(asyncio.ensure_future(fetch(next_url, start)))
+
+        start(url)
+        index = 0
+        try:
+            while index < len(tasks):
+                page = await tasks[index]
+                index += 1
+                if page is None:
+                    return items, False
+                items.extend(page.items)
+                if index == len(tasks):
+                    start(page.next_url)
+            return items, True
+        finally:
+            await _cancel(tasks[index:])
+
+
+async def _cancel(tasks):
+    """Cancel prefetched pages that are no longer needed"""
+    tasks = [task for task in tasks if not task.done()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
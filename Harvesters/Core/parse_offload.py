@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - PARSE OFFLOAD
+Process-pool parsing and scoring of large harvester payloads
+
+Bodies above a size threshold are handed to a shared ProcessPoolExecutor as
+raw bytes. Workers decode, parse, extract and score them, and send back
+compact records rather than the parsed documents, so the event loop only
+checks dedup keys and builds items while other cores do the heavy lifting.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from html_text import ExtractedText, extract_html
+from json_stream import map_fields
+from quality_scoring import BatchQualityScorer
+
+logger = logging.getLogger(__name__)
+
+# Bodies at least this large are parsed off the event loop
+DEFAULT_OFFLOAD_BYTES = 1024 * 1024
+
+ITEM_KEYS = ('results', 'items', 'data')
+
+
+class ParsedPayload:
+    """Compact result of parsing one JSON body in a worker"""
+
+    __slots__ = ('records', 'raw_count', 'envelope', 'cursor_values')
+
+    def __init__(self, records: List[Tuple[str, str, str, float]], raw_count: int,
+                 envelope: Dict[str, Any], cursor_values: List[Any]):
+        # (content, title, url, quality_score) per candidate item
+        self.records = records
+        self.raw_count = raw_count
+        self.envelope = envelope
+        self.cursor_values = cursor_values
+
+
+def parse_json_payload(body: bytes, source: str, scoring_table: Dict[str, Any],
+                       cursor_field: Optional[str] = None, item_keys=ITEM_KEYS,
+                       fields: Optional[Dict[str, Any]] = None) -> ParsedPayload:
+    """Parse, extract and score a JSON body (runs in a worker process)"""
+    data = json.loads(body)
+    envelope = {}
+    if isinstance(data, dict):
+        envelope = data
+        key = next((k for k in item_keys if isinstance(data.get(k), list)), None)
+        if key is not None:
+            batch = data[key]
+            envelope = {**data, key: None}
+        else:
+            key = next((k for k in item_keys if k in data), None)
+            batch = data[key] if key is not None else [data]
+    else:
+        batch = data
+    if not isinstance(batch, list):
+        batch = [batch]
+
+    cursor_values = []
+    if cursor_field:
+        cursor_values = [item[cursor_field] for item in batch
+                         if isinstance(item, dict) and item.get(cursor_field) is not None]
+    if fields:
+        batch = [map_fields(item, fields) if isinstance(item, dict) else item for item in batch]
+
+    candidates = []
+    for item in batch:
+        if not isinstance(item, dict):
+            continue
+        content = str(item.get('content', item.get('description', '')))
+        if content:
+            candidates.append((item, content))
+
+    scores = BatchQualityScorer(scoring_table).score([item for item, _ in candidates])
+    records = [
+        (
+            content,
+            str(item.get('title', item.get('name', 'Untitled'))),
+            str(item.get('url', item.get('link', source))),
+            score
+        )
+        for (item, content), score in zip(candidates, scores.tolist())
+    ]
+    return ParsedPayload(records, len(batch), envelope, cursor_values)
+
+
+def decode_text_payload(body: bytes, encoding: Optional[str], limit: int = 1000) -> Tuple[str, int]:
+    """Decode a text body, returning its first ``limit`` characters and full length"""
+    text = body.decode(encoding or 'utf-8', errors='replace')
+    return text[:limit], len(text)
+
+
+def extract_html_payload(body: bytes, encoding: Optional[str]) -> ExtractedText:
+    """Strip an HTML body down to its main-content text"""
+    return extract_html(body, encoding)
+
+
+class ParseOffload:
+    """Lazily started process pool shared by every harvester"""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.submitted = 0
+        self.bytes_offloaded = 0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"Parse offload pool started with {self.max_workers} workers")
+        return self._executor
+
+    async def run(self, fn, body: bytes, *args):
+        """Run ``fn(body, *args)`` in the pool and await its result"""
+        self.submitted += 1
+        self.bytes_offloaded += len(body)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, body, *args)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'workers': self.max_workers,
+            'started': self._executor is not None,
+            'submitted': self.submitted,
+            'bytes_offloaded': self.bytes_offloaded
+        }
+
+
+# Process-wide pool
+shared_parse_offload = ParseOffload()
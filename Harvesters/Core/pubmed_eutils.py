@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - PUBMED E-UTILITIES INGEST
+Batched PubMed ingest through the Entrez history server
+
+An esearch with ``usehistory=y`` leaves the matching PMIDs on NCBI's history
+server, and efetch then pulls the records in windows of ``batch_size`` by
+``retstart``, several windows at a time under the NCBI request rate (3/s, or
+10/s with an API key). Each efetch response is parsed as it streams in and
+every PubmedArticle is turned into a harvest item and dropped, so a refresh
+of tens of thousands of records takes a few dozen requests in flat memory.
+
+ESearch exposes at most 10,000 records of one search, so a date range that
+matches more is split in half until each part fits. The last ingested day is
+kept as a watermark per query for the next incremental run. A window's
+records enter the dedup index only after the sink has flushed them, so a
+run that dies part way leaves nothing marked seen that was not stored.
+
+    python pubmed_eutils.py --term "neoplasms[mesh]" --from 2024/01/01
+    python pubmed_eutils.py --url http://127.0.0.1:8080 --term test   local fixture server
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from circuit_breaker import RETRY_STATUSES, RetryPolicy, parse_retry_after
+from dedup_index import shared_dedup_index
+from harvest_item import HarvestItem
+from harvest_sink import HarvestSink
+from quality_scoring import BatchQualityScorer
+from rate_limiter import HostRateLimiter
+from session_pool import shared_session_pool
+from watermark_store import shared_watermark_store
+
+logger = logging.getLogger(__name__)
+
+EUTILS_URL = 'https://eutils.ncbi.nlm.nih.gov/entrez/eutils'
+
+# NCBI request limits per second without and with an API key
+RATE_LIMIT = 3
+RATE_LIMIT_WITH_KEY = 10
+
+# Records one search can expose through esearch/efetch
+MAX_SEARCH_RECORDS = 10_000
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class EutilsError(Exception):
+    """E-utilities request that failed or returned an error document"""
+
+
+class PubmedRecord:
+    """Fields of one PubmedArticle used for harvest items"""
+
+    __slots__ = ('pmid', 'title', 'abstract', 'journal', 'authors', 'published', 'doi', 'mesh')
+
+    def __init__(self, pmid: str):
+        self.pmid = pmid
+        self.title: Optional[str] = None
+        self.abstract: Optional[str] = None
+        self.journal: Optional[str] = None
+        self.authors: List[str] = []
+        self.published: Optional[str] = None
+        self.doi: Optional[str] = None
+        self.mesh: List[str] = []
+
+    @property
+    def url(self) -> str:
+        return f"https://pubmed.ncbi.nlm.nih.gov/{self.pmid}/"
+
+    def to_raw_item(self) -> Dict[str, Any]:
+        """Raw-item view for quality scoring"""
+        return {
+            'title': self.title,
+            'content': self.abstract,
+            'author': ', '.join(self.authors) or None,
+            'published_date': self.published
+        }
+
+
+def _text(element: Optional[ET.Element]) -> Optional[str]:
+    if element is None:
+        return None
+    return _WHITESPACE.sub(' ', ''.join(element.itertext())).strip() or None
+
+
+def _parse_article(element: ET.Element) -> Optional[PubmedRecord]:
+    citation = element.find('MedlineCitation')
+    if citation is None:
+        return None
+    pmid = _text(citation.find('PMID'))
+    article = citation.find('Article')
+    if not pmid or article is None:
+        return None
+
+    record = PubmedRecord(pmid)
+    record.title = _text(article.find('ArticleTitle'))
+    sections = []
+    for part in article.iterfind('Abstract/AbstractText'):
+        text = _text(part)
+        if text:
+            label = part.get('Label')
+            sections.append(f"{label}: {text}" if label else text)
+    record.abstract = '\n'.join(sections) or None
+    record.journal = _text(article.find('Journal/Title'))
+
+    pub_date = article.find('Journal/JournalIssue/PubDate')
+    if pub_date is not None:
+        medline_date = _text(pub_date.find('MedlineDate'))
+        parts = [_text(pub_date.find(name)) for name in ('Year', 'Month', 'Day')]
+        record.published = '-'.join(part for part in parts if part) or medline_date
+
+    for author in article.iterfind('AuthorList/Author'):
+        name = ' '.join(filter(None, (_text(author.find('ForeName')), _text(author.find('LastName')))))
+        name = name or _text(author.find('CollectiveName'))
+        if name:
+            record.authors.append(name)
+    for identifier in element.iterfind('PubmedData/ArticleIdList/ArticleId'):
+        if identifier.get('IdType') == 'doi':
+            record.doi = _text(identifier)
+    record.mesh = [name for name in (_text(heading) for heading in
+                                     citation.iterfind('MeshHeadingList/MeshHeading/DescriptorName')) if name]
+    return record
+
+
+class PubmedArticleParser:
+    """Push parser turning efetch XML chunks into records, one article in memory at a time"""
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._root: Optional[ET.Element] = None
+        self.error: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> List[PubmedRecord]:
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> List[PubmedRecord]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> List[PubmedRecord]:
+        records = []
+        for event, element in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = element
+                continue
+            if element.tag in ('PubmedArticle', 'PubmedBookArticle'):
+                record = _parse_article(element) if element.tag == 'PubmedArticle' else None
+                if record is not None:
+                    records.append(record)
+                self._root.clear()
+            elif element.tag == 'ERROR':
+                self.error = _text(element)
+        return records
+
+
+def _day(value: str) -> date:
+    return datetime.strptime(value.replace('-', '/'), '%Y/%m/%d').date()
+
+
+def _eutils_date(day: date) -> str:
+    return day.strftime('%Y/%m/%d')
+
+
+class PubmedIngest:
+    """esearch-with-history plus windowed concurrent efetch for one query"""
+
+    def __init__(self, term: str, source: str = 'Academic_Papers/pubmed', category: Optional[str] = None,
+                 base_url: str = EUTILS_URL, api_key: Optional[str] = None, batch_size: int = 5000,
+                 concurrency: int = 3, date_type: str = 'edat', sink: Optional[HarvestSink] = None,
+                 tool: str = 'echo-prime-harvester', email: Optional[str] = None,
+                 chunk_size: int = 64 * 1024):
+        self.name = 'pubmed_eutils'
+        self.term = term
+        # Catalog id of the harvester the items are attributed to
+        self.source = source
+        self.category = category or source.split('/', 1)[0]
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key if api_key is not None else os.environ.get('NCBI_API_KEY')
+        self.batch_size = min(batch_size, MAX_SEARCH_RECORDS)
+        self.concurrency = max(1, concurrency)
+        self.date_type = date_type
+        self.tool = tool
+        self.email = email or os.environ.get('NCBI_EMAIL')
+        self.chunk_size = chunk_size
+        self.sink = sink if sink is not None else HarvestSink()
+
+        self.host_limiter = HostRateLimiter(RATE_LIMIT_WITH_KEY if self.api_key else RATE_LIMIT)
+        self.retry_policy = RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=60.0)
+        self.scorer = BatchQualityScorer.for_category(self.category)
+        self.dedup = shared_dedup_index
+        self.watermarks = shared_watermark_store
+        self.session = None
+
+        self.searches = 0
+        self.fetches = 0
+        self.records = 0
+        self.accepted = 0
+        self.last_harvest = None
+
+    @property
+    def target(self) -> str:
+        """Watermark key for this query"""
+        return f"{self.base_url}#{self.term}"
+
+    async def __aenter__(self):
+        self.session = await shared_session_pool.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self.session:
+            self.session = None
+            await shared_session_pool.release()
+
+    def _params(self, **params) -> Dict[str, Any]:
+        params = {'db': 'pubmed', 'tool': self.tool, **params}
+        if self.email:
+            params['email'] = self.email
+        if self.api_key:
+            params['api_key'] = self.api_key
+        return params
+
+    async def run(self, from_date: Optional[str] = None, until_date: Optional[str] = None) -> Dict[str, Any]:
+        """Ingest records dated ``from_date`` (default: the last watermark) through ``until_date`` (default: today)"""
+        until = _day(until_date) if until_date else datetime.now(timezone.utc).date()
+        if from_date:
+            start = _day(from_date)
+        else:
+            watermark = self.watermarks.get(self.name, self.target)
+            start = _day(watermark) if watermark else until - timedelta(days=1)
+
+        await self._ingest_range(start, until)
+        self.watermarks.set(self.name, self.target, _eutils_date(until))
+        self.dedup.flush()
+        await self.sink.aflush()
+        self.last_harvest = datetime.now().isoformat()
+        return self.get_status()
+
+    async def _ingest_range(self, start: date, end: date):
+        count, web_env, query_key = await self._search(start, end)
+        if count > MAX_SEARCH_RECORDS and start < end:
+            middle = start + (end - start) // 2
+            logger.info(f"{count} records in {start}..{end}, splitting at {middle}")
+            await self._ingest_range(start, middle)
+            await self._ingest_range(middle + timedelta(days=1), end)
+            return
+        if count > MAX_SEARCH_RECORDS:
+            logger.warning(f"{count} records on {start}; only the first {MAX_SEARCH_RECORDS} are reachable")
+            count = MAX_SEARCH_RECORDS
+        if not count:
+            return
+
+        logger.info(f"Fetching {count} records for {start}..{end} in batches of {self.batch_size}")
+        windows = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(retstart: int):
+            async with windows:
+                await self._fetch_window(web_env, query_key, retstart)
+                await self._checkpoint()
+
+        tasks = [asyncio.ensure_future(fetch(retstart)) for retstart in range(0, count, self.batch_size)]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            # One failed window ends the range; the others are not left running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _search(self, start: date, end: date):
+        """Run esearch with usehistory; returns (count, WebEnv, query_key)"""
+        params = self._params(
+            term=self.term, usehistory='y', retmax=0, retmode='json', datetype=self.date_type,
+            mindate=_eutils_date(start), maxdate=_eutils_date(end)
+        )
+        async with await self._request('esearch.fcgi', params) as response:
+            document = await response.json(content_type=None)
+        self.searches += 1
+        result = document.get('esearchresult', {})
+        if 'ERROR' in result or 'webenv' not in result:
+            raise EutilsError(f"esearch failed: {result.get('ERROR') or document}")
+        return int(result.get('count', 0)), result['webenv'], result['querykey']
+
+    async def _fetch_window(self, web_env: str, query_key: str, retstart: int):
+        params = self._params(
+            WebEnv=web_env, query_key=query_key, retstart=retstart, retmax=self.batch_size, retmode='xml'
+        )
+        delay = self.retry_policy.base_delay
+        for attempt in range(self.retry_policy.max_attempts):
+            try:
+                async with await self._request('efetch.fcgi', params) as response:
+                    parser = PubmedArticleParser()
+                    async for chunk in response.content.iter_chunked(self.chunk_size):
+                        records = parser.feed(chunk)
+                        if records:
+                            self._accept(records)
+                    self._accept(parser.close())
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                # The body broke off; records already accepted are dropped as duplicates on the retry
+                if attempt + 1 >= self.retry_policy.max_attempts:
+                    raise EutilsError(f"efetch body at retstart={retstart} failed: {e!r}") from e
+                logger.warning(f"efetch body error at retstart={retstart} (attempt {attempt + 1}): {e!r}")
+                delay = self.retry_policy.next_delay(delay)
+                await asyncio.sleep(delay)
+        self.fetches += 1
+        if parser.error:
+            raise EutilsError(f"efetch failed at retstart={retstart}: {parser.error}")
+
+    async def _checkpoint(self):
+        """Make written items durable, then record them in the dedup index"""
+        keys = self.dedup.deferred()
+        await self.sink.aflush()
+        self.dedup.persist(keys)
+
+    async def _request(self, utility: str, params: Dict[str, Any]):
+        """Issue a rate-limited GET with retries; returns the response to use as a context manager"""
+        url = f"{self.base_url}/{utility}"
+        delay = self.retry_policy.base_delay
+        for attempt in range(self.retry_policy.max_attempts):
+            await self.host_limiter.acquire(url)
+            retry_after = None
+            try:
+                response = await self.session.get(url, params=params)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"{utility} request error (attempt {attempt + 1}): {e!r}")
+            else:
+                if response.status == 200:
+                    return response
+                body = await response.text()
+                response.release()
+                if response.status not in RETRY_STATUSES:
+                    raise EutilsError(f"{utility} HTTP {response.status}: {body[:200]}")
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                logger.warning(f"{utility} HTTP {response.status} (attempt {attempt + 1})")
+            if attempt + 1 < self.retry_policy.max_attempts:
+                delay = self.retry_policy.next_delay(delay, retry_after)
+                if delay is None:
+                    raise EutilsError(f"{utility} asked to retry after {retry_after:.0f}s")
+                await asyncio.sleep(delay)
+        raise EutilsError(f"{utility} failed after {self.retry_policy.max_attempts} attempts")
+
+    def _accept(self, records: List[PubmedRecord]):
+        self.records += len(records)
+        records = [record for record in records if record.abstract]
+        if not records:
+            return
+        harvested_ns = time.time_ns()
+        scores = self.scorer.score([record.to_raw_item() for record in records])
+        items = [
+            HarvestItem(record.abstract, record.title or 'Untitled', record.url, self.category,
+                        self.source, harvested_ns, score)
+            for record, score in zip(records, scores.tolist())
+        ]
+        accepted = self.dedup.admit(items, defer=True)
+        self.sink.write(accepted)
+        self.accepted += len(accepted)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'term': self.term,
+            'source': self.source,
+            'watermark': self.watermarks.get(self.name, self.target),
+            'searches': self.searches,
+            'fetches': self.fetches,
+            'records': self.records,
+            'accepted': self.accepted,
+            'sink': self.sink.get_status(),
+            'last_harvest': self.last_harvest
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--term', required=True, help='PubMed query')
+    parser.add_argument('--from', dest='from_date', help='first day (YYYY/MM/DD)')
+    parser.add_argument('--until', dest='until_date', help='last day (default: today)')
+    parser.add_argument('--source', default='Academic_Papers/pubmed',
+                        help='catalog id the items are attributed to, e.g. Medical_Research/medical_journals')
+    parser.add_argument('--url', default=EUTILS_URL, help='E-utilities base URL')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    async def run():
+        async with PubmedIngest(args.term, args.source, base_url=args.url, batch_size=args.batch_size,
+                                concurrency=args.concurrency) as ingest:
+            return await ingest.run(args.from_date, args.until_date)
+
+    print(json.dumps(asyncio.run(run()), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - BATCH QUALITY SCORING
+Vectorized quality scoring and validation for harvested items
+
+A whole batch of raw items is reduced to NumPy arrays of content length,
+title length and metadata presence, and every score is computed in one
+vectorized pass from a per-category scoring table.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_SCORING_TABLE = {
+    'base': 0.5,
+    # (minimum content length, bonus) pairs; every threshold passed adds its bonus
+    'content_bonuses': [(100, 0.2), (500, 0.1)],
+    'title_min_length': 10,
+    'title_bonus': 0.1,
+    'metadata_fields': ('author', 'published_date'),
+    'metadata_bonus': 0.1,
+    'max_score': 1.0
+}
+
+CATEGORY_SCORING_TABLES = {
+    'Academic_Papers': {
+        **DEFAULT_SCORING_TABLE,
+        'content_bonuses': [(200, 0.15), (1000, 0.1)],
+        'metadata_fields': ('author', 'authors', 'published_date', 'doi'),
+        'metadata_bonus': 0.15
+    },
+    'News_Aggregation': {
+        **DEFAULT_SCORING_TABLE,
+        'metadata_fields': ('author', 'published_date', 'publishedAt'),
+    }
+}
+
+
+class BatchQualityScorer:
+    """Scores batches of raw items with a pluggable scoring table"""
+
+    def __init__(self, table: Optional[Dict[str, Any]] = None):
+        self.table = table or DEFAULT_SCORING_TABLE
+
+    @classmethod
+    def for_category(cls, category: str) -> 'BatchQualityScorer':
+        return cls(CATEGORY_SCORING_TABLES.get(category, DEFAULT_SCORING_TABLE))
+
+    def score(self, items: List[Dict[str, Any]]) -> np.ndarray:
+        """Return a float array with one quality score per raw item"""
+        count = len(items)
+        if not count:
+            return np.zeros(0)
+
+        table = self.table
+        fields = table['metadata_fields']
+        content_len = np.fromiter((len(str(item.get('content', ''))) for item in items), np.int64, count)
+        title_len = np.fromiter(
+            (len(str(item['title'])) if item.get('title') else 0 for item in items), np.int64, count
+        )
+        has_metadata = np.fromiter((any(item.get(f) for f in fields) for item in items), bool, count)
+
+        scores = np.full(count, table['base'])
+        for min_length, bonus in table['content_bonuses']:
+            scores += (content_len > min_length) * bonus
+        scores += (title_len > table['title_min_length']) * table['title_bonus']
+        scores += has_metadata * table['metadata_bonus']
+        return np.minimum(scores, table['max_score'])
+
+    @staticmethod
+    def accepts(scores: np.ndarray, threshold: float, min_fraction: float = 0.5) -> bool:
+        """Whether at least ``min_fraction`` of scores reach ``threshold``"""
+        if not len(scores):
+            return False
+        return np.count_nonzero(scores >= threshold) >= len(scores) * min_fraction
+
+    @staticmethod
+    def scores_of(items: Iterable[Any]) -> np.ndarray:
+        """Collect quality_score values from processed items"""
+        return np.fromiter((item.get('quality_score', 0) for item in items), float)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - HOST RATE LIMITER
+Per-host token buckets for concurrent harvester fan-out
+
+Each host gets its own bucket refilled at ``rate`` tokens per second, so a
+harvester can spread requests across many hosts at full speed while never
+exceeding the configured rate against any single one.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a fixed rate"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self._updated = None
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        if self._updated is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until ``tokens`` are available and consume them"""
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            self._refill(loop.time())
+            if self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill(loop.time())
+            self.tokens -= tokens
+
+
+class HostRateLimiter:
+    """Registry of token buckets keyed by URL host"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None, rates: Optional[Dict[str, float]] = None):
+        self.rate = rate
+        self.burst = burst
+        # Per-host overrides of ``rate``
+        self.rates: Dict[str, float] = {host.lower(): value for host, value in (rates or {}).items()}
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlsplit(url).netloc.lower()
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        host = self.host_of(url)
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.rates.get(host, self.rate), self.burst)
+            self.buckets[host] = bucket
+        return bucket
+
+    def limit_host(self, host: str, rate: float):
+        """Cap a host's rate; the strictest of several limits wins"""
+        host = host.lower()
+        rate = min(rate, self.rates.get(host, rate))
+        self.rates[host] = rate
+        bucket = self.buckets.get(host)
+        if bucket is not None and bucket.rate > rate:
+            self.buckets[host] = TokenBucket(rate, self.burst)
+    
+    async def acquire(self, url: str):
+        """Wait for a request slot against the host of ``url``"""
+        await self.bucket_for(url).acquire()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - RESPONSE CACHE
+Persistent HTTP conditional-request cache for harvesters
+
+Processed items are stored on disk with the ETag/Last-Modified validators of
+the response that produced them. Entries younger than the category TTL are
+replayed without a request; older ones are revalidated with If-None-Match /
+If-Modified-Since and replayed on 304. The store is bounded by total size and
+evicts least-recently-used entries. Paginated responses also keep the URL of
+the next page, so a replayed page can still be followed.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from harvest_paths import harvest_data_dir
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds a cached response is served without revalidation
+CATEGORY_TTLS = {
+    'Social_Media': 300,
+    'Financial_Data': 300,
+    'News_Aggregation': 900,
+    'Market_Intelligence': 1800,
+    'Cybersecurity': 1800,
+    'Government_Data': 6 * 3600,
+    'Patent_Research': 12 * 3600,
+    'Academic_Papers': 6 * 3600,
+    'Scientific_Research': 6 * 3600,
+}
+DEFAULT_TTL = 3600
+
+# Request headers that identify who is asking
+AUTH_HEADERS = ('Authorization', 'X-API-Key')
+
+
+class CacheEntry:
+    """Cached response validators and processed items"""
+
+    __slots__ = ('key', 'etag', 'last_modified', 'items', 'stored_at', 'next_page')
+
+    def __init__(self, key: str, etag: Optional[str], last_modified: Optional[str],
+                 items: List[Dict[str, Any]], stored_at: float, next_page: Optional[str] = None):
+        self.key = key
+        self.etag = etag
+        self.last_modified = last_modified
+        self.items = items
+        self.stored_at = stored_at
+        self.next_page = next_page
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Size-bounded LRU response cache backed by SQLite"""
+
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path) if path else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        # Running payload total, so a store does not have to SUM the table
+        self._bytes = 0
+        self._db = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path is None:
+                self.path = harvest_data_dir('cache') / 'responses.sqlite'
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, items TEXT,"
+                " size INTEGER, stored_at REAL, accessed_at REAL, next_page TEXT)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+            if 'next_page' not in columns:
+                self._db.execute("ALTER TABLE responses ADD COLUMN next_page TEXT")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses(accessed_at)")
+            self._bytes = self._stored_bytes()
+        return self._db
+
+    @staticmethod
+    def ttl_for(category: str, override: Optional[float] = None) -> float:
+        if override is not None:
+            return override
+        return CATEGORY_TTLS.get(category, DEFAULT_TTL)
+
+    @staticmethod
+    def make_key(url: str, headers: Dict[str, str], auth_headers=AUTH_HEADERS) -> str:
+        """Key by URL and auth scope without storing credentials"""
+        scope = '|'.join(f"{name}={headers.get(name, '')}" for name in auth_headers)
+        return hashlib.sha256(f"{url}\n{scope}".encode('utf-8')).hexdigest()
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        row = self.db.execute(
+            "SELECT etag, last_modified, items, stored_at, next_page FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self.db.commit()
+        return CacheEntry(key, row[0], row[1], json.loads(row[2]), row[3], row[4])
+
+    def store(self, key: str, etag: Optional[str], last_modified: Optional[str],
+              items: List[Dict[str, Any]], next_page: Optional[str] = None):
+        payload = json.dumps(items)
+        now = time.time()
+        replaced = self.db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self._bytes += len(payload) - ((replaced[0] or 0) if replaced else 0)
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses"
+            " (key, etag, last_modified, items, size, stored_at, accessed_at, next_page)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, etag, last_modified, payload, len(payload), now, now, next_page)
+        )
+        self._evict()
+        self.db.commit()
+
+    def replay(self, entry: CacheEntry) -> List[Dict[str, Any]]:
+        """Serve a fresh entry without touching the network"""
+        self.hits += 1
+        return entry.items
+
+    def refresh(self, entry: CacheEntry) -> List[Dict[str, Any]]:
+        """Mark an entry as revalidated by a 304 and serve it"""
+        self.revalidated += 1
+        entry.stored_at = time.time()
+        self.db.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (entry.stored_at, entry.key))
+        self.db.commit()
+        return entry.items
+
+    def _stored_bytes(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        # Other processes may share the file, so count again before deleting
+        total = self._stored_bytes()
+        evicted = 0
+        for key, size in self.db.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._bytes = total
+        if evicted:
+            logger.info(f"Response cache evicted {evicted} entries")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        count, size = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return {
+            'entries': count,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+# Process-wide cache
+shared_response_cache = ResponseCache()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - SHARED SESSION POOL
+Process-wide aiohttp connection pool shared by every harvester
+
+Harvesters borrow one reference-counted ClientSession per event loop instead
+of opening their own, so keep-alive connections, TLS sessions and DNS lookups
+are reused across all harvesters running in the process.
+"""
+
+import asyncio
+import aiohttp
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_POOL_CONFIG = {
+    'limit': 200,
+    # Upper bound only; per-host limits are tuned by adaptive_concurrency
+    'limit_per_host': 64,
+    'ttl_dns_cache': 300,
+    'keepalive_timeout': 30,
+    'timeout': 30,
+    'connect_timeout': 10,
+    'user_agent': 'Echo-Prime-V8-Harvester/1.0'
+}
+
+
+class SessionPool:
+    """Reference-counted registry of shared ClientSessions, one per event loop"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULT_POOL_CONFIG, **(config or {})}
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self._refcounts: Dict[asyncio.AbstractEventLoop, int] = {}
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.config['limit'],
+            limit_per_host=self.config['limit_per_host'],
+            ttl_dns_cache=self.config['ttl_dns_cache'],
+            keepalive_timeout=self.config['keepalive_timeout']
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(
+                total=self.config['timeout'],
+                connect=self.config['connect_timeout']
+            ),
+            headers={'User-Agent': self.config['user_agent']}
+        )
+
+    async def acquire(self) -> aiohttp.ClientSession:
+        """Borrow the shared session for the running loop, creating it on first use"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._create_session()
+            self._sessions[loop] = session
+            self._refcounts[loop] = 0
+            logger.info("Shared harvester session pool opened")
+        self._refcounts[loop] += 1
+        return session
+
+    async def release(self):
+        """Return a borrowed session; the last release closes the pool"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._refcounts:
+            return
+        self._refcounts[loop] -= 1
+        if self._refcounts[loop] <= 0:
+            session = self._sessions.pop(loop)
+            del self._refcounts[loop]
+            await session.close()
+            logger.info("Shared harvester session pool closed")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get pool status"""
+        return {
+            'open_sessions': len(self._sessions),
+            'borrowers': sum(self._refcounts.values()),
+            'config': dict(self.config)
+        }
+
+
+# Process-wide pool
+shared_session_pool = SessionPool()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - SINGLE-FLIGHT REQUESTS
+Coalesce concurrent identical fetches across harvesters
+
+Several harvester modules fetch the same URLs, and an orchestrated sweep runs
+them side by side. Callers that ask for a key while a fetch for it is already
+in flight wait for that fetch instead of starting their own, and all of them
+receive its parsed result. The fetch runs as its own task, so a cancelled
+caller does not cancel it for the others; it is cancelled only once every
+caller has gone. Fan-out (callers per fetch) is kept as a histogram.
+"""
+
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for coalescing: case-folded scheme and host,
+    default port and fragment dropped, query parameters sorted"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+
+def flight_key(url: str, scope: str, profile: str = '') -> str:
+    """Key of a fetch: normalized URL, request scope (e.g. its headers) and parse profile"""
+    return hashlib.sha256(f"{normalize_url(url)}\n{scope}\n{profile}".encode('utf-8')).hexdigest()
+
+
+class _Flight:
+    __slots__ = ('task', 'callers', 'waiters')
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.callers = 1
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Registry of in-flight fetches keyed by flight_key()"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.flights = 0
+        self.coalesced = 0
+        # callers per completed fetch -> number of fetches
+        self.fan_out: Dict[int, int] = {}
+
+    async def run(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Result of ``fetch()`` for ``key``, and whether it was shared
+
+        Only the first caller for a key starts ``fetch``; callers arriving
+        while it runs get the same result (or exception).
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if shared:
+            flight.callers += 1
+            self.coalesced += 1
+        else:
+            flight = _Flight(asyncio.ensure_future(fetch()))
+            self._flights[key] = flight
+            self.flights += 1
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Callers arriving from now on start a fresh fetch rather than join a cancelled one
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finish(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        self.fan_out[flight.callers] = self.fan_out.get(flight.callers, 0) + 1
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            logger.debug(f"Shared fetch failed for {flight.callers} callers: {flight.task.exception()!r}")
+
+    def get_status(self) -> Dict[str, Any]:
+        completed = sum(self.fan_out.values())
+        callers = sum(fan_out * count for fan_out, count in self.fan_out.items())
+        return {
+            'in_flight': len(self._flights),
+            'flights': self.flights,
+            'coalesced': self.coalesced,
+            'mean_fan_out': callers / completed if completed else None,
+            'max_fan_out': max(self.fan_out, default=None),
+            'fan_out': dict(sorted(self.fan_out.items()))
+        }
+
+
+# Process-wide registry
+shared_single_flight = SingleFlight()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - STREAM MERGE
+Fan-in of several harvester item streams through one bounded queue
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+async def merge_streams(streams: Iterable[AsyncIterator[Any]], queue_size: int = 100) -> AsyncIterator[Any]:
+    """Yield items from all streams in arrival order
+
+    Each stream is pumped by its own task into a shared bounded queue, so a
+    slow consumer applies backpressure to every producer.
+    """
+    queue = asyncio.Queue(maxsize=queue_size)
+    finished = object()
+
+    async def pump(stream: AsyncIterator[Any]):
+        try:
+            async for item in stream:
+                await queue.put(item)
+        except Exception as e:
+            logger.error(f"Stream error: {e}")
+        await queue.put(finished)
+
+    pumps = [asyncio.create_task(pump(stream)) for stream in streams]
+    remaining = len(pumps)
+
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is finished:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        for task in pumps:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*pumps, return_exceptions=True)
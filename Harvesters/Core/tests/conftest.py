@@ -0,0 +1,19 @@
+"""Shared fixtures for the harvester Core tests
+
+Core modules import each other by plain module name, so the Core directory
+goes on sys.path the same way the orchestrator puts it there. Every test
+gets its own ECHO_HARVEST_DIR so stores and sinks never touch real state.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def harvest_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('ECHO_HARVEST_DIR', str(tmp_path / 'harvest'))
+    return tmp_path / 'harvest'
@@ -0,0 +1,32 @@
+"""Local aiohttp server for tests that exercise real HTTP fetches"""
+
+import contextlib
+from typing import AsyncIterator
+
+from aiohttp import web
+
+
+@contextlib.asynccontextmanager
+async def serve(app: web.Application) -> AsyncIterator[str]:
+    """Run ``app`` on a free localhost port and yield its base URL"""
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
+
+
+def make_harvester(state_dir, base_url: str, endpoints, rate_limit: float = 1000.0, **config):
+    """BaseHarvester pointed at ``base_url`` with private cache, dedup and breaker state"""
+    from base_harvester import BaseHarvester
+    from harvester_benchmark import isolate
+
+    harvester = BaseHarvester()
+    harvester.api_config.update(base_urls=[base_url], endpoints=list(endpoints), **config)
+    harvester._apply_config()
+    isolate(harvester, state_dir, rate_limit)
+    return harvester
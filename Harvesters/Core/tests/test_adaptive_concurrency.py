@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+
+from aiohttp import web
+
+from adaptive_concurrency import AdaptiveConcurrency
+from fixture_server import make_harvester, serve
+
+HOST = 'api.example.org'
+URL = f'https://{HOST}/items'
+
+
+def record(controller, status, latency=0.05, count=1, failed=False):
+    async def scenario():
+        for _ in range(count):
+            await controller.acquire(HOST)
+            await controller.release(HOST, latency, status, failed=failed)
+
+    asyncio.run(scenario())
+
+
+def test_additive_increase_on_success(tmp_path):
+    controller = AdaptiveConcurrency(tmp_path / 'concurrency.json', initial_limit=4)
+    record(controller, 200, count=20)
+    state = controller.hosts[HOST]
+    # About +1 per window of `limit` successes: 4 + 5 + 6 take it past 7
+    assert 7 < state.limit < 8
+    assert state.baseline is not None
+
+
+def test_multiplicative_decrease_once_per_burst(tmp_path):
+    controller = AdaptiveConcurrency(tmp_path / 'concurrency.json', initial_limit=8)
+    record(controller, 429, count=3)
+    state = controller.hosts[HOST]
+    assert state.limit == 4 and state.decreases == 1
+
+    state.last_decrease -= 2
+    record(controller, 503)
+    assert state.limit == 2 and state.decreases == 2
+
+
+def test_limit_never_drops_below_minimum(tmp_path):
+    controller = AdaptiveConcurrency(tmp_path / 'concurrency.json', initial_limit=1.5, min_limit=1)
+    record(controller, 429)
+    assert controller.hosts[HOST].limit == 1
+
+
+def test_latency_over_baseline_backs_off(tmp_path):
+    controller = AdaptiveConcurrency(tmp_path / 'concurrency.json', initial_limit=10)
+    record(controller, 200, latency=0.05, count=20)
+    limit = controller.hosts[HOST].limit
+    record(controller, 200, latency=1.0, count=20)
+    assert controller.hosts[HOST].limit < limit
+    assert controller.hosts[HOST].decreases >= 1
+
+
+def test_slot_enforces_limit(tmp_path):
+    controller = AdaptiveConcurrency(tmp_path / 'concurrency.json', initial_limit=2)
+    peak = 0
+    running = 0
+
+    async def request():
+        nonlocal peak, running
+        async with controller.slot(URL) as slot:
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            slot.status = 200
+
+    async def scenario():
+        await asyncio.gather(*(request() for _ in range(6)))
+
+    asyncio.run(scenario())
+    assert peak == 2
+    assert controller.hosts[HOST].in_flight == 0
+
+
+def test_cancelled_slot_is_not_a_sample(tmp_path):
+    controller = AdaptiveConcurrency(tmp_path / 'concurrency.json', initial_limit=2)
+
+    async def scenario():
+        async def hang():
+            async with controller.slot(URL):
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(hang())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    state = controller.hosts[HOST]
+    assert state.in_flight == 0 and not state.outcomes and state.limit == 2
+
+
+def test_early_release_frees_the_slot_once(tmp_path):
+    controller = AdaptiveConcurrency(tmp_path / 'concurrency.json', initial_limit=1)
+
+    async def scenario():
+        async with controller.slot(URL) as slot:
+            slot.status = 200
+            await asyncio.sleep(0.02)
+            await slot.release(local_seconds=0.015)
+            # Parsing after the release neither holds the slot nor counts as latency
+            assert controller.hosts[HOST].in_flight == 0
+            await asyncio.wait_for(controller.acquire(HOST), 1)
+            await controller.release(HOST, 0.0, None, sample=False)
+            await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    state = controller.hosts[HOST]
+    assert state.in_flight == 0 and len(state.outcomes) == 1
+    assert state.latencies[0] < 0.015
+
+
+def test_harvester_releases_slot_before_parsing(tmp_path):
+    async def handle(request):
+        return web.json_response({'results': [{'title': 'Report', 'content': 'Quarterly report text ' * 10}]})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/items', handle)
+        async with serve(app) as url:
+            harvester = make_harvester(tmp_path, url, ['/items'], cache_ttl=0)
+            host = harvester.host_limiter.host_of(url)
+            in_flight = []
+            process = harvester._process_json_batch
+
+            def slow_batch(batch, source, harvested_ns):
+                in_flight.append(harvester.concurrency.hosts[host].in_flight)
+                time.sleep(0.1)
+                return process(batch, source, harvested_ns)
+
+            harvester._process_json_batch = slow_batch
+            async with harvester:
+                items = await harvester.harvest()
+            return harvester.concurrency.hosts[host], items, in_flight
+
+    state, items, in_flight = asyncio.run(scenario())
+    assert len(items) == 1
+    # The final batch is parsed after the body has been read and the slot freed
+    assert in_flight[-1] == 0
+    assert state.latencies[-1] < 0.1
+
+
+def test_learned_limits_survive_restart(tmp_path):
+    path = tmp_path / 'concurrency.json'
+    controller = AdaptiveConcurrency(path, initial_limit=8)
+    record(controller, 429)
+    controller.save()
+    assert json.loads(path.read_text())[HOST]['limit'] == 4
+
+    restarted = AdaptiveConcurrency(path, initial_limit=8)
+    record(restarted, 200)
+    assert 4 < restarted.hosts[HOST].limit < 5
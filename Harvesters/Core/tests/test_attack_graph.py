@@ -0,0 +1,161 @@
+import asyncio
+import json
+
+import pytest
+from aiohttp import web
+
+from attack_graph import AttackGraph, AttackGraphStore
+from fixture_server import serve
+
+
+def ref(external_id):
+    return [{'source_name': 'mitre-attack', 'external_id': external_id}]
+
+
+def technique(stix_id, external_id, name, *phases, **extra):
+    return {'type': 'attack-pattern', 'id': stix_id, 'name': name, 'external_references': ref(external_id),
+            'kill_chain_phases': [{'kill_chain_name': 'mitre-attack', 'phase_name': p} for p in phases], **extra}
+
+
+def relationship(kind, source, target, **extra):
+    return {'type': 'relationship', 'relationship_type': kind, 'source_ref': source, 'target_ref': target, **extra}
+
+
+def bundle(version='15.1', modified='2024-04-23T00:00:00.000Z'):
+    return {'type': 'bundle', 'id': 'bundle--1', 'objects': [
+        {'type': 'x-mitre-collection', 'id': 'x-mitre-collection--1', 'x_mitre_version': version,
+         'modified': modified},
+        {'type': 'x-mitre-tactic', 'id': 'tactic--exec', 'name': 'Execution', 'x_mitre_shortname': 'execution',
+         'external_references': ref('TA0002')},
+        {'type': 'x-mitre-tactic', 'id': 'tactic--c2', 'name': 'Command and Control',
+         'x_mitre_shortname': 'command-and-control', 'external_references': ref('TA0011')},
+        technique('ap--1059', 'T1059', 'Command and Scripting Interpreter', 'execution'),
+        technique('ap--1059-001', 'T1059.001', 'PowerShell', 'execution'),
+        technique('ap--1071', 'T1071', 'Application Layer Protocol', 'command-and-control'),
+        technique('ap--old', 'T9999', 'Retired', 'execution', revoked=True),
+        {'type': 'course-of-action', 'id': 'coa--1038', 'name': 'Execution Prevention',
+         'external_references': ref('M1038')},
+        {'type': 'intrusion-set', 'id': 'is--apt', 'name': 'APT29', 'external_references': ref('G0016')},
+        {'type': 'x-mitre-data-source', 'id': 'ds--cmd', 'name': 'Command', 'external_references': ref('DS0017')},
+        {'type': 'x-mitre-data-component', 'id': 'dc--exec', 'name': 'Command Execution',
+         'x_mitre_data_source_ref': 'ds--cmd'},
+        relationship('subtechnique-of', 'ap--1059-001', 'ap--1059'),
+        relationship('mitigates', 'coa--1038', 'ap--1059'),
+        relationship('mitigates', 'coa--1038', 'ap--1059-001'),
+        relationship('detects', 'dc--exec', 'ap--1059'),
+        relationship('detects', 'dc--exec', 'ap--1059-001'),
+        relationship('uses', 'is--apt', 'ap--1059-001'),
+        relationship('uses', 'is--apt', 'ap--1071'),
+        relationship('uses', 'is--apt', 'ap--old'),
+        relationship('mitigates', 'coa--1038', 'ap--1071', revoked=True),
+    ]}
+
+
+def ids(described):
+    return sorted(entry['id'] for entry in described)
+
+
+def test_relationship_queries():
+    graph = AttackGraph.from_objects(bundle()['objects'])
+    assert ids(graph.techniques('execution')) == ['T1059', 'T1059.001']
+    assert ids(graph.techniques('Command and Control')) == ['T1071']
+    assert ids(graph.tactics('t1059.001')) == ['TA0002']
+    assert ids(graph.mitigations('T1059')) == ['M1038']
+    assert graph.mitigations('T1071') == []
+    assert ids(graph.groups('T1059.001')) == ['G0016']
+    assert ids(graph.group_techniques('APT29')) == ['T1059.001', 'T1071']
+    assert graph.detections('T1059') == [
+        {'id': 'dc--exec', 'name': 'Command Execution', 'kind': 'data_component', 'data_sources': ['Command']}
+    ]
+    with pytest.raises(KeyError):
+        graph.node('T9999')
+
+
+def test_tactic_coverage():
+    graph = AttackGraph.from_objects(bundle()['objects'])
+    detections = graph.detections_for_tactic('TA0002')
+    assert (detections['techniques'], detections['detected']) == (2, 2)
+    assert detections['components'][0]['techniques'] == 2
+    coverage = graph.mitigation_coverage('command-and-control')
+    assert (coverage['techniques'], coverage['mitigated']) == (1, 0)
+    assert ids(coverage['unmitigated']) == ['T1071']
+
+
+def test_legacy_data_source_strings_become_detections():
+    objects = [
+        {'type': 'x-mitre-tactic', 'id': 'tactic--exec', 'name': 'Execution', 'x_mitre_shortname': 'execution',
+         'external_references': ref('TA0002')},
+        technique('ap--1059', 'T1059', 'Command-Line Interface', 'execution',
+                  x_mitre_data_sources=['Process: Process Creation', 'Command: Command Execution']),
+        technique('ap--1047', 'T1047', 'WMI', 'execution', x_mitre_data_sources=['Process: Process Creation'])
+    ]
+    graph = AttackGraph.from_objects(objects)
+    assert sorted((d['name'], tuple(d['data_sources'])) for d in graph.detections('T1059')) == [
+        ('Command Execution', ('Command',)), ('Process Creation', ('Process',))
+    ]
+    detections = graph.detections_for_tactic('execution')
+    assert detections['components'][0] == {
+        'id': 'data-component--Process: Process Creation', 'name': 'Process Creation', 'kind': 'data_component',
+        'techniques': 2, 'data_sources': ['Process']
+    }
+
+
+def test_save_and_load_round_trip(tmp_path):
+    graph = AttackGraph.from_objects(bundle()['objects'])
+    graph.save(tmp_path / 'graph')
+    loaded = AttackGraph.load(tmp_path / 'graph')
+    assert loaded.get_status() == graph.get_status()
+    assert ids(loaded.mitigations('T1059.001')) == ['M1038']
+    assert loaded.version == {'collection': '15.1', 'modified': '2024-04-23T00:00:00.000Z'}
+
+
+def test_refresh_uses_etag_and_collection_version(tmp_path):
+    requests = []
+    published = {'bundle': bundle(), 'etag': '"a"'}
+
+    async def handler(request):
+        requests.append(request.headers.get('If-None-Match'))
+        if request.headers.get('If-None-Match') == published['etag']:
+            return web.Response(status=304)
+        return web.Response(body=json.dumps(published['bundle']).encode(), headers={'ETag': published['etag']},
+                            content_type='application/json')
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/bundle.json', handler)
+        async with serve(app) as base_url:
+            store = AttackGraphStore(url=f'{base_url}/bundle.json', root=tmp_path)
+            results = [await store.refresh()]
+            results.append(await store.refresh())
+            # New ETag, same collection version: only the saved ETag changes
+            published['etag'] = '"b"'
+            results.append(await store.refresh())
+            published.update(bundle=bundle(version='16.0'), etag='"c"')
+            results.append(await store.refresh())
+            return store, results
+
+    store, results = asyncio.run(scenario())
+    assert results == [True, False, False, True]
+    assert requests == [None, '"a"', '"a"', '"b"']
+    assert store.reloads == 2
+    assert store.graph.version['collection'] == '16.0'
+
+    reopened = AttackGraphStore(url=store.url, root=tmp_path)
+    assert reopened.graph.version['etag'] == '"c"'
+    assert ids(reopened.graph.mitigations('T1059')) == ['M1038']
+
+
+def test_load_file_skips_unchanged_version(tmp_path):
+    path = tmp_path / 'enterprise-attack.json'
+    path.write_text(json.dumps(bundle()))
+    store = AttackGraphStore(root=tmp_path / 'index')
+    (tmp_path / 'index').mkdir()
+    assert asyncio.run(store.load_file(path)) is True
+    assert asyncio.run(store.load_file(path)) is False
+    assert asyncio.run(store.load_file(path, force=True)) is True
+    assert store.reloads == 2
+
+
+def test_graph_before_refresh_is_an_error(tmp_path):
+    with pytest.raises(LookupError):
+        AttackGraphStore(root=tmp_path).graph
@@ -0,0 +1,86 @@
+import json
+from urllib.parse import urlsplit
+
+import pytest
+
+from base_harvester import BaseHarvester
+from catalog_engine import HARVESTERS_ROOT, CatalogEngine, CatalogError, load_catalog
+
+DOMAINS = CatalogEngine().domains()
+
+# Host of the legacy template modules, which have no real endpoint
+PLACEHOLDER_HOST = 'api.example.com'
+
+
+def write(tmp_path, document):
+    path = tmp_path / 'Testing' / 'catalog.json'
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(json.dumps(document))
+    return path
+
+
+@pytest.mark.parametrize('domain', DOMAINS)
+def test_every_catalog_loads_and_builds(domain):
+    engine = CatalogEngine()
+    specs = engine.catalog(domain)
+    assert specs, f"{domain} catalog lists no sources"
+    for spec in specs:
+        assert spec.domain == domain
+        if spec.module:
+            assert (HARVESTERS_ROOT / f'{spec.module}.py').exists(), f"{spec.id} names a missing module"
+        harvester = engine.build(spec)
+        assert isinstance(harvester, BaseHarvester) and harvester.name == spec.id
+        if not spec.enabled:
+            continue
+        # Enabled sources must point at a real service
+        targets = harvester._get_harvest_targets()
+        assert targets
+        for target in targets:
+            parts = urlsplit(target)
+            assert parts.scheme == 'https' and parts.hostname != PLACEHOLDER_HOST, target
+
+
+def test_legacy_stubs_stay_disabled():
+    engine = CatalogEngine()
+    for spec in engine.sources(enabled=False):
+        if not spec.config.get('base_urls'):
+            assert not spec.enabled and spec.module, spec.id
+
+
+def test_defaults_apply_and_disabled_sources_are_skipped(tmp_path):
+    write(tmp_path, {'defaults': {'rate_limit': 2, 'cache_ttl': 60}, 'sources': [
+        {'name': 'feed', 'priority': 3, 'base_urls': ['https://feeds.example.org'], 'endpoints': ['/a', '/b'],
+         'cache_ttl': 5},
+        {'name': 'stub', 'enabled': False, 'module': 'Testing/stub_harvester'}
+    ]})
+    engine = CatalogEngine(tmp_path)
+    assert [spec.id for spec in engine.sources()] == ['Testing/feed']
+    harvester = engine.build(engine.find('Testing/feed'))
+    assert harvester.api_config['cache_ttl'] == 5 and harvester.api_config['rate_limit'] == 2
+    assert harvester._get_harvest_targets() == ['https://feeds.example.org/a', 'https://feeds.example.org/b']
+    assert engine.host_limiter.rates['feeds.example.org'] == 2
+    assert len(engine.sources(enabled=False)) == 2
+
+
+def test_credentials_come_from_the_environment(tmp_path, monkeypatch):
+    write(tmp_path, {'sources': [
+        {'name': 'api', 'base_urls': ['https://api.example.org'], 'endpoints': ['/v1'],
+         'auth': {'api_key_env': 'TESTING_API_KEY', 'header': 'X-Key'}}
+    ]})
+    engine = CatalogEngine(tmp_path)
+    assert engine.build(engine.find('Testing/api')).api_config['auth'] == {'header': 'X-Key'}
+    monkeypatch.setenv('TESTING_API_KEY', 'secret')
+    assert engine.build(engine.find('Testing/api')).api_config['auth'] == {'header': 'X-Key', 'api_key': 'secret'}
+
+
+@pytest.mark.parametrize('sources, message', [
+    ([{'base_urls': ['https://a.org'], 'endpoints': ['/']}], 'without a name'),
+    ([{'name': 'a', 'enabled': False}, {'name': 'a', 'enabled': False}], 'duplicate source'),
+    ([{'name': 'a', 'endpoint': '/'}], 'unknown keys'),
+    ([{'name': 'a', 'base_urls': ['https://a.org'], 'endpoints': ['/'], 'auth': {'api_key': 'x'}}],
+     'only name environment variables'),
+    ([{'name': 'a', 'base_urls': ['https://a.org']}], 'needs base_urls and endpoints'),
+])
+def test_invalid_catalogs_are_rejected(tmp_path, sources, message):
+    with pytest.raises(CatalogError, match=message):
+        load_catalog(write(tmp_path, {'sources': sources}))
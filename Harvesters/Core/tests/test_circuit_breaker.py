@@ -0,0 +1,120 @@
+import asyncio
+import time
+
+from aiohttp import web
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, RetryPolicy, parse_retry_after
+from fixture_server import make_harvester, serve
+
+
+def opened(reset_timeout=0.01) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_threshold_and_probes_once():
+    breaker = opened()
+    assert breaker.state == OPEN and not breaker.allow()
+    time.sleep(0.02)
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = opened()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.times_opened == 2
+
+
+def test_released_probe_can_be_retried():
+    breaker = opened()
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_stale_probe_times_out():
+    breaker = opened(reset_timeout=0.05)
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_retry_policy_honours_retry_after():
+    policy = RetryPolicy(base_delay=0.1, max_delay=5)
+    assert 0.1 <= policy.next_delay(0.1) <= 0.3
+    assert policy.next_delay(0.1, retry_after=4) >= 4
+    # Longer than the policy will wait: give up instead of retrying early
+    assert policy.next_delay(0.1, retry_after=60) is None
+    assert parse_retry_after('7') == 7.0 and parse_retry_after('soon') is None
+
+
+def test_cancelled_half_open_probe_releases_slot(tmp_path):
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def hang(request):
+        started.set()
+        await release.wait()
+        return web.json_response({'results': []})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/data', hang)
+        async with serve(app) as url:
+            harvester = make_harvester(tmp_path, url, ['/data'])
+            breaker = harvester.breakers.for_url(url)
+            breaker.reset_timeout = 0.01
+            for _ in range(breaker.failure_threshold):
+                breaker.record_failure()
+            await asyncio.sleep(0.02)
+
+            async with harvester:
+                fetch = asyncio.create_task(
+                    harvester._fetch_uncoalesced('/data', url + '/data', harvester._build_headers())
+                )
+                await asyncio.wait_for(started.wait(), 5)
+                assert breaker.state == HALF_OPEN and breaker.probe_in_flight
+                fetch.cancel()
+                await asyncio.gather(fetch, return_exceptions=True)
+
+            release.set()
+            assert not breaker.probe_in_flight
+            assert breaker.allow()
+            harvester.cache.close()
+            harvester.dedup.close()
+            harvester.watermarks.close()
+
+    asyncio.run(scenario())
+
+
+def test_long_retry_after_stops_retrying(tmp_path):
+    requests = []
+
+    async def throttled(request):
+        requests.append(request.path)
+        return web.Response(status=429, headers={'Retry-After': '3600'})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/data', throttled)
+        async with serve(app) as url:
+            harvester = make_harvester(tmp_path, url, ['/data'])
+            harvester.retry_policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=1)
+            async with harvester:
+                started = time.monotonic()
+                page = await harvester._fetch_uncoalesced('/data', url + '/data', harvester._build_headers())
+                return page, time.monotonic() - started, harvester
+
+    page, elapsed, harvester = asyncio.run(scenario())
+    assert page is None and requests == ['/data']
+    assert elapsed < 1 and harvester.retry_count == 0
@@ -0,0 +1,198 @@
+import asyncio
+import gzip
+import hashlib
+import json
+
+import pytest
+from aiohttp import web
+
+from cve_store import NOT_APPLICABLE, CveStore, FeedReader, parse_cpe, version_key
+from fixture_server import serve
+
+
+def cve(number, cpe, status='Analyzed', score=7.5, modified='2024-02-01T00:00:00', **bounds):
+    return {'cve': {
+        'id': f'CVE-2024-{number:04d}', 'published': f'2024-01-{number % 28 + 1:02d}T00:00:00',
+        'lastModified': modified, 'vulnStatus': status,
+        'descriptions': [{'lang': 'es', 'value': 'es'}, {'lang': 'en', 'value': f'issue {number}'}],
+        'metrics': {'cvssMetricV31': [{'type': 'Primary', 'cvssData': {
+            'baseScore': score, 'baseSeverity': 'HIGH', 'vectorString': 'CVSS:3.1/AV:N'}}]},
+        'configurations': [{'nodes': [{'cpeMatch': [dict(vulnerable=True, criteria=cpe, **bounds)]}]}],
+        'references': [{'url': 'https://example.org/advisory'}]
+    }}
+
+
+OPENSSL = 'cpe:2.3:a:openssl:openssl:*:*:*:*:*:*:*:*'
+
+
+@pytest.mark.parametrize('lower, higher', [
+    ('1.0.2', '1.0.2k'), ('1.0.2k', '1.0.2u'), ('1.0.2u', '1.0.3'), ('1.0rc1', '1.0'),
+    ('1.0b2', '1.0'), ('1.0.0-alpha', '1.0.0'), ('2.0', '2.0-p1'), ('1.0', '1.0.post1'),
+    ('1.0a', '1.0.1'), ('1.9', '1.10'), ('2.4.9', '2.4.49'), ('1.2.999999999999', '1.2.3000000000000'),
+    ('1.0', '1.0.0.1'), ('1.0.0rc1', '1.0')
+])
+def test_version_key_order(lower, higher):
+    assert version_key(lower) < version_key(higher)
+
+
+@pytest.mark.parametrize('short, padded', [('1.0', '1.0.0'), ('2', '2.0.0'), ('1.0rc1', '1.0.0rc1'), ('0', '0.0')])
+def test_version_key_ignores_trailing_zeros(short, padded):
+    assert version_key(short) == version_key(padded)
+
+
+def test_version_key_wildcards():
+    assert version_key('*') is None and version_key('') is None and version_key(None) is None
+    # '-' is "not applicable", not "any version"
+    assert version_key('-') == NOT_APPLICABLE
+
+
+def test_parse_cpe_unescapes():
+    assert parse_cpe(r'cpe:2.3:a:acme:web\:server:1.2:*:*:*:*:*:*:*') == ('acme', 'web:server', '1.2')
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CveStore(tmp_path / 'cves.sqlite')
+    reader = FeedReader(compressed=False)
+    records = reader.feed(json.dumps({'vulnerabilities': [
+        cve(1, OPENSSL, versionStartIncluding='1.0.2', versionEndExcluding='1.0.2u'),
+        cve(2, OPENSSL, versionStartIncluding='3.0.0', versionEndExcluding='3.0.0rc1'),
+        cve(3, 'cpe:2.3:a:acme:widget:*:*:*:*:*:*:*:*', versionStartExcluding='2.0rc1',
+            versionEndIncluding='2.0', score=9.8),
+        cve(4, 'cpe:2.3:a:acme:widget:1.5:*:*:*:*:*:*:*', score=5.0),
+        cve(5, 'cpe:2.3:a:acme:gadget:-:*:*:*:*:*:*:*'),
+        cve(6, 'cpe:2.3:a:acme:gadget:2.0:*:*:*:*:*:*:*')
+    ]}).encode())
+    store.upsert(records + reader.close())
+    yield store
+    store.close()
+
+
+def ids(results):
+    return [result['id'] for result in results]
+
+
+@pytest.mark.parametrize('version, expected', [
+    ('1.0.2', ['CVE-2024-0001']), ('1.0.2k', ['CVE-2024-0001']), ('1.0.2t', ['CVE-2024-0001']),
+    ('1.0.2u', []), ('1.0.1u', []), ('1.1.1', [])
+])
+def test_letter_suffixed_ranges(store, version, expected):
+    assert ids(store.affected('openssl', 'openssl', version)) == expected
+
+
+@pytest.mark.parametrize('version, expected', [
+    ('2.0rc1', []), ('2.0rc2', ['CVE-2024-0003']), ('2.0', ['CVE-2024-0003']),
+    ('2.0.1', []), ('1.5', ['CVE-2024-0004'])
+])
+def test_rc_ranges_and_exact_versions(store, version, expected):
+    assert ids(store.affected('acme', 'widget', version)) == expected
+
+
+@pytest.mark.parametrize('version, expected', [
+    ('2.0', ['CVE-2024-0006']), ('2.0.0', ['CVE-2024-0006']), ('-', []), ('*', []), ('1.0', [])
+])
+def test_not_applicable_matches_no_version(store, version, expected):
+    assert ids(store.affected('acme', 'gadget', version)) == expected
+
+
+def test_older_records_do_not_overwrite_newer(tmp_path):
+    store = CveStore(tmp_path / 'cves.sqlite')
+    feed = lambda *items: FeedReader(compressed=False).feed(json.dumps({'vulnerabilities': items}).encode())
+    newer = cve(1, OPENSSL, versionStartIncluding='1.0.2', versionEndExcluding='1.0.2k', modified='2024-03-01T00:00:00')
+    older = cve(1, OPENSSL, score=9.8, versionStartIncluding='1.0.2', versionEndExcluding='1.0.2u')
+    assert store.upsert(feed(newer)) == 1
+    assert store.upsert(feed(older, cve(1, OPENSSL, status='Rejected'))) == 0
+    assert store.get('CVE-2024-0001')['cvss'] == 7.5
+    assert ids(store.affected('openssl', 'openssl', '1.0.2m')) == []
+    assert store.upsert(feed(cve(1, OPENSSL, status='Rejected', modified='2024-04-01T00:00:00'))) == 0
+    assert store.get('CVE-2024-0001') is None and store.db.execute("SELECT COUNT(*) FROM cpe_matches").fetchone()[0] == 0
+    store.close()
+
+
+def test_lookup_filters_and_get(store):
+    assert ids(store.affected(None, 'widget', '1.5', min_cvss=6)) == []
+    record = store.get('cve-2024-0001')
+    assert record['description'] == 'issue 1' and record['cvss'] == 7.5
+    assert record['cpe_matches'] == [{'cpe': OPENSSL, 'vulnerable': True}]
+    assert ids(store.search(min_cvss=9)) == ['CVE-2024-0003']
+
+
+def test_stale_key_scheme_is_cleared(tmp_path):
+    path = tmp_path / 'old.sqlite'
+    store = CveStore(path)
+    store.upsert(FeedReader(compressed=False).feed(json.dumps({'vulnerabilities': [cve(1, OPENSSL)]}).encode()))
+    store.db.execute("PRAGMA user_version = 1")
+    store.close()
+    reopened = CveStore(path)
+    assert reopened.get_status()['cves'] == 0
+    reopened.close()
+
+
+def feed_app(feeds, hits):
+    async def handler(request):
+        name = request.match_info['name']
+        hits.append(name)
+        if name.endswith('.meta'):
+            digest = hashlib.sha256(feeds[name[len('nvdcve-2.0-'):-len('.meta')]]).hexdigest()
+            return web.Response(text=f"lastModifiedDate:2024-02-01T00:00:00-05:00\r\nsha256:{digest.upper()}\r\n")
+        body = gzip.compress(feeds[name[len('nvdcve-2.0-'):-len('.json.gz')]])
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for start in range(0, len(body), 512):
+            await response.write(body[start:start + 512])
+        return response
+
+    app = web.Application()
+    app.router.add_get('/{name}', handler)
+    return app
+
+
+def test_sync_and_modified_update_over_http(tmp_path):
+    year = [cve(n, OPENSSL, versionStartIncluding='1.0.2', versionEndExcluding='1.0.2u') for n in range(1, 301)]
+    feeds = {
+        '2024': json.dumps({'format': 'NVD_CVE', 'vulnerabilities': year}).encode(),
+        'recent': json.dumps({'vulnerabilities': []}).encode(),
+        'modified': json.dumps({'vulnerabilities': [
+            cve(1, OPENSSL, status='Rejected', modified='2024-02-08T00:00:00'),
+            cve(2, OPENSSL, versionStartIncluding='1.0.2', versionEndExcluding='1.0.2k', modified='2024-02-08T00:00:00'),
+            # Already stored at this revision
+            cve(3, OPENSSL, versionStartIncluding='1.0.2', versionEndExcluding='1.0.2k')
+        ]}).encode()
+    }
+    hits = []
+
+    async def scenario():
+        async with serve(feed_app(feeds, hits)) as url:
+            store = CveStore(tmp_path / 'cves.sqlite', feed_url=url + '/nvdcve-2.0-{name}.json.gz', batch_size=50)
+            assert await store.sync(['2024']) == {'2024': 300}
+            # Same checksum: only the .meta file is fetched
+            assert await store.sync(['2024']) == {'2024': 0}
+            assert await store.update() == {'recent': 0, 'modified': 1}
+            return store
+
+    store = asyncio.run(scenario())
+    assert hits.count('nvdcve-2.0-2024.json.gz') == 1
+    affected = ids(store.affected('openssl', 'openssl', '1.0.2m'))
+    assert 'CVE-2024-0001' not in affected and 'CVE-2024-0002' not in affected
+    assert len(affected) == 298
+    assert store.get_status()['feeds']['2024']['last_modified'] == '2024-02-01T00:00:00-05:00'
+    store.close()
+
+
+def test_legacy_feed_file(tmp_path):
+    item = {
+        'cve': {'CVE_data_meta': {'ID': 'CVE-2019-0001'},
+                'description': {'description_data': [{'lang': 'en', 'value': 'old'}]}},
+        'impact': {'baseMetricV2': {'cvssV2': {'baseScore': 5.0}, 'severity': 'MEDIUM'}},
+        'publishedDate': '2019-01-01T00:00Z', 'lastModifiedDate': '2019-01-02T00:00Z',
+        'configurations': {'nodes': [{'children': [{'cpe_match': [{
+            'vulnerable': True, 'cpe23Uri': 'cpe:2.3:o:juniper:junos:*:*:*:*:*:*:*:*',
+            'versionEndIncluding': '18.1'}]}]}]}
+    }
+    path = tmp_path / 'nvdcve-1.1-2019.json.gz'
+    path.write_bytes(gzip.compress(json.dumps({'CVE_Items': [item]}).encode()))
+    store = CveStore(tmp_path / 'cves.sqlite')
+    assert asyncio.run(store.ingest_file(path)) == 1
+    assert ids(store.affected('juniper', 'junos', '17.4R2')) == ['CVE-2019-0001']
+    assert store.affected('juniper', 'junos', '18.2') == []
+    store.close()
@@ -0,0 +1,103 @@
+from dedup_index import BloomFilter, DedupIndex, canonical_url
+
+
+def item(content, url='https://example.org/feed', source='https://example.org/feed'):
+    return {'content': content, 'url': url, 'source': source}
+
+
+def test_canonical_url_drops_tracking_and_noise():
+    assert canonical_url('HTTPS://www.Example.org/post/?utm_source=x&b=2&a=1#top') == 'https://example.org/post?a=1&b=2'
+    assert canonical_url('https://example.org') == 'https://example.org/'
+
+
+def test_only_known_tracking_params_are_dropped():
+    url = 'https://example.org/p?ref=rss&REF=x&ref_src=tw&reference=7&refresh=1&utm_campaign=a&fbclid=z'
+    assert canonical_url(url) == 'https://example.org/p?ref_src=tw&reference=7&refresh=1'
+    assert canonical_url('https://example.org/tree?ref=main') == 'https://example.org/tree'
+
+
+def test_shared_boilerplate_does_not_merge_distinct_items(tmp_path):
+    index = DedupIndex(tmp_path / 'seen.sqlite', capacity=1000)
+    boilerplate = 'Click through to read the full story.'
+    first = [item(boilerplate, url='https://example.org/a'), item(boilerplate, url='https://example.org/b')]
+    assert index.admit(first) == first
+    # Without permalinks, matching content is only a duplicate within the same source
+    other_feed = item(boilerplate, source='https://other.org/feed', url='https://other.org/feed')
+    assert index.admit([item(boilerplate), other_feed]) == [item(boilerplate), other_feed]
+    assert index.admit([item(boilerplate + ' ')]) == []
+    index.close()
+
+
+def test_admit_drops_seen_content_and_permalinks(tmp_path):
+    index = DedupIndex(tmp_path / 'seen.sqlite', capacity=1000)
+    first = [item('Alpha  story'), item('Beta story', url='https://example.org/beta')]
+    assert index.admit(first) == first
+    # Whitespace and case differences are the same content; a shared permalink is the same item
+    later = [item('alpha story'), item('Beta, revised', url='https://www.example.org/beta/?utm_medium=rss'),
+             item('Gamma story')]
+    assert [i['content'] for i in index.admit(later)] == ['Gamma story']
+    assert index.duplicates == 2
+    assert index.contains('ALPHA story', '', 'https://example.org/feed')
+    assert not index.contains('Delta story', '', 'https://example.org/feed')
+    index.close()
+
+
+def test_feed_url_is_not_a_permalink(tmp_path):
+    index = DedupIndex(tmp_path / 'seen.sqlite', capacity=1000)
+    assert len(index.admit([item('One'), item('Two')])) == 2
+    index.close()
+
+
+def test_duplicates_within_one_batch(tmp_path):
+    index = DedupIndex(tmp_path / 'seen.sqlite', capacity=1000)
+    assert [i['content'] for i in index.admit([item('Same'), item('same ')])] == ['Same']
+    index.close()
+
+
+def test_forget_lets_items_back_in(tmp_path):
+    index = DedupIndex(tmp_path / 'seen.sqlite', capacity=1000)
+    admitted = index.admit([item('Kept'), item('Undelivered', url='https://example.org/u')])
+    assert index.forget(admitted[1:]) == 1
+    assert not index.contains('Undelivered', 'https://example.org/u', 'https://example.org/feed')
+    again = [item('Kept'), item('Undelivered', url='https://example.org/u')]
+    assert [i['content'] for i in index.admit(again)] == ['Undelivered']
+    index.close()
+
+
+def test_bloom_filter_persists_and_rebuilds(tmp_path):
+    path = tmp_path / 'seen.sqlite'
+    index = DedupIndex(path, capacity=1000)
+    index.admit([item(f'story {n}') for n in range(50)])
+    index.close()
+    assert BloomFilter.load(path.with_suffix('.bloom'), 1000, 50) is not None
+    # A stale key count means the saved bits no longer match the table
+    assert BloomFilter.load(path.with_suffix('.bloom'), 1000, 49) is None
+
+    reopened = DedupIndex(path, capacity=1000)
+    assert reopened.contains('story 7', '', 'https://example.org/feed')
+    assert reopened.get_status() == {'keys': 50, 'deferred': 0, 'duplicates_dropped': 1}
+    reopened.close()
+
+    path.with_suffix('.bloom').unlink()
+    rebuilt = DedupIndex(path, capacity=1000)
+    assert rebuilt.contains('story 49', '', 'https://example.org/feed')
+    assert not rebuilt.contains('story 50', '', 'https://example.org/feed')
+    rebuilt.close()
+
+
+def test_deferred_admissions_persist_only_on_request(tmp_path):
+    path = tmp_path / 'seen.sqlite'
+    index = DedupIndex(path, capacity=1000)
+    assert len(index.admit([item('Stored'), item('Pending')], defer=True)) == 2
+    # Seen in this process straight away
+    assert index.admit([item('Pending')], defer=True) == []
+    keys = index.deferred()
+    index.admit([item('Later')], defer=True)
+    assert index.persist(keys) == 2
+    assert index.get_status()['keys'] == 2 and index.get_status()['deferred'] == 1
+    index.close()
+
+    reopened = DedupIndex(path, capacity=1000)
+    assert reopened.contains('Stored', '', 'https://example.org/feed')
+    assert not reopened.contains('Later', '', 'https://example.org/feed')
+    reopened.close()
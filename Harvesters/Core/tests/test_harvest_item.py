@@ -0,0 +1,52 @@
+import json
+import time
+from datetime import datetime
+
+import pytest
+
+from harvest_item import FIELDS, HarvestItem
+
+
+def make(**overrides):
+    values = dict(content='Body text', title='A title', url='https://example.org/a', category='Testing',
+                  source='https://example.org/feed', harvested_ns=1_700_000_000_000_000_000, quality_score=0.7)
+    values.update(overrides)
+    return HarvestItem(**values)
+
+
+def test_reads_like_the_legacy_dict():
+    item = make()
+    assert item['title'] == 'A title' and item['quality_score'] == 0.7
+    assert item.get('url') == 'https://example.org/a'
+    assert item.get('author') is None and item.get('author', 'n/a') == 'n/a'
+    assert 'content' in item and 'author' not in item
+    assert list(item) == list(FIELDS) and len(item) == 7
+    assert set(item.keys()) == set(FIELDS)
+    with pytest.raises(KeyError):
+        item['harvested_ns']
+
+
+def test_dict_conversions_match_the_legacy_shape():
+    item = make()
+    legacy = dict(item)
+    assert legacy == item.to_dict()
+    assert legacy['harvested_at'] == datetime.fromtimestamp(1_700_000_000).isoformat()
+    assert {**item, 'extra': 1}['extra'] == 1
+    assert json.loads(json.dumps(item.to_dict()))['category'] == 'Testing'
+    # Mapping equality compares the legacy keys
+    assert item == legacy
+
+
+def test_is_read_only():
+    item = make()
+    with pytest.raises(TypeError):
+        item['title'] = 'changed'
+    with pytest.raises(AttributeError):
+        item.extra = 1
+
+
+def test_row_round_trip_and_interned_strings():
+    item = make(harvested_ns=time.time_ns())
+    copy = HarvestItem.from_row(json.loads(json.dumps(item.to_row())))
+    assert copy.to_dict() == item.to_dict()
+    assert copy.category is item.category and copy.source is item.source
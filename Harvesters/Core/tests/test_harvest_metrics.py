@@ -0,0 +1,122 @@
+import asyncio
+
+from aiohttp import web
+
+from fixture_server import make_harvester, serve
+from harvest_metrics import HarvestMetrics, LatencyHistogram
+from dedup_index import DedupIndex
+
+
+def test_latency_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000)
+    assert 0.045 <= histogram.quantile(0.5) <= 0.056
+    assert 0.09 <= histogram.quantile(0.99) <= 0.11
+    assert histogram.max == 0.1 and histogram.count == 100
+
+
+def test_prometheus_export_has_every_counter():
+    metrics = HarvestMetrics('Probe')
+    metrics.record_request('/a', 0.02, 100)
+    metrics.target('/a').items_duplicate = 3
+    text = metrics.to_prometheus()
+    assert 'harvester_requests_total{harvester="Probe",target="/a"} 1' in text
+    assert 'harvester_items_duplicate_total{harvester="Probe",target="/a"} 3' in text
+    assert metrics.get_status()['totals']['items_duplicate'] == 3
+
+
+def test_prometheus_families_are_contiguous():
+    metrics = HarvestMetrics('Probe')
+    for target in ('/a', '/b', '/c'):
+        metrics.record_request(target, 0.02, 100)
+    families = []
+    for line in metrics.to_prometheus().splitlines():
+        if line.startswith('# TYPE '):
+            families.append((line.split()[2], []))
+            continue
+        name = line.split('{', 1)[0]
+        family, samples = families[-1]
+        # Every sample belongs to the family declared just above it
+        assert name == family or name.rsplit('_', 1)[0] == family
+        samples.append(line)
+    names = [family for family, _ in families]
+    assert len(names) == len(set(names)) == 12
+    assert all(len(samples) == 3 for family, samples in families if family.endswith('_total'))
+
+
+def reports_app():
+    async def handle(request):
+        return web.json_response({'results': [{
+            'title': f'Advisory {n}', 'author': 'CERT', 'url': f'https://example.org/advisory/{n}',
+            'content': f'Advisory {n} describes a remotely exploitable flaw and its mitigations. ' * 3
+        } for n in range(25)]})
+
+    app = web.Application()
+    app.router.add_get('/advisories', handle)
+    return app
+
+
+def harvesters(tmp_path, url, count):
+    built = [make_harvester(tmp_path / str(n), url, ['/advisories'], cache_ttl=0) for n in range(count)]
+    shared = DedupIndex(tmp_path / 'seen.sqlite')
+    for harvester in built:
+        harvester.dedup = shared
+    return built
+
+
+def totals(harvester):
+    return harvester.metrics.get_status()['totals']
+
+
+def test_accepted_counts_only_admitted_items(tmp_path):
+    async def scenario():
+        async with serve(reports_app()) as url:
+            first, second = harvesters(tmp_path, url, 2)
+            async with first:
+                got_first = await first.harvest()
+            async with second:
+                got_second = await second.harvest()
+            return first, second, got_first, got_second
+
+    first, second, got_first, got_second = asyncio.run(scenario())
+    assert len(got_first) == totals(first)['items_accepted'] == 25
+    assert got_second == []
+    assert totals(second)['items_accepted'] == 0
+    assert totals(second)['items_duplicate'] == 25
+
+
+def test_concurrent_duplicates_are_not_counted_as_accepted(tmp_path):
+    async def scenario():
+        async with serve(reports_app()) as url:
+            first, second = harvesters(tmp_path, url, 2)
+            async with first, second:
+                results = await asyncio.gather(first.harvest(), second.harvest())
+            return (first, second), results
+
+    pair, results = asyncio.run(scenario())
+    assert sum(len(items) for items in results) == 25
+    assert sum(totals(h)['items_accepted'] for h in pair) == 25
+    assert sum(totals(h)['items_duplicate'] for h in pair) == 25
+
+
+def test_request_latency_excludes_wait_for_a_concurrency_slot(tmp_path):
+    async def handle(request):
+        await asyncio.sleep(0.03)
+        return web.json_response({'results': [{'title': request.path, 'content': f'Report {request.path} ' * 10}]})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/{name}', handle)
+        async with serve(app) as url:
+            harvester = make_harvester(tmp_path, url, [f'/r{n}' for n in range(4)], cache_ttl=0)
+            # One request at a time against the host, so three of them queue for a slot
+            harvester.concurrency.initial_limit = harvester.concurrency.max_limit = 1
+            async with harvester:
+                await harvester.harvest()
+            return harvester
+
+    harvester = asyncio.run(scenario())
+    latencies = [metrics.latency for metrics in harvester.metrics.targets.values()]
+    assert sum(latency.count for latency in latencies) == 4
+    assert max(latency.max for latency in latencies) < 0.075
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+import harvest_sink
+from harvest_item import HarvestItem
+from harvest_sink import HarvestSink
+
+DAY_NS = 86_400 * 10 ** 9
+BASE_NS = 1_700_000_000 * 10 ** 9
+
+
+def item(n, category='Cybersecurity', offset_ns=0):
+    return HarvestItem(
+        content=f'content {n}', title=f'title {n}', url=f'https://example.org/{n}',
+        category=category, source='/feed', harvested_ns=BASE_NS + offset_ns + n, quality_score=0.9
+    )
+
+
+def test_round_trip_and_partitions(tmp_path):
+    sink = HarvestSink(tmp_path, batch_size=10)
+    sink.write(item(n) for n in range(25))
+    sink.write([item(100, offset_ns=DAY_NS), item(200, category='Medical_Research')])
+    sink.flush()
+    assert sink.items_written == 27
+    assert [i.title for i in sink.read('Cybersecurity')] == [f'title {n}' for n in range(25)] + ['title 100']
+    assert len(list(sink.read('Medical_Research'))) == 1
+    days = sorted(p.name for p in (tmp_path / 'Cybersecurity').iterdir())
+    assert len(days) == 2
+
+
+def test_time_range_reads_only_matching_items(tmp_path):
+    sink = HarvestSink(tmp_path, batch_size=5)
+    sink.write(item(n) for n in range(20))
+    sink.flush()
+    found = [i.harvested_ns - BASE_NS for i in sink.read('Cybersecurity', BASE_NS + 7, BASE_NS + 12)]
+    assert found == list(range(7, 13))
+
+
+def test_segments_roll_over(tmp_path):
+    sink = HarvestSink(tmp_path, batch_size=5, max_segment_bytes=1)
+    sink.write(item(n) for n in range(15))
+    sink.flush()
+    day = next((tmp_path / 'Cybersecurity').iterdir())
+    assert len(list(day.glob('segment-*.jsonl.gz'))) == 3
+    assert len(list(sink.read('Cybersecurity'))) == 15
+
+
+def test_flush_on_loop_does_not_block_it(tmp_path, monkeypatch):
+    real_fsync = harvest_sink.os.fsync
+    fsync_threads = set()
+
+    def slow_fsync(fd):
+        fsync_threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        real_fsync(fd)
+
+    monkeypatch.setattr(harvest_sink.os, 'fsync', slow_fsync)
+
+    async def scenario():
+        sink = HarvestSink(tmp_path, batch_size=10)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        sink.write(item(n) for n in range(40))
+        write_seconds = time.perf_counter() - started
+        await sink.aflush()
+        task.cancel()
+        return sink, write_seconds, ticks
+
+    sink, write_seconds, ticks = asyncio.run(scenario())
+    assert write_seconds < 0.05
+    # Eight slow fsyncs took ~0.4s of writer-thread time while the loop kept ticking
+    assert ticks >= 20
+    assert sink.items_written == 40 and sink.get_status()['pending_appends'] == 0
+    assert all(name.startswith('harvest-sink') for name in fsync_threads)
+    assert len(list(sink.read('Cybersecurity'))) == 40
+
+
+def test_stream_reads_back(tmp_path):
+    sink = HarvestSink(tmp_path, batch_size=3)
+    sink.write(item(n) for n in range(7))
+    sink.flush()
+
+    async def collect():
+        return [i.title async for i in sink.stream('Cybersecurity')]
+
+    assert len(asyncio.run(collect())) == 7
@@ -0,0 +1,69 @@
+import asyncio
+
+from aiohttp import web
+
+from fixture_server import make_harvester, serve
+
+TARGETS = [f'/feed/{i}' for i in range(6)]
+
+
+def items_app():
+    async def handle(request):
+        index = request.match_info['index']
+        return web.json_response({'results': [{
+            'title': f'Report {index}-{n}', 'author': 'Analyst', 'url': f'https://example.org/{index}/{n}',
+            'content': f'Detailed findings for report {index}-{n}, long enough to pass validation. ' * 3
+        } for n in range(3)]})
+
+    app = web.Application()
+    app.router.add_get('/feed/{index}', handle)
+    return app
+
+
+async def collect(harvester, limit=None):
+    titles = []
+    async with harvester:
+        async for item in harvester.harvest_stream(max_items=len(TARGETS)):
+            titles.append(item.title)
+            if limit is not None and len(titles) >= limit:
+                break
+    return titles
+
+
+def close(harvester):
+    harvester.cache.close()
+    harvester.dedup.close()
+    harvester.watermarks.close()
+
+
+def test_early_stop_does_not_lose_undelivered_items(tmp_path):
+    async def scenario():
+        async with serve(items_app()) as url:
+            first = make_harvester(tmp_path, url, TARGETS, stream_queue_size=2, cache_ttl=0)
+            delivered = await collect(first, limit=2)
+            close(first)
+            second = make_harvester(tmp_path, url, TARGETS, stream_queue_size=2, cache_ttl=0)
+            rest = await collect(second)
+            close(second)
+            return delivered, rest
+
+    delivered, rest = asyncio.run(scenario())
+    assert len(delivered) == 2
+    assert not set(delivered) & set(rest)
+    assert len(set(delivered) | set(rest)) == len(TARGETS) * 3
+
+
+def test_full_stream_then_rerun_is_deduplicated(tmp_path):
+    async def scenario():
+        async with serve(items_app()) as url:
+            first = make_harvester(tmp_path, url, TARGETS, cache_ttl=0)
+            everything = await collect(first)
+            close(first)
+            second = make_harvester(tmp_path, url, TARGETS, cache_ttl=0)
+            again = await collect(second)
+            close(second)
+            return everything, again
+
+    everything, again = asyncio.run(scenario())
+    assert len(everything) == len(TARGETS) * 3
+    assert again == []
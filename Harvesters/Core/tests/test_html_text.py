@@ -0,0 +1,107 @@
+from html_text import HtmlTextExtractor, extract_html
+
+ARTICLE = (
+    "<h1>Streaming parsers in practice</h1>"
+    "<p>Push parsers consume input as it arrives and emit events without building a tree, "
+    "which keeps memory flat no matter how large the document grows.</p>"
+    "<p>The harvester feeds each response chunk straight into the extractor, so the text of a "
+    "page is ready as soon as the last byte lands and nothing is buffered twice.</p>"
+)
+
+
+def page(body_attrs: str = '', chrome: str = '') -> bytes:
+    return (
+        f"<html><head><title>Parsers</title></head><body{body_attrs}>{chrome}"
+        f"<div class=\"content\">{ARTICLE}</div></body></html>"
+    ).encode()
+
+
+def test_plain_page_keeps_article_text():
+    result = extract_html(page())
+    assert result.title == 'Parsers'
+    assert 'Push parsers consume input' in result.text
+    assert 'nothing is buffered twice' in result.text
+
+
+def test_wordpress_body_state_classes_are_not_chrome():
+    plain = extract_html(page())
+    wordpress = extract_html(page(' class="home page-template has-header-image has-sidebar" id="top"'))
+    assert wordpress.length == plain.length > 0
+    assert wordpress.text == plain.text
+
+
+def test_hint_matches_whole_words_only():
+    result = extract_html(page(chrome='<div class="has-header-image"><p>Hero caption text</p></div>'))
+    assert 'Hero caption text' in result.text
+    skipped = extract_html(page(chrome='<div class="site-header"><p>Hero caption text</p></div>'))
+    assert 'Hero caption text' not in skipped.text
+    assert 'Push parsers consume input' in skipped.text
+
+
+def test_unclosed_hinted_list_items_end_with_their_list():
+    chrome = (
+        '<ul class="links"><li class="menu-item">Home<li class="menu-item">About'
+        '<li class="menu-item">Contact</ul>'
+    )
+    result = extract_html(page(chrome=chrome))
+    assert 'Home' not in result.text and 'Contact' not in result.text
+    assert 'nothing is buffered twice' in result.text
+
+
+def test_unclosed_hinted_paragraph_ends_at_implied_end_tag():
+    result = extract_html(page(chrome='<p class="promo">Subscribe today<p>Welcome to the blog.'))
+    assert 'Subscribe today' not in result.text
+    assert 'Welcome to the blog.' in result.text
+    assert 'Push parsers consume input' in result.text
+
+
+def test_unclosed_hinted_element_ends_when_parent_closes():
+    body = (
+        '<html><body><section><div class="ad">Buy now</section>'
+        f'<section>{ARTICLE}</section></body></html>'
+    ).encode()
+    result = extract_html(body)
+    assert 'Buy now' not in result.text
+    assert 'Push parsers consume input' in result.text
+
+
+def test_skip_tags_and_link_dense_blocks_are_dropped():
+    chrome = (
+        '<nav><a href="/">Home</a></nav><script>var x = "<p>not text</p>";</script>'
+        '<div><a href="/a">Tag one</a> <a href="/b">Tag two</a></div>'
+    )
+    result = extract_html(page(chrome=chrome))
+    assert 'Home' not in result.text
+    assert 'not text' not in result.text
+    assert 'Tag one' not in result.text
+
+
+def test_main_region_preferred_and_article_header_kept():
+    body = (
+        '<html><body><div>Site-wide teaser text that is not the article body.</div>'
+        f'<article><header><h1>Headline</h1></header>{ARTICLE}</article></body></html>'
+    ).encode()
+    result = extract_html(body)
+    assert result.text.startswith('Headline')
+    assert 'teaser' not in result.text
+
+
+def test_chunked_feed_matches_whole_document():
+    body = page(' class="has-sidebar"', '<p class="promo">Ad<p>Intro paragraph.')
+    extractor = HtmlTextExtractor()
+    for start in range(0, len(body), 7):
+        extractor.feed_bytes(body[start:start + 7])
+    assert extractor.finish().text == extract_html(body).text
+
+
+def test_head_metadata():
+    body = (
+        b'<html><head><title>T</title><meta name="author" content="A. Writer">'
+        b'<meta property="article:published_time" content="2024-05-01">'
+        b'<link rel="canonical" href="https://example.org/post"></head>'
+        b'<body><p>Body text.</p></body></html>'
+    )
+    result = extract_html(body)
+    assert (result.author, result.published_date, result.canonical_url) == (
+        'A. Writer', '2024-05-01', 'https://example.org/post'
+    )
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from json_stream import JsonItemStream, lookup_path, map_fields
+
+ITEMS = [
+    {'id': 1, 'title': 'Braces } and brackets ] in "strings"', 'tags': ['a', 'b']},
+    {'id': 2, 'title': 'Escaped \\" quote', 'nested': {'results': [9, 9]}},
+    {'id': 3, 'title': 'Unicode é中', 'score': 0.5}
+]
+
+
+def stream_all(document: bytes, size: int, **kwargs):
+    parser = JsonItemStream(**kwargs)
+    items = []
+    for start in range(0, len(document), size):
+        items.extend(parser.feed(document[start:start + size]))
+    items.extend(parser.close())
+    return parser, items
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, 64, 100_000])
+def test_enveloped_array_at_any_chunk_size(size):
+    document = json.dumps({
+        'meta': {'next_cursor': 'abc'}, 'items': ITEMS, 'total': 3
+    }, ensure_ascii=False).encode()
+    parser, items = stream_all(document, size)
+    assert items == ITEMS
+    assert parser.envelope() == {'meta': {'next_cursor': 'abc'}, 'items': None, 'total': 3}
+
+
+@pytest.mark.parametrize('size', [1, 5, 100_000])
+def test_top_level_array_of_scalars_and_objects(size):
+    values = [1, -2.5e3, 'x,]', True, None, {'k': [1, 2]}, [3]]
+    _, items = stream_all(json.dumps(values).encode(), size)
+    assert items == values
+
+
+def test_items_are_yielded_before_the_document_ends():
+    parser = JsonItemStream()
+    assert parser.feed(b'{"results": [{"id": 1}, {"id"') == [{'id': 1}]
+    assert parser.feed(b': 2}') == [{'id': 2}]
+    assert parser.feed(b']}') == []
+    assert parser.close() == []
+
+
+def test_nested_item_key_is_not_the_item_array():
+    document = json.dumps({'meta': {'items': [0]}, 'data': [{'id': 1}]}).encode()
+    parser, items = stream_all(document, 4)
+    assert items == [{'id': 1}]
+
+
+def test_object_without_item_array_falls_back_to_whole_document():
+    parser, items = stream_all(b'{"id": 7, "title": "single"}', 5)
+    assert items == [{'id': 7, 'title': 'single'}]
+    assert parser.envelope() == {'id': 7, 'title': 'single'}
+
+
+def test_configured_item_keys():
+    document = json.dumps({'vulnerabilities': [{'cve': {'id': 'CVE-1'}}]}).encode()
+    _, items = stream_all(document, 6, item_keys=(b'vulnerabilities',))
+    assert items == [{'cve': {'id': 'CVE-1'}}]
+
+
+def test_buffer_stays_small_while_streaming():
+    parser = JsonItemStream()
+    parser.feed(b'[')
+    for n in range(1000):
+        parser.feed(json.dumps({'id': n, 'body': 'x' * 100}).encode() + b',')
+    assert len(parser.buf) < 200
+    assert parser.items_seen == 1000
+
+
+def test_lookup_path_and_map_fields():
+    item = {'cve': {'id': 'CVE-1', 'descriptions': [{'value': ''}, {'value': 'Overflow'}]}}
+    assert lookup_path(item, 'cve.descriptions.1.value') == 'Overflow'
+    assert lookup_path(item, 'cve.descriptions.-1.value') == 'Overflow'
+    assert lookup_path(item, 'cve.descriptions.5.value') is None
+    assert lookup_path(item, 'cve.id.x') is None
+    mapped = map_fields(item, {
+        'title': 'cve.id',
+        'content': ['cve.descriptions.0.value', 'cve.descriptions.1.value'],
+        'author': 'cve.assigner'
+    })
+    assert mapped == {'title': 'CVE-1', 'content': 'Overflow'}
@@ -0,0 +1,62 @@
+import sys
+
+import base_harvester
+from module_registry import ModuleRegistry
+
+PROVIDER = '''
+class {name}:
+    def __init__(self):
+        self.name = "{name}"
+        self.category = "testing"
+
+
+def get_harvester_class():
+    return {name}
+'''
+
+
+def make_tree(root):
+    domain = root / 'Harvesters' / 'Widgets'
+    domain.mkdir(parents=True)
+    (domain / 'widget_harvester.py').write_text(PROVIDER.format(name='WidgetHarvester'))
+    (domain / 'helpers.py').write_text('VALUE = 1\n')
+    (root / 'Trainers').mkdir()
+    return domain
+
+
+def test_manifest_is_built_on_first_use_and_modules_load_lazily(tmp_path):
+    make_tree(tmp_path)
+    manifest = tmp_path / 'manifest.json'
+    registry = ModuleRegistry(manifest, root=tmp_path)
+    assert [entry['id'] for entry in registry.harvesters('Widgets')] == ['Widgets/widget_harvester']
+    assert manifest.exists() and registry.imports == 0
+    assert registry.get_harvester_class('WidgetHarvester')().category == 'testing'
+    registry.get_harvester_class('Widgets/widget_harvester')
+    assert registry.imports == 1
+
+
+def test_stale_lists_changed_modules(tmp_path):
+    domain = make_tree(tmp_path)
+    registry = ModuleRegistry(tmp_path / 'manifest.json', root=tmp_path)
+    assert registry.stale() == []
+    (domain / 'widget_harvester.py').write_text(PROVIDER.format(name='GadgetHarvester'))
+    assert registry.stale() == ['harvester:Widgets/widget_harvester']
+    registry.rebuild()
+    assert registry.find('harvester', 'Widgets/widget_harvester')['class'] == 'GadgetHarvester'
+
+
+def test_module_imported_normally_is_shared(tmp_path):
+    registry = ModuleRegistry(tmp_path / 'manifest.json')
+    assert registry.get_harvester_class('Core/base_harvester') is base_harvester.BaseHarvester
+    assert not any(name.startswith('echo_registry.') and name.endswith('base_harvester') for name in sys.modules)
+
+
+def test_module_on_search_path_is_imported_by_its_own_name(tmp_path, monkeypatch):
+    domain = make_tree(tmp_path)
+    monkeypatch.syspath_prepend(str(domain))
+    registry = ModuleRegistry(tmp_path / 'manifest.json', root=tmp_path)
+    try:
+        cls = registry.get_harvester_class('WidgetHarvester')
+        assert sys.modules['widget_harvester'].WidgetHarvester is cls
+    finally:
+        sys.modules.pop('widget_harvester', None)
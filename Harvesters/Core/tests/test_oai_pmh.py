@@ -0,0 +1,237 @@
+import asyncio
+import xml.etree.ElementTree as ET
+from datetime import date
+
+import pytest
+from aiohttp import web
+
+from circuit_breaker import RetryPolicy
+from dedup_index import DedupIndex
+from fixture_server import serve
+from harvest_sink import HarvestSink
+from oai_pmh import ArxivBulkIngest, OaiError, OaiPmhParser
+from watermark_store import WatermarkStore
+
+OAI = 'http://www.openarchives.org/OAI/2.0/'
+ARXIV = 'http://arxiv.org/OAI/arXiv/'
+
+
+def record(arxiv_id, categories, deleted=False, abstract=None):
+    status = ' status="deleted"' if deleted else ''
+    header = (
+        f'<header{status}><identifier>oai:arXiv.org:{arxiv_id}</identifier>'
+        f'<datestamp>2024-01-02</datestamp><setSpec>cs</setSpec></header>'
+    )
+    if deleted:
+        return f'<record>{header}</record>'
+    return (
+        f'<record>{header}<metadata><arXiv xmlns="{ARXIV}"><id>{arxiv_id}</id>'
+        f'<created>2024-01-01</created><authors><author><keyname>Noether</keyname>'
+        f'<forenames>Emmy</forenames></author></authors><title>Paper {arxiv_id}</title>'
+        f'<categories>{categories}</categories>'
+        f'<abstract>{abstract or f"Abstract of {arxiv_id}."}</abstract></arXiv></metadata></record>'
+    )
+
+
+def response(body, token=None, error=None):
+    if error:
+        inner = f'<error code="{error}">{error} happened</error>'
+    else:
+        resumption = f'<resumptionToken completeListSize="3">{token or ""}</resumptionToken>'
+        inner = f'<ListRecords>{body}{resumption}</ListRecords>'
+    return web.Response(text=f'<?xml version="1.0"?><OAI-PMH xmlns="{OAI}">{inner}</OAI-PMH>',
+                        content_type='text/xml')
+
+
+def fixture_app(log, failing=(), expired=(), truncated=()):
+    """ListRecords over two pages per window, with the second page behind a resumption token
+
+    Tokens in ``failing`` are answered with 403, those in ``expired`` with badResumptionToken,
+    and those in ``truncated`` with a page cut off after its first record.
+    """
+
+    async def list_records(request):
+        query = dict(request.query)
+        log.append(query)
+        assert query['verb'] == 'ListRecords'
+        token = query.get('resumptionToken')
+        if token in expired:
+            return response('', error='badResumptionToken')
+        if token in failing:
+            return web.Response(status=403, text='forbidden')
+        if token in truncated:
+            window = token.split('|')[0]
+            text = f'<OAI-PMH xmlns="{OAI}"><ListRecords>{record(f"{window}.0003", "quant-ph")}<record><hea'
+            return web.Response(text=text, content_type='text/xml')
+        if token:
+            window = token.split('|')[0]
+            return response(record(f'{window}.0003', 'quant-ph'))
+        if query['from'] == '2024-02-01':
+            return response('', error='noRecordsMatch')
+        window = query['from']
+        return response(
+            record(f'{window}.0001', 'cs.AI cs.LG') + record(f'{window}.0002', 'math.CO', deleted=True),
+            token=f'{window}|page2'
+        )
+
+    app = web.Application()
+    app.router.add_get('/oai', list_records)
+    return app
+
+
+def make_ingest(tmp_path, base_url, watermarks=None, **kwargs):
+    ingest = ArxivBulkIngest(f'{base_url}/oai', sink=HarvestSink(tmp_path / 'sink'), rate_limit=1000,
+                             chunk_size=128, **kwargs)
+    ingest.retry_policy = RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.01)
+    ingest.dedup = DedupIndex(tmp_path / 'seen.sqlite')
+    ingest.watermarks = watermarks or WatermarkStore(tmp_path / 'watermarks.sqlite')
+    return ingest
+
+
+def run_ingest(tmp_path, log, from_date, until_date):
+    async def scenario():
+        async with serve(fixture_app(log)) as base_url:
+            async with make_ingest(tmp_path, base_url, window_days=1) as ingest:
+                try:
+                    await ingest.run(from_date, until_date)
+                finally:
+                    ingest.dedup.close()
+                return ingest
+
+    return asyncio.run(scenario())
+
+
+def test_windows_cover_range_inclusively():
+    ingest = ArxivBulkIngest(sink=HarvestSink(), window_days=10)
+    assert ingest.windows(date(2024, 1, 1), date(2024, 1, 25)) == [
+        ('2024-01-01', '2024-01-10'), ('2024-01-11', '2024-01-20'), ('2024-01-21', '2024-01-25')
+    ]
+
+
+def test_follows_tokens_and_fans_out_to_routes(tmp_path):
+    log = []
+    ingest = run_ingest(tmp_path, log, '2024-01-01', '2024-01-02')
+    assert [entry.get('from') or entry['resumptionToken'] for entry in log] == [
+        '2024-01-01', '2024-01-01|page2', '2024-01-02', '2024-01-02|page2'
+    ]
+    assert log[0]['metadataPrefix'] == 'arXiv' and log[0]['until'] == '2024-01-01'
+    status = ingest.get_status()
+    assert (status['pages'], status['records'], status['deleted']) == (4, 6, 2)
+    assert status['routed'] == {
+        'Academic_Papers/arxiv_general': 4, 'AI_Research/arxiv_ai': 2,
+        'Quantum/quantum_arxiv': 2, 'Quantum_Computing/quantum_arxiv': 2
+    }
+    assert status['watermark'] == '2024-01-02'
+    ai = list(ingest.sink.read('AI_Research'))
+    assert [item.url for item in ai] == ['https://arxiv.org/abs/2024-01-01.0001', 'https://arxiv.org/abs/2024-01-02.0001']
+    assert ai[0].title == 'Paper 2024-01-01.0001' and ai[0].source == 'AI_Research/arxiv_ai'
+    assert ingest.watermarks.get(ingest.name, ingest.target + '#resume') is None
+
+
+def test_rerun_drops_already_ingested_records(tmp_path):
+    run_ingest(tmp_path, [], '2024-01-01', '2024-01-01')
+    again = run_ingest(tmp_path, [], '2024-01-01', '2024-01-01')
+    assert again.duplicates == 2
+    assert sum(again.routed.values()) == 0
+
+
+def test_no_records_match_is_an_empty_window(tmp_path):
+    log = []
+    ingest = run_ingest(tmp_path, log, '2024-02-01', '2024-02-01')
+    assert len(log) == 1 and ingest.records == 0
+    assert ingest.get_status()['watermark'] == '2024-02-01'
+
+
+def test_interrupted_window_resumes_from_saved_token(tmp_path):
+    watermarks = WatermarkStore(tmp_path / 'watermarks.sqlite')
+    log = []
+    failing = {'2024-01-01|page2'}
+
+    async def scenario():
+        async with serve(fixture_app(log, failing=failing)) as base_url:
+            async with make_ingest(tmp_path, base_url, watermarks, window_days=1) as ingest:
+                with pytest.raises(OaiError, match='HTTP 403'):
+                    await ingest.run('2024-01-01', '2024-01-01')
+                resume = watermarks.get(ingest.name, ingest.target + '#resume')
+                ingest.dedup.close()
+            log.clear()
+            failing.clear()
+            async with make_ingest(tmp_path, base_url, watermarks, window_days=1) as resumed:
+                await resumed.run(until_date='2024-01-01')
+                resumed.dedup.close()
+                return resume, resumed
+
+    resume, resumed = asyncio.run(scenario())
+    assert resume == {'from': '2024-01-01', 'until': '2024-01-01', 'token': '2024-01-01|page2'}
+    assert [entry.get('resumptionToken') for entry in log] == ['2024-01-01|page2']
+    assert resumed.routed['Quantum/quantum_arxiv'] == 1
+    assert watermarks.get(resumed.name, resumed.target + '#resume') is None
+
+
+def test_records_of_a_failed_page_are_not_marked_seen(tmp_path):
+    watermarks = WatermarkStore(tmp_path / 'watermarks.sqlite')
+    truncated = {'2024-01-01|page2'}
+
+    async def scenario():
+        async with serve(fixture_app([], truncated=truncated)) as base_url:
+            async with make_ingest(tmp_path, base_url, watermarks, window_days=1) as ingest:
+                with pytest.raises(ET.ParseError):
+                    await ingest.run('2024-01-01', '2024-01-01')
+                # The process dies here: nothing else is flushed or closed
+                assert ingest.routed['Quantum/quantum_arxiv'] == 1
+            truncated.clear()
+            async with make_ingest(tmp_path, base_url, watermarks, window_days=1) as resumed:
+                await resumed.run(until_date='2024-01-01')
+                resumed.dedup.close()
+                return resumed
+
+    resumed = asyncio.run(scenario())
+    assert resumed.duplicates == 0
+    assert resumed.routed['Quantum/quantum_arxiv'] == 1
+    urls = [item.url for item in resumed.sink.read('Academic_Papers')]
+    assert urls == ['https://arxiv.org/abs/2024-01-01.0001', 'https://arxiv.org/abs/2024-01-01.0003']
+
+
+def test_expired_token_restarts_window(tmp_path):
+    watermarks = WatermarkStore(tmp_path / 'watermarks.sqlite')
+    log = []
+
+    async def scenario():
+        async with serve(fixture_app(log, expired=('stale',))) as base_url:
+            async with make_ingest(tmp_path, base_url, watermarks, window_days=1) as ingest:
+                watermarks.set(ingest.name, ingest.target + '#resume',
+                               {'from': '2024-01-01', 'until': '2024-01-01', 'token': 'stale'})
+                await ingest.run(until_date='2024-01-01')
+                ingest.dedup.close()
+                return ingest
+
+    ingest = asyncio.run(scenario())
+    assert [entry.get('resumptionToken') or entry['from'] for entry in log] == [
+        'stale', '2024-01-01', '2024-01-01|page2'
+    ]
+    assert ingest.routed['Academic_Papers/arxiv_general'] == 2
+
+
+def test_parser_reads_oai_dc_and_errors():
+    body = (
+        f'<OAI-PMH xmlns="{OAI}"><ListRecords><record><header><identifier>oai:arXiv.org:1</identifier>'
+        f'<datestamp>2024-01-01</datestamp></header><metadata>'
+        f'<oai_dc:dc xmlns:oai_dc="http://www.openarchives.org/OAI/2.0/oai_dc/" '
+        f'xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:title>T</dc:title><dc:creator>A. Author</dc:creator>'
+        f'<dc:subject>Computer Science - Learning</dc:subject><dc:description>D</dc:description>'
+        f'<dc:date>2024-01-01</dc:date></oai_dc:dc></metadata></record>'
+        f'<resumptionToken completeListSize="9">next</resumptionToken></ListRecords></OAI-PMH>'
+    ).encode()
+    parser = OaiPmhParser()
+    records = []
+    for start in range(0, len(body), 11):
+        records.extend(parser.feed(body[start:start + 11]))
+    records.extend(parser.close())
+    assert [(r.title, r.abstract, r.authors, r.published) for r in records] == [
+        ('T', 'D', ['A. Author'], '2024-01-01')
+    ]
+    assert (parser.resumption_token, parser.complete_list_size) == ('next', 9)
+
+    failed = OaiPmhParser()
+    failed.feed(f'<OAI-PMH xmlns="{OAI}"><error code="badArgument">bad from</error></OAI-PMH>'.encode())
+    assert failed.error == ('badArgument', 'bad from')
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+from aiohttp import web
+
+from catalog_engine import CatalogEngine, SourceSpec
+from dedup_index import DedupIndex
+from fixture_server import serve
+from harvest_sink import HarvestSink
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from harvester_orchestrator import HarvestJob, HarvesterOrchestrator  # noqa: E402
+
+
+class ConcurrencyProbe:
+    """Handler recording peak in-flight requests per source path prefix"""
+
+    def __init__(self):
+        self.active = {}
+        self.peak = {}
+        self.total = 0
+        self.peak_total = 0
+
+    async def handle(self, request):
+        source = request.match_info['source']
+        self.active[source] = self.active.get(source, 0) + 1
+        self.total += 1
+        self.peak[source] = max(self.peak.get(source, 0), self.active[source])
+        self.peak_total = max(self.peak_total, self.total)
+        await asyncio.sleep(0.05)
+        self.active[source] -= 1
+        self.total -= 1
+        item = request.path_qs.strip('/').replace('/', ' ')
+        return web.json_response({'results': [{
+            'title': f'Item {item}', 'author': 'Probe',
+            'content': f'Substantial body text for {item} so the item passes validation. ' * 3
+        }]})
+
+
+def write_catalog(root: Path, url: str, sources, targets=12, **config):
+    domain = root / 'Testing'
+    domain.mkdir(parents=True)
+    domain.joinpath('catalog.json').write_text(json.dumps({'domain': 'Testing', 'sources': [
+        {'name': name, 'enabled': True, 'base_urls': [url], 'rate_limit': 1000,
+         'max_concurrency': width, 'endpoints': [f'/{name}/{i}' for i in range(targets)], **config}
+        for name, width in sources
+    ]}))
+
+
+def sweep(tmp_path, sources, max_connections, **catalog):
+    probe = ConcurrencyProbe()
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/{source}/{index}', probe.handle)
+        async with serve(app) as url:
+            write_catalog(tmp_path / 'catalogs', url, sources, **catalog)
+            orchestrator = HarvesterOrchestrator(
+                max_harvesters=len(sources), max_connections=max_connections,
+                engine=CatalogEngine(tmp_path / 'catalogs'), sink=HarvestSink(tmp_path / 'sink')
+            )
+            orchestrator.select(['Testing'])
+            status = await orchestrator.sweep(max_items=12)
+            return status
+
+    return probe, asyncio.run(scenario())
+
+
+def test_sources_keep_their_own_concurrency_limit(tmp_path):
+    probe, _ = sweep(tmp_path, [('narrow', 2), ('wide', 8)], max_connections=64)
+    assert probe.peak['narrow'] == 2
+    assert probe.peak['wide'] > 2
+
+
+def test_connection_budget_caps_all_sources(tmp_path):
+    probe, _ = sweep(tmp_path, [('first', 8), ('second', 8)], max_connections=3)
+    assert probe.peak_total == 3
+
+
+def test_connection_budget_counts_every_paginated_request(tmp_path):
+    # One target at a time per source, but each prefetches pages ahead
+    pagination = {'scheme': 'page', 'page_size': 1, 'prefetch': 3, 'max_pages': 6}
+    probe, status = sweep(tmp_path, [('paged', 1)], max_connections=2, targets=2, pagination=pagination,
+                          cache_ttl=0)
+    assert probe.peak_total == 2
+    assert status['harvesters'][0]['requests'] >= 6
+
+
+class LegacyHarvester:
+    """Stand-in for a legacy template module: harvest() returns plain dicts"""
+
+    def __init__(self):
+        self.rate_limiter = asyncio.Semaphore(2)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def harvest(self, max_items=50):
+        return [{'title': f'Legacy {n}', 'url': f'https://legacy.example.org/{n}', 'category': 'Testing',
+                 'content': f'Legacy template content number {n}', 'quality_score': 0.8} for n in range(5)]
+
+
+class LegacyRegistry:
+    def get_harvester_class(self, name):
+        return LegacyHarvester
+
+
+def test_legacy_items_are_stored_only_when_delivered(tmp_path):
+    def orchestrator():
+        built = HarvesterOrchestrator(max_harvesters=1, engine=CatalogEngine(tmp_path / 'none'),
+                                      sink=HarvestSink(tmp_path / 'sink'), queue_size=1)
+        built.registry = LegacyRegistry()
+        built.dedup = DedupIndex(tmp_path / 'seen.sqlite')
+        built.submit(HarvestJob(SourceSpec('Testing', 'old', {}, enabled=False, module='Testing/old'), legacy=True))
+        return built
+
+    async def first_only():
+        sweep = orchestrator()
+        stream = sweep.stream()
+        async for item in stream:
+            break
+        await stream.aclose()
+        sweep.dedup.close()
+        return item.title
+
+    async def everything():
+        sweep = orchestrator()
+        titles = [item.title async for item in sweep.stream()]
+        sweep.dedup.close()
+        return titles
+
+    first = asyncio.run(first_only())
+    assert [item.title for item in HarvestSink(tmp_path / 'sink').read('Testing')] == [first]
+    # Items the consumer never received were neither stored nor kept as seen
+    rest = asyncio.run(everything())
+    assert sorted(rest) == sorted({f'Legacy {n}' for n in range(5)} - {first})
+    assert len(list(HarvestSink(tmp_path / 'sink').read('Testing'))) == 5
@@ -0,0 +1,116 @@
+import asyncio
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+from pagination import Page, Pagination, next_link, with_params
+
+BASE = 'https://api.example.org/items?q=x'
+
+
+def query(url):
+    return dict(parse_qsl(urlsplit(url).query))
+
+
+def test_with_params_replaces_existing_values():
+    assert query(with_params('https://a.org/x?page=1&q=y', {'page': 2})) == {'page': '2', 'q': 'y'}
+
+
+def test_next_link_parses_rfc8288_header():
+    header = '<https://a.org/x?page=1>; rel="prev", </x?page=3>; rel="next last"'
+    assert next_link('https://a.org/x?page=2', header) == 'https://a.org/x?page=3'
+    assert next_link('https://a.org/x', '<https://a.org/x?page=1>; rel="prev"') is None
+    assert next_link('https://a.org/x', None) is None
+
+
+def test_unknown_scheme_rejected():
+    with pytest.raises(ValueError):
+        Pagination('token')
+
+
+def test_offset_urls_and_short_page_stops():
+    pagination = Pagination.from_config({'scheme': 'offset', 'limit_param': 'limit', 'page_size': 50})
+    assert query(pagination.page_url(BASE, 2)) == {'q': 'x', 'offset': '100', 'limit': '50'}
+    url = pagination.page_url(BASE, 0)
+    assert query(pagination.next_from_body(url, {}, 50))['offset'] == '50'
+    assert pagination.next_from_body(url, {}, 49) is None
+
+
+def test_body_cursor_and_header_cursor():
+    body = Pagination('cursor', field='meta.next')
+    assert query(body.next_from_body(BASE, {'meta': {'next': 'tok'}}, 10))['cursor'] == 'tok'
+    assert body.next_from_body(BASE, {'meta': {'next': ''}}, 10) is None
+    header = Pagination('cursor', param='after', header='X-Next-Cursor')
+    assert query(header.next_from_headers(BASE, {'X-Next-Cursor': 'h1'}))['after'] == 'h1'
+    assert header.next_from_body(BASE, {'next_cursor': 'ignored'}, 10) is None
+
+
+def page_fetcher(pages, log, fail=None, delay=0.0):
+    """Fetcher over an in-memory site: pages maps a page number to its item count"""
+
+    async def fetch(url, on_next):
+        number = int(query(url)['page'])
+        log.append(number)
+        await asyncio.sleep(delay)
+        if number == fail:
+            return None
+        count = pages.get(number, 0)
+        return Page([f'{number}-{n}' for n in range(count)], url if count == 2 else None)
+
+    return fetch
+
+
+def test_page_window_prefetches_and_cancels_unneeded_pages():
+    pagination = Pagination('page', page_size=2, prefetch=3, max_pages=10)
+    log = []
+    items, completed = asyncio.run(pagination.walk(page_fetcher({1: 2, 2: 2, 3: 1}, log, delay=0.01), BASE))
+    assert completed
+    assert items == ['1-0', '1-1', '2-0', '2-1', '3-0']
+    # Pages past the short one were requested ahead of time, then dropped
+    assert sorted(log)[:3] == [1, 2, 3] and len(log) > 3
+
+
+def test_failed_page_keeps_earlier_items():
+    pagination = Pagination('page', page_size=2, prefetch=0)
+    items, completed = asyncio.run(pagination.walk(page_fetcher({1: 2, 2: 2, 3: 2}, [], fail=2), BASE))
+    assert not completed
+    assert items == ['1-0', '1-1']
+
+
+def test_max_pages_caps_the_walk():
+    pagination = Pagination('page', page_size=2, prefetch=5, max_pages=3)
+    log = []
+    items, completed = asyncio.run(pagination.walk(page_fetcher({n: 2 for n in range(1, 10)}, log), BASE))
+    assert completed and len(items) == 6
+    assert sorted(log) == [1, 2, 3]
+
+
+def test_link_chain_starts_next_page_from_headers():
+    pagination = Pagination('link', max_pages=5)
+    started = []
+
+    async def fetch(url, on_next):
+        number = int(query(url).get('n', 1))
+        started.append(number)
+        next_url = with_params(url, {'n': number + 1}) if number < 3 else None
+        if next_url:
+            # Headers arrived: the next request goes out before this body is parsed
+            on_next(next_url)
+            await asyncio.sleep(0)
+            assert number + 1 in started
+        return Page([number], next_url)
+
+    items, completed = asyncio.run(pagination.walk(fetch, BASE))
+    assert completed and items == [1, 2, 3]
+
+
+def test_link_chain_stops_on_repeated_url():
+    pagination = Pagination('link', max_pages=10)
+    calls = []
+
+    async def fetch(url, on_next):
+        calls.append(url)
+        return Page(['same'], url)
+
+    items, completed = asyncio.run(pagination.walk(fetch, BASE))
+    assert completed and items == ['same'] and calls == [BASE]
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from aiohttp import web
+
+from fixture_server import make_harvester, serve
+from parse_offload import ParseOffload, parse_json_payload
+
+TARGETS = ['/feed/1', '/feed/2']
+
+
+def documents(index):
+    """Mixed items: alternate field names, non-dict entries and items without content"""
+    return {'meta': {'page': 1}, 'data': [
+        {'title': f'Advisory {index}-1', 'author': 'Analyst', 'url': f'https://example.org/{index}/1',
+         'content': f'Detailed findings for advisory {index}-1, long enough to pass validation. ' * 3,
+         'updated': f'2024-01-0{index}'},
+        {'name': f'Bulletin {index}-2', 'link': f'https://example.org/{index}/2', 'tags': ['cve', 'linux'],
+         'description': f'Kernel bulletin {index}-2 describing a privilege escalation in depth. ' * 4,
+         'updated': f'2024-02-0{index}'},
+        {'title': 'Teaser', 'content': '', 'updated': '2025-01-01'},
+        'not an item',
+        {'content': f'Untitled note {index}-4 with a permalink-free body that is long enough. ' * 2}
+    ]}
+
+
+def feed_app():
+    async def handle(request):
+        return web.json_response(documents(request.match_info['index']))
+
+    app = web.Application()
+    app.router.add_get('/feed/{index}', handle)
+    return app
+
+
+async def harvest(state_dir, url, offload, runs):
+    config = dict(cache_ttl=0, incremental={'field': 'updated', 'param': 'since'})
+    if offload:
+        config['parse_offload_bytes'] = 1
+    harvester = make_harvester(state_dir, url, TARGETS, **config)
+    harvester.offload = ParseOffload(1)
+    results = []
+    try:
+        for _ in range(runs):
+            async with harvester:
+                results.append(await harvester.harvest())
+    finally:
+        harvester.offload.shutdown()
+    return harvester, results
+
+
+def run_both(tmp_path, runs=1):
+    async def scenario():
+        async with serve(feed_app()) as url:
+            in_process = await harvest(tmp_path / 'in_process', url, False, runs)
+            offloaded = await harvest(tmp_path / 'offloaded', url, True, runs)
+            return in_process, offloaded
+
+    return asyncio.run(scenario())
+
+
+def cursors(harvester):
+    return [harvester.watermarks.get(harvester.name, target) for target in harvester._get_harvest_targets()]
+
+
+def records(items):
+    return sorted((item.content, item.title, item.url, item.source, item.quality_score) for item in items)
+
+
+def test_offloaded_parse_matches_in_process_parse(tmp_path):
+    (streamed, [streamed_items]), (offloaded, [offloaded_items]) = run_both(tmp_path)
+    assert offloaded.offload.submitted == len(TARGETS) and streamed.offload.submitted == 0
+    assert len(streamed_items) == 3 * len(TARGETS)
+    assert records(offloaded_items) == records(streamed_items)
+    # Cursors come from every raw item, including ones without content
+    assert cursors(offloaded) == cursors(streamed) == ['2025-01-01'] * len(TARGETS)
+
+
+def test_offloaded_duplicates_are_counted(tmp_path):
+    (streamed, streamed_runs), (offloaded, offloaded_runs) = run_both(tmp_path, runs=2)
+    assert streamed_runs[1] == offloaded_runs[1] == []
+    totals = [h.metrics.get_status()['totals'] for h in (streamed, offloaded)]
+    assert totals[0]['items_duplicate'] == totals[1]['items_duplicate'] == 3 * len(TARGETS)
+
+
+def test_parse_json_payload_envelope_and_counts():
+    parsed = parse_json_payload(json.dumps(documents(1)).encode(), '/feed/1', {}, 'updated')
+    assert parsed.raw_count == 5 and len(parsed.records) == 3
+    assert parsed.envelope == {'meta': {'page': 1}, 'data': None}
+    assert sorted(parsed.cursor_values) == ['2024-01-01', '2024-02-01', '2025-01-01']
@@ -0,0 +1,236 @@
+import asyncio
+import xml.etree.ElementTree as ET
+from datetime import date, timedelta
+
+import pytest
+from aiohttp import web
+
+from circuit_breaker import RetryPolicy
+from dedup_index import DedupIndex
+from fixture_server import serve
+from harvest_sink import HarvestSink
+from pubmed_eutils import EutilsError, PubmedArticleParser, PubmedIngest
+from rate_limiter import HostRateLimiter
+from watermark_store import WatermarkStore
+
+# Records the fixture reports per day; two days exceed one search's 10,000
+PER_DAY = 6000
+BATCH = 5000
+
+
+def article(pmid, abstract=None, title=None):
+    abstract = f'Findings of study {pmid}.' if abstract is None else abstract
+    abstract_xml = f'<Abstract><AbstractText Label="RESULTS">{abstract}</AbstractText></Abstract>' if abstract else ''
+    return (
+        f'<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>'
+        f'<Journal><Title>Journal of Tests</Title><JournalIssue><PubDate><Year>2024</Year>'
+        f'<Month>Jan</Month></PubDate></JournalIssue></Journal>'
+        f'<ArticleTitle>{title or f"Article {pmid}"}</ArticleTitle>{abstract_xml}'
+        f'<AuthorList><Author><LastName>Curie</LastName><ForeName>Marie</ForeName></Author></AuthorList>'
+        f'</Article></MedlineCitation><PubmedData><ArticleIdList>'
+        f'<ArticleId IdType="doi">10.1000/{pmid}</ArticleId></ArticleIdList></PubmedData></PubmedArticle>'
+    )
+
+
+def fixture_app(log, efetch_error=None, faults=None, release=None):
+    """E-utilities stand-in: each day holds PER_DAY records, two of which come back per window
+
+    ``faults`` maps a retstart to how its next efetch misbehaves: 'drop' closes the
+    connection after the first article, 'malformed' sends broken XML after it,
+    'reject' answers 400 and 'hang' waits for ``release``.
+    """
+    faults = faults if faults is not None else {}
+
+    def days(query):
+        start = date(*map(int, query['mindate'].split('/')))
+        end = date(*map(int, query['maxdate'].split('/')))
+        return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+    async def esearch(request):
+        query = request.query
+        log.append(('esearch', query['mindate'], query['maxdate']))
+        assert query['usehistory'] == 'y' and query['db'] == 'pubmed'
+        span = days(query)
+        return web.json_response({'esearchresult': {
+            'count': str(PER_DAY * len(span)),
+            'webenv': f"WE_{query['mindate']}_{query['maxdate']}",
+            'querykey': '1'
+        }})
+
+    async def efetch(request):
+        query = request.query
+        log.append(('efetch', query['WebEnv'], int(query['retstart']), int(query['retmax'])))
+        if efetch_error:
+            return web.Response(text=f'<eFetchResult><ERROR>{efetch_error}</ERROR></eFetchResult>')
+        day = query['WebEnv'].split('_')[1].replace('/', '')
+        retstart = query['retstart']
+        body = (
+            article(f'{day}{retstart}1')
+            + article(f'{day}{retstart}2', abstract='')
+            # The same article listed under every window
+            + article('999', abstract='Shared abstract.', title='Shared')
+        )
+        fault = faults.pop(int(retstart), None)
+        if fault == 'reject':
+            return web.Response(status=400, text='bad request')
+        if fault == 'hang':
+            await release.wait()
+        if fault in ('drop', 'malformed'):
+            response = web.StreamResponse(headers={'Content-Type': 'text/xml'})
+            response.content_length = 100_000
+            await response.prepare(request)
+            await response.write(f'<PubmedArticleSet>{article(f"{day}{retstart}1")}'.encode())
+            if fault == 'malformed':
+                await asyncio.sleep(0.05)
+                await response.write(b'<PubmedArticle></Broken>' + b' ' * 100_000)
+            else:
+                await response.write(b' ' * 1000)
+                request.transport.close()
+            return response
+        return web.Response(text=f'<?xml version="1.0"?><PubmedArticleSet>{body}</PubmedArticleSet>',
+                            content_type='text/xml')
+
+    app = web.Application()
+    app.router.add_get('/esearch.fcgi', esearch)
+    app.router.add_get('/efetch.fcgi', efetch)
+    return app
+
+
+def make_ingest(tmp_path, base_url, **kwargs):
+    ingest = PubmedIngest('test[ti]', base_url=base_url, batch_size=BATCH, sink=HarvestSink(tmp_path / 'sink'),
+                          chunk_size=256, **kwargs)
+    ingest.host_limiter = HostRateLimiter(1000)
+    ingest.retry_policy = RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.01)
+    ingest.dedup = DedupIndex(tmp_path / 'seen.sqlite')
+    ingest.watermarks = WatermarkStore(tmp_path / 'watermarks.sqlite')
+    return ingest
+
+
+def test_ingest_splits_range_and_fetches_windows(tmp_path):
+    log = []
+
+    async def scenario():
+        async with serve(fixture_app(log)) as base_url:
+            async with make_ingest(tmp_path, base_url) as ingest:
+                status = await ingest.run('2024/01/01', '2024/01/02')
+                return ingest, status
+
+    ingest, status = asyncio.run(scenario())
+    searches = [entry for entry in log if entry[0] == 'esearch']
+    assert searches == [
+        ('esearch', '2024/01/01', '2024/01/02'),
+        ('esearch', '2024/01/01', '2024/01/01'),
+        ('esearch', '2024/01/02', '2024/01/02')
+    ]
+    fetches = sorted(entry[1:] for entry in log if entry[0] == 'efetch')
+    assert fetches == [
+        ('WE_2024/01/01_2024/01/01', 0, BATCH), ('WE_2024/01/01_2024/01/01', BATCH, BATCH),
+        ('WE_2024/01/02_2024/01/02', 0, BATCH), ('WE_2024/01/02_2024/01/02', BATCH, BATCH)
+    ]
+    assert (status['searches'], status['fetches'], status['records']) == (3, 4, 12)
+    # Abstract-less records are dropped and the repeated article is admitted once
+    assert status['accepted'] == 5
+    assert status['watermark'] == '2024/01/02'
+
+    items = list(ingest.sink.read('Academic_Papers'))
+    assert len(items) == 5
+    first = next(item for item in items if item.url.endswith('/2024010101/'))
+    assert first.title == 'Article 2024010101'
+    assert first.content == 'RESULTS: Findings of study 2024010101.'
+    assert first.source == 'Academic_Papers/pubmed'
+    ingest.dedup.close()
+    ingest.watermarks.close()
+
+
+def test_incremental_run_starts_at_watermark(tmp_path):
+    log = []
+
+    async def scenario():
+        async with serve(fixture_app(log)) as base_url:
+            async with make_ingest(tmp_path, base_url) as ingest:
+                ingest.watermarks.set(ingest.name, ingest.target, '2024/03/05')
+                await ingest.run(until_date='2024/03/05')
+                return ingest
+
+    ingest = asyncio.run(scenario())
+    assert log[0] == ('esearch', '2024/03/05', '2024/03/05')
+    ingest.dedup.close()
+    ingest.watermarks.close()
+
+
+def test_efetch_error_document_raises(tmp_path):
+    async def scenario():
+        async with serve(fixture_app([], efetch_error='Unable to obtain query #1')) as base_url:
+            async with make_ingest(tmp_path, base_url) as ingest:
+                try:
+                    await ingest.run('2024/01/01', '2024/01/01')
+                finally:
+                    ingest.dedup.close()
+                    ingest.watermarks.close()
+
+    with pytest.raises(EutilsError, match='Unable to obtain query'):
+        asyncio.run(scenario())
+
+
+def test_parser_handles_arbitrary_chunking():
+    body = f'<PubmedArticleSet>{article("1")}{article("2", abstract="")}</PubmedArticleSet>'.encode()
+    parser = PubmedArticleParser()
+    records = []
+    for start in range(0, len(body), 13):
+        records.extend(parser.feed(body[start:start + 13]))
+    records.extend(parser.close())
+    assert [record.pmid for record in records] == ['1', '2']
+    first = records[0]
+    assert (first.authors, first.doi, first.published, first.journal) == (
+        ['Marie Curie'], '10.1000/1', '2024-Jan', 'Journal of Tests'
+    )
+    assert records[1].abstract is None
+
+
+def test_broken_efetch_body_is_retried(tmp_path):
+    log = []
+
+    async def scenario():
+        async with serve(fixture_app(log, faults={BATCH: 'drop'})) as base_url:
+            async with make_ingest(tmp_path, base_url) as ingest:
+                status = await ingest.run('2024/01/01', '2024/01/01')
+                ingest.dedup.close()
+                return status
+
+    status = asyncio.run(scenario())
+    assert [entry[2] for entry in log if entry[0] == 'efetch'].count(BATCH) == 2
+    assert (status['fetches'], status['accepted']) == (2, 3)
+
+
+def test_failed_window_cancels_the_others(tmp_path):
+    async def scenario():
+        release = asyncio.Event()
+        async with serve(fixture_app([], faults={0: 'reject', BATCH: 'hang'}, release=release)) as base_url:
+            async with make_ingest(tmp_path, base_url, concurrency=2) as ingest:
+                with pytest.raises(EutilsError, match='HTTP 400'):
+                    await asyncio.wait_for(ingest.run('2024/01/01', '2024/01/01'), 5)
+                ingest.dedup.close()
+                left = [task for task in asyncio.all_tasks() if 'fetch' in task.get_coro().__qualname__]
+            release.set()
+            return left
+
+    assert asyncio.run(scenario()) == []
+
+
+def test_records_of_a_failed_window_are_not_marked_seen(tmp_path):
+    async def scenario():
+        async with serve(fixture_app([], faults={BATCH: 'malformed'})) as base_url:
+            async with make_ingest(tmp_path, base_url, concurrency=1) as ingest:
+                with pytest.raises(ET.ParseError):
+                    await ingest.run('2024/01/01', '2024/01/01')
+                # The process dies here: nothing else is flushed or closed
+                assert ingest.accepted == 3
+
+    asyncio.run(scenario())
+    reopened = DedupIndex(tmp_path / 'seen.sqlite')
+    source = 'https://pubmed.ncbi.nlm.nih.gov/'
+    assert reopened.contains('RESULTS: Findings of study 2024010101.', f'{source}2024010101/', source)
+    assert not reopened.contains('RESULTS: Findings of study 2024010150001.', f'{source}2024010150001/', source)
+    stored = [item.url for item in HarvestSink(tmp_path / 'sink').read('Academic_Papers')]
+    assert f'{source}2024010101/' in stored
+    reopened.close()
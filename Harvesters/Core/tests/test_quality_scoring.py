@@ -0,0 +1,87 @@
+import random
+
+import numpy as np
+
+from base_harvester import BaseHarvester
+from harvest_item import HarvestItem
+from quality_scoring import DEFAULT_SCORING_TABLE, BatchQualityScorer
+
+
+def legacy_score(item):
+    """The per-item scorer BaseHarvester used before batch scoring"""
+    score = 0.5
+
+    content = str(item.get('content', ''))
+    if len(content) > 100:
+        score += 0.2
+    if len(content) > 500:
+        score += 0.1
+
+    if item.get('title') and len(str(item['title'])) > 10:
+        score += 0.1
+
+    if item.get('author') or item.get('published_date'):
+        score += 0.1
+
+    return min(1.0, score)
+
+
+def legacy_validate(data, threshold):
+    quality_items = [d for d in data if d.get('quality_score', 0) >= threshold]
+    return len(quality_items) >= len(data) * 0.5
+
+
+def mixed_items(count, seed=7):
+    """Raw items around every threshold, with missing, empty and non-string fields"""
+    rng = random.Random(seed)
+    lengths = [0, 1, 99, 100, 101, 499, 500, 501, 2000]
+    titles = [None, '', 'short', 'ten chars!', 'eleven char', 12345678901, 'A much longer descriptive title']
+    metadata = [{}, {'author': ''}, {'author': 'A. Author'}, {'published_date': '2024-01-01'},
+                {'author': None, 'published_date': 0}, {'authors': ['ignored by default']}]
+    items = []
+    for _ in range(count):
+        item = dict(rng.choice(metadata))
+        length = rng.choice(lengths)
+        if length or rng.random() < 0.5:
+            item['content'] = 'x' * length if rng.random() < 0.9 else length
+        title = rng.choice(titles)
+        if title is not None:
+            item['title'] = title
+        items.append(item)
+    return items
+
+
+def test_batch_scores_match_the_legacy_per_item_scorer():
+    items = mixed_items(2000)
+    scores = BatchQualityScorer(DEFAULT_SCORING_TABLE).score(items)
+    assert scores.dtype == np.float64 and len(scores) == len(items)
+    assert scores.tolist() == [legacy_score(item) for item in items]
+
+
+def test_harvester_scores_and_validation_match_legacy():
+    harvester = BaseHarvester()
+    items = mixed_items(300, seed=11)
+    assert [harvester._calculate_quality_score(item) for item in items] == [legacy_score(item) for item in items]
+
+    for seed in range(20):
+        batch = mixed_items(9, seed=seed)
+        processed = [
+            HarvestItem(str(item.get('content', '')), str(item.get('title', 'Untitled')), 'https://example.org',
+                        'Testing', 'https://example.org', 0, legacy_score(item))
+            for item in batch
+        ]
+        for threshold in (0.5, 0.7, 0.8, 0.9):
+            harvester.quality_threshold = threshold
+            assert harvester._validate_data(processed) == legacy_validate(processed, threshold)
+    assert not harvester._validate_data([])
+
+
+def test_category_tables_change_only_their_categories():
+    items = mixed_items(200, seed=3)
+    default = BatchQualityScorer.for_category('Cybersecurity').score(items)
+    assert default.tolist() == [legacy_score(item) for item in items]
+    academic = BatchQualityScorer.for_category('Academic_Papers').score(
+        [{'content': 'x' * 1500, 'title': 'A long paper title', 'doi': '10.1/x'}]
+    )
+    assert academic.tolist() == [1.0]
+    assert BatchQualityScorer.for_category('Academic_Papers').score([{'content': 'x' * 150}]).tolist() == [0.5]
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from rate_limiter import HostRateLimiter, TokenBucket
+
+
+def timed_acquires(limiter_acquire, count):
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        stamps = []
+        for _ in range(count):
+            await limiter_acquire()
+            stamps.append(loop.time() - start)
+        return stamps
+
+    return asyncio.run(scenario())
+
+
+def test_bucket_bursts_to_capacity_then_paces_at_rate():
+    bucket = TokenBucket(rate=20, capacity=3)
+    stamps = timed_acquires(bucket.acquire, 7)
+    assert stamps[2] < 0.02
+    # Four more tokens at 20/s take about 0.2 s
+    assert 0.17 <= stamps[-1] < 0.4
+
+
+def test_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_hosts_have_independent_buckets():
+    limiter = HostRateLimiter(rate=5, burst=1)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(limiter.acquire(f"https://host{n}.example/feed") for n in range(10)))
+        return loop.time() - start
+
+    assert asyncio.run(scenario()) < 0.05
+    assert len(limiter.buckets) == 10
+
+
+def test_host_is_case_insensitive_and_ignores_path():
+    limiter = HostRateLimiter(rate=5)
+    assert limiter.bucket_for('https://API.example.org/a') is limiter.bucket_for('https://api.example.org/b?x=1')
+
+
+def test_limit_host_keeps_strictest_rate():
+    limiter = HostRateLimiter(rate=10, rates={'api.example.org': 4})
+    limiter.limit_host('API.example.org', 6)
+    assert limiter.rates['api.example.org'] == 4
+    bucket = limiter.bucket_for('https://api.example.org/')
+    assert bucket.rate == 4
+
+    limiter.limit_host('api.example.org', 1)
+    replaced = limiter.bucket_for('https://api.example.org/')
+    assert replaced is not bucket and replaced.rate == 1
+    assert limiter.bucket_for('https://other.example.org/').rate == 10
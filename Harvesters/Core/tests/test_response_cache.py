@@ -0,0 +1,99 @@
+import time
+
+from response_cache import DEFAULT_TTL, ResponseCache
+
+
+def test_store_lookup_and_conditional_headers(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.sqlite')
+    key = cache.make_key('https://example.org/feed', {})
+    assert cache.lookup(key) is None
+    cache.store(key, '"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT', [{'title': 'a'}], next_page='https://example.org/feed?p=2')
+
+    entry = cache.lookup(key)
+    assert entry.items == [{'title': 'a'}]
+    assert entry.next_page == 'https://example.org/feed?p=2'
+    assert entry.conditional_headers() == {
+        'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'
+    }
+    assert entry.is_fresh(60) and not entry.is_fresh(0)
+    assert cache.replay(entry) == [{'title': 'a'}]
+    status = cache.get_status()
+    assert (status['entries'], status['hits'], status['misses']) == (1, 1, 1)
+    cache.close()
+
+
+def test_refresh_restarts_ttl(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.sqlite')
+    cache.store('k', '"v1"', None, [{'title': 'a'}])
+    cache.db.execute("UPDATE responses SET stored_at = ?", (time.time() - 1000,))
+    entry = cache.lookup('k')
+    assert not entry.is_fresh(500)
+    assert cache.refresh(entry) == [{'title': 'a'}]
+    assert cache.lookup('k').is_fresh(500)
+    assert cache.revalidated == 1
+    cache.close()
+
+
+def test_key_separates_auth_scopes():
+    url = 'https://api.example.org/items'
+    anonymous = ResponseCache.make_key(url, {})
+    alice = ResponseCache.make_key(url, {'Authorization': 'Bearer alice'})
+    bob = ResponseCache.make_key(url, {'Authorization': 'Bearer bob'})
+    assert len({anonymous, alice, bob}) == 3
+    assert 'alice' not in alice
+    assert ResponseCache.make_key(url, {'Accept': 'text/html'}) == anonymous
+
+
+def test_ttl_by_category():
+    assert ResponseCache.ttl_for('Social_Media') == 300
+    assert ResponseCache.ttl_for('Unknown_Category') == DEFAULT_TTL
+    assert ResponseCache.ttl_for('Social_Media', override=5) == 5
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path / 'responses.sqlite', max_bytes=250)
+    payload = [{'content': 'x' * 80}]
+    cache.store('old', None, None, payload)
+    cache.store('used', None, None, payload)
+    time.sleep(0.01)
+    cache.lookup('used')
+    cache.store('new', None, None, payload)
+    assert cache.lookup('old') is None
+    assert cache.lookup('used') is not None and cache.lookup('new') is not None
+    cache.close()
+
+
+def test_store_keeps_a_running_size_total(tmp_path):
+    path = tmp_path / 'responses.sqlite'
+    cache = ResponseCache(path, max_bytes=250)
+    statements = []
+    cache.db.set_trace_callback(statements.append)
+    for index in range(20):
+        cache.store(f'k{index % 4}', None, None, [{'content': 'x' * (40 + 2 * index)}])
+        assert cache._bytes == cache.get_status()['bytes'] <= 250
+    # Only stores that overflow the limit count the table again
+    assert 0 < sum('SUM(size)' in sql for sql in statements) - 20 < 20
+    cache.close()
+
+    reopened = ResponseCache(path, max_bytes=250)
+    assert reopened.lookup('k3') is not None and reopened._bytes == reopened.get_status()['bytes']
+    reopened.close()
+
+
+def test_adds_next_page_column_to_old_table(tmp_path):
+    import sqlite3
+
+    path = tmp_path / 'responses.sqlite'
+    db = sqlite3.connect(str(path))
+    db.execute(
+        "CREATE TABLE responses (key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, items TEXT,"
+        " size INTEGER, stored_at REAL, accessed_at REAL)"
+    )
+    db.execute("INSERT INTO responses VALUES ('k', '\"e\"', NULL, '[]', 2, 0, 0)")
+    db.commit()
+    db.close()
+
+    cache = ResponseCache(path)
+    entry = cache.lookup('k')
+    assert entry.etag == '"e"' and entry.next_page is None
+    cache.close()
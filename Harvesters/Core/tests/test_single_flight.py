@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from fixture_server import make_harvester, serve
+from single_flight import SingleFlight, flight_key, normalize_url
+
+
+def test_normalize_url_and_flight_key():
+    assert normalize_url('HTTPS://Example.org:443/a?b=2&a=1#x') == 'https://example.org/a?a=1&b=2'
+    assert normalize_url('http://example.org:8080') == 'http://example.org:8080/'
+    assert flight_key('https://example.org/a?x=1', 's') == flight_key('https://EXAMPLE.org/a?x=1#f', 's')
+    assert flight_key('https://example.org/a', 's') != flight_key('https://example.org/a', 't')
+    assert flight_key('https://example.org/a', 's', 'json') != flight_key('https://example.org/a', 's', 'html')
+
+
+def test_concurrent_callers_share_one_fetch():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'page'
+
+    async def scenario():
+        return await asyncio.gather(*(flights.run('k', fetch) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert results == [('page', False)] + [('page', True)] * 4
+    assert flights.get_status() == {
+        'in_flight': 0, 'flights': 1, 'coalesced': 4, 'mean_fan_out': 5.0, 'max_fan_out': 5, 'fan_out': {5: 1}
+    }
+
+
+def test_failed_fetch_reaches_every_caller():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError('upstream broke')
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(flights.run('k', fetch) for _ in range(3)), return_exceptions=True), 1
+        )
+
+    results = asyncio.run(scenario())
+    assert [type(result) for result in results] == [ValueError] * 3
+    assert flights.get_status()['in_flight'] == 0
+
+
+def test_cancelled_leader_leaves_fetch_running_for_followers():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return 'page'
+
+    async def scenario():
+        leader = asyncio.create_task(flights.run('k', fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.run('k', fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.wait_for(follower, 1)
+
+    assert asyncio.run(scenario()) == ('page', True)
+    assert len(calls) == 1
+
+
+def test_fetch_abandoned_by_every_caller_is_cancelled_and_not_rejoined():
+    flights = SingleFlight()
+    started = []
+
+    async def fetch():
+        started.append(1)
+        await asyncio.sleep(10 if len(started) == 1 else 0)
+        return len(started)
+
+    async def scenario():
+        only = asyncio.create_task(flights.run('k', fetch))
+        await asyncio.sleep(0)
+        only.cancel()
+        await asyncio.sleep(0)
+        # The cancelled fetch has not finished unwinding yet; a new caller must not join it
+        late = await asyncio.wait_for(flights.run('k', fetch), 1)
+        with pytest.raises(asyncio.CancelledError):
+            await only
+        return late
+
+    assert asyncio.run(scenario()) == (2, False)
+
+
+def test_harvesters_coalesce_only_identical_requests(tmp_path):
+    requests = []
+
+    async def handle(request):
+        requests.append((request.headers.get('Accept'), request.headers.get('X-API-Key')))
+        await asyncio.sleep(0.05)
+        return web.json_response({'results': [{'title': 'Report', 'content': 'Shared advisory text ' * 10}]})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/advisories', handle)
+        async with serve(app) as url:
+            built = [make_harvester(tmp_path / str(n), url, ['/advisories'], cache_ttl=0) for n in range(4)]
+            # Same request as the first; then another credential; then another Accept header
+            built[2].api_config['auth'] = {'api_key': 'secret'}
+            built[3]._build_headers = lambda: {'Accept': 'application/xml'}
+            async with built[0], built[1], built[2], built[3]:
+                results = await asyncio.gather(*(harvester.harvest() for harvester in built))
+            return built, results
+
+    built, results = asyncio.run(scenario())
+    assert sorted(requests, key=str) == sorted([
+        ('application/json', None), ('application/json', 'secret'), ('application/xml', None)
+    ], key=str)
+    assert [len(items) for items in results[:2]] == [1, 1]
+    assert sum(metrics.coalesced for harvester in built for metrics in harvester.metrics.targets.values()) == 1
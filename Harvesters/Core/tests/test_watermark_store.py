@@ -0,0 +1,97 @@
+import asyncio
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+from fixture_server import make_harvester, serve
+from watermark_store import WatermarkStore
+
+TARGETS = ['/a', '/b', '/c']
+
+
+def test_cursors_round_trip(tmp_path):
+    store = WatermarkStore(tmp_path / 'watermarks.sqlite')
+    assert store.get('H', '/a') is None
+    store.set('H', '/a', {'since': '2024-01-01', 'page': 3})
+    store.set('Other', '/a', 7)
+    store.close()
+    reopened = WatermarkStore(tmp_path / 'watermarks.sqlite')
+    assert reopened.get('H', '/a') == {'since': '2024-01-01', 'page': 3}
+    assert reopened.get('Other', '/a') == 7
+    reopened.close()
+
+
+def test_interrupted_sweep_resumes_pending_targets_only(tmp_path):
+    store = WatermarkStore(tmp_path / 'watermarks.sqlite')
+    assert store.begin_sweep('H', TARGETS) == TARGETS
+    store.mark_done('H', '/b')
+    store.close()
+
+    reopened = WatermarkStore(tmp_path / 'watermarks.sqlite')
+    assert reopened.begin_sweep('H', TARGETS) == ['/a', '/c']
+    # Resuming does not reset progress: a second interruption keeps it too
+    reopened.mark_done('H', '/a')
+    assert reopened.begin_sweep('H', list(reversed(TARGETS))) == ['/c']
+    # Sweeps are per harvester
+    assert reopened.begin_sweep('Other', TARGETS) == TARGETS
+    reopened.close()
+
+
+def test_finish_sweep_clears_progress(tmp_path):
+    store = WatermarkStore(tmp_path / 'watermarks.sqlite')
+    store.begin_sweep('H', TARGETS)
+    store.mark_done('H', '/a')
+    store.finish_sweep('H')
+    assert store.db.execute("SELECT COUNT(*) FROM sweeps").fetchone()[0] == 0
+    assert store.begin_sweep('H', TARGETS) == TARGETS
+    store.close()
+
+
+def test_changed_targets_start_a_fresh_sweep(tmp_path):
+    store = WatermarkStore(tmp_path / 'watermarks.sqlite')
+    store.begin_sweep('H', TARGETS)
+    store.mark_done('H', '/a')
+    assert store.begin_sweep('H', TARGETS + ['/d']) == TARGETS + ['/d']
+    # The old sweep's progress is gone, not merged into the new one
+    assert store.begin_sweep('H', TARGETS + ['/d']) == TARGETS + ['/d']
+    store.mark_done('H', '/d')
+    assert store.begin_sweep('H', ['/a', '/b']) == ['/a', '/b']
+    store.close()
+
+
+def test_harvester_resumes_a_stream_stopped_early(tmp_path):
+    requests = []
+
+    async def handle(request):
+        requests.append(request.path)
+        return web.json_response({'results': [{
+            'title': f'Report {request.path}', 'author': 'Analyst', 'url': f'https://example.org{request.path}',
+            'content': f'Detailed findings for report {request.path}, long enough to pass validation. ' * 3
+        }]})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get('/{name}', handle)
+        async with serve(app) as url:
+            first = make_harvester(tmp_path, url, TARGETS, cache_ttl=0)
+            first.concurrency.initial_limit = first.concurrency.max_limit = 1
+            async with first:
+                stream = first.harvest_stream()
+                delivered = [await stream.__anext__()]
+                await stream.aclose()
+            first.cache.close()
+            first.dedup.close()
+            first.watermarks.close()
+            requests.clear()
+
+            second = make_harvester(tmp_path, url, TARGETS, cache_ttl=0)
+            async with second:
+                items = await second.harvest()
+            return delivered, items, second
+
+    delivered, items, second = asyncio.run(scenario())
+    done = urlsplit(delivered[0].url).path
+    assert sorted(requests) == sorted(set(TARGETS) - {done})
+    assert sorted(urlsplit(item.url).path for item in items) == sorted(set(TARGETS) - {done})
+    # The completed sweep is closed, so the next run covers every target again
+    assert second.watermarks.begin_sweep(second.name, TARGETS) == TARGETS
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+ECHO PRIME V8.0 - WATERMARK STORE
+Per-target harvest cursors and resumable sweeps
+
+Watermarks record how far each harvester has read each target (last seen
+id, timestamp or page token) so the next run asks only for newer data.
+Sweep records track which targets of the current run have completed; a run
+that is interrupted leaves its sweep open and the next run resumes with the
+remaining targets only.
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+from harvest_paths import harvest_data_dir
+
+logger = logging.getLogger(__name__)
+
+
+class WatermarkStore:
+    """SQLite-backed cursor and sweep-progress store"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self._db = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path is None:
+                self.path = harvest_data_dir('state') / 'watermarks.sqlite'
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                " harvester TEXT, target TEXT, cursor TEXT, updated_at REAL,"
+                " PRIMARY KEY (harvester, target));"
+                "CREATE TABLE IF NOT EXISTS sweeps ("
+                " harvester TEXT, target TEXT, done INTEGER,"
+                " PRIMARY KEY (harvester, target));"
+            )
+        return self._db
+
+    def get(self, harvester: str, target: str) -> Optional[Any]:
+        """Cursor recorded for a target, or None"""
+        row = self.db.execute(
+            "SELECT cursor FROM watermarks WHERE harvester = ? AND target = ?", (harvester, target)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, harvester: str, target: str, cursor: Any):
+        self.db.execute(
+            "INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?)",
+            (harvester, target, json.dumps(cursor), time.time())
+        )
+        self.db.commit()
+
+    def begin_sweep(self, harvester: str, targets: List[str]) -> List[str]:
+        """Start a sweep, or resume an interrupted one over the same targets
+
+        Returns the targets that still need harvesting.
+        """
+        rows = self.db.execute(
+            "SELECT target, done FROM sweeps WHERE harvester = ?", (harvester,)
+        ).fetchall()
+        if rows and {target for target, _ in rows} == set(targets):
+            done = {target for target, finished in rows if finished}
+            remaining = [target for target in targets if target not in done]
+            logger.info(f"{harvester} resuming sweep: {len(done)} done, {len(remaining)} remaining")
+            return remaining
+
+        self.db.execute("DELETE FROM sweeps WHERE harvester = ?", (harvester,))
+        self.db.executemany(
+            "INSERT INTO sweeps VALUES (?, ?, 0)", [(harvester, target) for target in targets]
+        )
+        self.db.commit()
+        return list(targets)
+
+    def mark_done(self, harvester: str, target: str):
+        self.db.execute(
+            "UPDATE sweeps SET done = 1 WHERE harvester = ? AND target = ?", (harvester, target)
+        )
+        self.db.commit()
+
+    def finish_sweep(self, harvester: str):
+        """Close a sweep that ran to completion"""
+        self.db.execute("DELETE FROM sweeps WHERE harvester = ?", (harvester,))
+        self.db.commit()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+# Process-wide store
+shared_watermark_store = WatermarkStore()
@@ -1,35 +1,137 @@
 #!/usr/bin/env python3
 """
-ECHO PRIME V8.0 - HARVESTERORCHESTRATOR (SWARM-ENHANCED HARVESTER)
-Data harvesting from General Harvesting sources
+ECHO PRIME V8.0 - HARVESTER ORCHESTRATOR
+Runs the selected domain harvesters concurrently under one budget
 
-SWARM CONSULTATION APPLIED:
-- Patterns: async, error_handling
-- Algorithms: caching, rate_limiting, data_parsing
-- Features: logging, validation
+Sources are selected from the domain catalogs (see Core/catalog_engine.py):
+enabled catalog sources run as configured BaseHarvesters, and legacy template
+modules referenced by catalog entries can be included through the module
+registry. Jobs wait in a priority queue and at most ``max_harvesters`` run at
+once; each harvester is built when its job starts and dropped when it ends.
+Every harvester shares one connection budget (a global semaphore taken per
+request, or per target for legacy modules),
+one parse-offload pool sized to the CPU budget and one sink, and their item
+streams are merged into a single bounded stream. Per-harvester progress is
+available from get_status() while a sweep runs.
 
-IMPLEMENTATION NOTES:
-# Enhanced Harvesters implementation with best practices
+    python harvester_orchestrator.py --domains Cybersecurity Social_Media
+    python harvester_orchestrator.py --sources Cybersecurity/cve_database --legacy
 """
 
+import argparse
 import asyncio
-import aiohttp
+import heapq
+import itertools
 import json
 import logging
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import sys
+import time
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterable
 from pathlib import Path
 
+# Core helpers shared by all harvesters
+sys.path.append(str(Path(__file__).resolve().parent / 'Core'))
+
+from base_harvester import BaseHarvester
+from catalog_engine import CatalogEngine, SourceSpec
+from dedup_index import shared_dedup_index
+from harvest_item import HarvestItem
+from harvest_sink import HarvestSink
+from module_registry import shared_registry
+from parse_offload import ParseOffload
+from session_pool import shared_session_pool
+from single_flight import shared_single_flight
+from stream_merge import merge_streams
+
 logger = logging.getLogger(__name__)
 
+JOB_STATES = ('queued', 'running', 'done', 'failed')
+
+
+class HarvestJob:
+    """One harvester's place in a sweep and its progress"""
+
+    __slots__ = ('spec', 'legacy', 'state', 'items', 'error', 'started', 'finished', 'harvester', 'metrics')
+
+    def __init__(self, spec: SourceSpec, legacy: bool = False):
+        self.spec = spec
+        # Run the catalog entry's legacy module instead of the catalog config
+        self.legacy = legacy
+        self.state = 'queued'
+        self.items = 0
+        self.error: Optional[str] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.harvester = None
+        self.metrics: Optional[Dict[str, Any]] = None
+
+    @property
+    def id(self) -> str:
+        return self.spec.module if self.legacy else self.spec.id
+
+    @property
+    def priority(self) -> int:
+        return self.spec.priority
+
+    def progress(self) -> Dict[str, Any]:
+        metrics = self.metrics
+        if metrics is None and isinstance(self.harvester, BaseHarvester):
+            metrics = self.harvester.metrics.get_status()['totals']
+        end = self.finished or time.time()
+        return {
+            'id': self.id,
+            'state': self.state,
+            'priority': self.priority,
+            'items': self.items,
+            'seconds': round(end - self.started, 3) if self.started else None,
+            'requests': metrics.get('requests') if metrics else None,
+            'errors': metrics.get('errors') if metrics else None,
+            'coalesced': metrics.get('coalesced') if metrics else None,
+            'error': self.error
+        }
+
+
+class BudgetedSlots:
+    """A legacy harvester's own concurrency slots, each also drawing on the sweep budget
+
+    Legacy templates make one request per slot through their own session,
+    so a slot stands in for a connection. The source slot is taken first,
+    so a source waiting on its own limit does not hold a slot of the
+    shared budget.
+    """
+
+    __slots__ = ('source', 'budget')
+
+    def __init__(self, source: Optional[asyncio.Semaphore], budget: asyncio.Semaphore):
+        self.source = source
+        self.budget = budget
+
+    async def __aenter__(self):
+        if self.source is not None:
+            await self.source.acquire()
+        try:
+            await self.budget.acquire()
+        except BaseException:
+            if self.source is not None:
+                self.source.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.budget.release()
+        if self.source is not None:
+            self.source.release()
+
 
 class HarvesterOrchestrator:
     """
-    Advanced General Harvesting harvester with real API integration
-    Swarm-enhanced with sophisticated data processing capabilities
+    Priority-scheduled sweep over catalog and legacy harvesters
+    sharing one connection budget, CPU budget and sink
     """
-    
-    def __init__(self):
+
+    def __init__(self, max_harvesters: int = 8, max_connections: int = 64, cpu_workers: Optional[int] = None,
+                 sink: Optional[HarvestSink] = None, engine: Optional[CatalogEngine] = None,
+                 queue_size: int = 1000):
         self.name = "HarvesterOrchestrator"
         self.category = "General_Harvesting"
         self.logger = logging.getLogger(__name__)
@@ -41,27 +143,25 @@ class HarvesterOrchestrator:
         self.phoenix_healing = True
         self.commander_override = "Bobby_Don_McWilliams_II_Level_1"
 
-        # API configuration
-        self.api_config = {
-            'base_urls': ['https://api.example.com'],
-            'endpoints': ['/data'],
-            'auth': {},
-            'rate_limit': 10
-        }
-
-        # Session and rate limiting
-        self.session = None
-        self.rate_limiter = asyncio.Semaphore(5)
+        # Budgets shared by every harvester of a sweep
+        self.max_harvesters = max(1, max_harvesters)
+        self.max_connections = max(1, max_connections)
+        self.offload = ParseOffload(cpu_workers)
+        self.queue_size = queue_size
+        self._connections: Optional[asyncio.Semaphore] = None
 
-        # Performance features
-        self.cache = {}
-        # Metrics disabled
+        self.engine = engine or CatalogEngine()
+        self.registry = shared_registry
+        self.dedup = shared_dedup_index
+        self.sink = sink if sink is not None else HarvestSink()
 
-        # Quality control
-        self.quality_threshold = 0.7
+        self.jobs: List[HarvestJob] = []
+        self._pending: List[tuple] = []
+        # Admitted legacy items not yet delivered, by id()
+        self._unstored: Dict[int, HarvestItem] = {}
+        self._order = itertools.count()
         self.harvested_count = 0
-
-        logger.info(f"{self.name} harvester initialized with swarm enhancements and authority hierarchy")
+        self.last_harvest = None
 
     def check_authority(self, user: str) -> bool:
         """Check if user has authority to execute operation"""
@@ -85,199 +185,279 @@ class HarvesterOrchestrator:
     def commander_override_action(self, action: str):
         """Commander can override any operation"""
         self.logger.info(f"Commander override: {action}")
-    
+
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=30),
-            headers={'User-Agent': 'Echo-Prime-V8-Harvester/1.0'}
-        )
+        await shared_session_pool.acquire()
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        if self.session:
-            await self.session.close()
-    
-    async def harvest(self, max_items: int = 50) -> List[Dict[str, Any]]:
-        """Main harvesting method with advanced processing"""
-        harvested_data = []
-        
+        await shared_session_pool.release()
+        self.offload.shutdown()
+
+    def select(self, domains: Optional[Iterable[str]] = None, sources: Optional[Iterable[str]] = None,
+               legacy: bool = False) -> List[HarvestJob]:
+        """Queue harvesters for the next sweep
+
+        ``domains`` queues the enabled catalog sources of those domains (all
+        domains if neither argument is given); ``sources`` queues catalog
+        entries by '<Domain>/<name>'. With ``legacy``, disabled entries that
+        reference a legacy module run that module instead of being skipped.
+        """
+        if sources is not None:
+            specs = [self.engine.find(source_id) for source_id in sources]
+        else:
+            specs = self.engine.sources(domains, enabled=not legacy)
+
+        queued = []
+        for spec in specs:
+            if spec.enabled:
+                queued.append(self.submit(HarvestJob(spec)))
+            elif legacy and spec.module:
+                queued.append(self.submit(HarvestJob(spec, legacy=True)))
+            else:
+                logger.info(f"Skipping disabled source {spec.id}")
+        return queued
+
+    def submit(self, job: HarvestJob) -> HarvestJob:
+        """Queue one job; higher priorities run first, ties in submission order"""
+        self.jobs.append(job)
+        heapq.heappush(self._pending, (-job.priority, next(self._order), job))
+        return job
+
+    def _next_job(self) -> Optional[HarvestJob]:
+        return heapq.heappop(self._pending)[2] if self._pending else None
+
+    def _build(self, job: HarvestJob):
+        """Instantiate a job's harvester wired to the shared budgets"""
+        if job.legacy:
+            harvester = self.registry.get_harvester_class(job.spec.module)()
+            # Sources keep their own max_concurrency and also draw on the one connection budget
+            harvester.rate_limiter = BudgetedSlots(getattr(harvester, 'rate_limiter', None), self._connections)
+        else:
+            harvester = self.engine.build(job.spec)
+            harvester.offload = self.offload
+            harvester.sink = self.sink
+            # Taken per request, so pages, prefetches and retries of one target each count
+            harvester.connection_budget = self._connections
+        return harvester
+
+    async def _items(self, harvester, max_items: int) -> AsyncIterator[HarvestItem]:
+        if isinstance(harvester, BaseHarvester):
+            async for item in harvester.harvest_stream(max_items=max_items):
+                yield item
+            return
+
+        # Legacy templates return dicts from harvest(); they are deduplicated
+        # here, and stored by stream() as they are delivered since they have
+        # no sink of their own
+        harvested_ns = time.time_ns()
+        results = await harvester.harvest(max_items=max_items)
+        items = [_as_item(result, harvested_ns) for result in results if result.get('content')]
+        accepted = self.dedup.admit(items)
+        self._unstored.update((id(item), item) for item in accepted)
+        for item in accepted:
+            yield item
+
+    async def _run_job(self, job: HarvestJob, queue: asyncio.Queue, max_items: int):
+        job.state = 'running'
+        job.started = time.time()
         try:
-            targets = self._get_harvest_targets()
-            logger.info(f"Starting harvest of {len(targets)} targets")
-            
-            async with self.rate_limiter:
-                for target in targets[:max_items]:
-                    try:
-                        data = await self._harvest_target(target)
-                        if data and self._validate_data(data):
-                            harvested_data.extend(data)
-                        
-                        # Rate limiting
-                        await asyncio.sleep(0.5)
-                        
-                    except Exception as e:
-                        logger.error(f"Target harvest error: {e}")
-                        continue
-            
-            self.harvested_count += len(harvested_data)
-            logger.info(f"Harvest complete: {len(harvested_data)} items")
-            
+            job.harvester = self._build(job)
+            async with job.harvester:
+                async for item in self._items(job.harvester, max_items):
+                    job.items += 1
+                    await queue.put(item)
+            job.state = 'done'
+        except asyncio.CancelledError:
+            job.state = 'failed'
+            job.error = 'cancelled'
+            raise
         except Exception as e:
-            logger.error(f"Harvest error: {e}")
-        
-        return harvested_data
-    
-    def _get_harvest_targets(self) -> List[str]:
-        """Get harvesting targets based on API configuration"""
-        targets = []
-        base_urls = self.api_config.get('base_urls', ['https://api.example.com'])
-        endpoints = self.api_config.get('endpoints', ['/data'])
-        
-        for base_url in base_urls:
-            for endpoint in endpoints:
-                targets.append(f"{base_url}{endpoint}")
-        
-        return targets
-    
-    async def _harvest_target(self, target: str) -> List[Dict[str, Any]]:
-        """Harvest data from specific target"""
+            job.state = 'failed'
+            job.error = str(e) or type(e).__name__
+            logger.error(f"Harvester {job.id} failed: {job.error}")
+        finally:
+            job.finished = time.time()
+            if isinstance(job.harvester, BaseHarvester):
+                job.metrics = job.harvester.metrics.get_status()['totals']
+            # Finished harvesters are released so memory follows the running set
+            job.harvester = None
+
+    async def stream(self, max_items: int = 50) -> AsyncIterator[HarvestItem]:
+        """Run every queued job, yielding their items as one stream
+
+        ``max_items`` is passed to each harvester. Items pass through one
+        bounded queue, so a slow consumer throttles every harvester.
+        """
+        if not self._pending:
+            return
+        self._connections = asyncio.Semaphore(self.max_connections)
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        finished = object()
+
+        async def worker():
+            job = self._next_job()
+            while job is not None:
+                await self._run_job(job, queue, max_items)
+                job = self._next_job()
+
+        async def run():
+            workers = [asyncio.create_task(worker())
+                       for _ in range(min(self.max_harvesters, len(self._pending)))]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+            # Not on cancellation: the consumer has stopped and the queue may be full
+            await queue.put(finished)
+
+        logger.info(f"Starting sweep of {len(self._pending)} harvesters, "
+                    f"{self.max_harvesters} at a time, {self.max_connections} connections")
+        await shared_session_pool.acquire()
+        supervisor = asyncio.create_task(run())
         try:
-            headers = self._build_headers()
-            
-            async with self.session.get(target, headers=headers) as response:
-                if response.status == 200:
-                    content_type = response.headers.get('Content-Type', '').lower()
-                    
-                    if 'json' in content_type:
-                        data = await response.json()
-                        return self._process_json_data(data, target)
-                    else:
-                        text = await response.text()
-                        return self._process_text_data(text, target)
-                else:
-                    logger.warning(f"HTTP {response.status} for {target}")
-                    return []
-                    
-        except Exception as e:
-            logger.error(f"Target error: {e}")
-            return []
-    
-    def _build_headers(self) -> Dict[str, str]:
-        """Build request headers with authentication"""
-        headers = {'Accept': 'application/json'}
-        
-        auth = self.api_config.get('auth', {})
-        if auth.get('api_key'):
-            headers['X-API-Key'] = auth['api_key']
-        elif auth.get('token'):
-            headers['Authorization'] = f"Bearer {auth['token']}"
-        
-        return headers
-    
-    def _process_json_data(self, data: Any, source: str) -> List[Dict[str, Any]]:
-        """Process JSON response data"""
-        items = []
-        
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if self._unstored.pop(id(item), None) is not None:
+                    self.sink.write([item])
+                self.harvested_count += 1
+                yield item
+        finally:
+            if not supervisor.done():
+                supervisor.cancel()
+                try:
+                    await supervisor
+                except asyncio.CancelledError:
+                    pass
+            if self._unstored:
+                # Legacy items never delivered go back, so a later sweep delivers them
+                self.dedup.forget(self._unstored.values())
+                self._unstored.clear()
+            await self.sink.aflush()
+            self.dedup.flush()
+            self.last_harvest = time.time()
+            await shared_session_pool.release()
+
+    async def sweep(self, max_items: int = 50, progress_interval: Optional[float] = None) -> Dict[str, Any]:
+        """Run the queued jobs to completion, logging progress every ``progress_interval`` seconds"""
+        reporter = None
+        if progress_interval:
+            async def report():
+                while True:
+                    await asyncio.sleep(progress_interval)
+                    logger.info(f"Sweep progress: {json.dumps(self.get_status()['totals'])}")
+            reporter = asyncio.create_task(report())
         try:
-            # Handle different JSON structures
-            if isinstance(data, dict):
-                data_list = data.get('results', data.get('items', data.get('data', [data])))
-            else:
-                data_list = data if isinstance(data, list) else [data]
-            
-            for item in data_list:
-                processed_item = {
-                    'content': str(item.get('content', item.get('description', ''))),
-                    'title': str(item.get('title', item.get('name', 'Untitled'))),
-                    'url': str(item.get('url', item.get('link', source))),
-                    'category': self.category,
-                    'source': source,
-                    'harvested_at': datetime.now().isoformat(),
-                    'quality_score': self._calculate_quality_score(item)
-                }
-                
-                if processed_item['content']:
-                    items.append(processed_item)
-                    
-        except Exception as e:
-            logger.error(f"JSON processing error: {e}")
-        
-        return items
-    
-    def _process_text_data(self, text: str, source: str) -> List[Dict[str, Any]]:
-        """Process text response data"""
-        if len(text) < 50:
-            return []
-        
-        return [{
-            'content': text[:1000],  # Limit content length
-            'title': f'Content from {source}',
-            'url': source,
-            'category': self.category,
-            'source': source,
-            'harvested_at': datetime.now().isoformat(),
-            'quality_score': min(0.8, len(text) / 1000)
-        }]
-    
-    def _calculate_quality_score(self, item: Dict) -> float:
-        """Calculate quality score for harvested item"""
-        score = 0.5
-        
-        content = str(item.get('content', ''))
-        if len(content) > 100:
-            score += 0.2
-        if len(content) > 500:
-            score += 0.1
-        
-        if item.get('title') and len(str(item['title'])) > 10:
-            score += 0.1
-        
-        if item.get('author') or item.get('published_date'):
-            score += 0.1
-        
-        return min(1.0, score)
-    
-    def _validate_data(self, data: List[Dict]) -> bool:
-        """Validate harvested data quality"""
-        if not data:
-            return False
-        
-        quality_items = [d for d in data if d.get('quality_score', 0) >= self.quality_threshold]
-        return len(quality_items) >= len(data) * 0.5  # At least 50% quality items
-    
+            async for _ in self.stream(max_items=max_items):
+                pass
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+        return self.get_status()
+
+    async def harvest(self, max_items: int = 50) -> List[Dict[str, Any]]:
+        """Sweep every enabled catalog source (or the queued jobs) and return the items"""
+        if not self._pending:
+            self.select()
+        return [item async for item in self.stream(max_items=max_items)]
+
+    async def stream_harvesters(self, harvesters: List[Any], max_items: int = 50) -> AsyncIterator[Dict[str, Any]]:
+        """Merge the harvest_stream() output of already-built harvesters into one stream"""
+
+        async def run(harvester):
+            async with harvester:
+                async for item in harvester.harvest_stream(max_items=max_items):
+                    yield item
+
+        logger.info(f"Streaming from {len(harvesters)} harvesters")
+        async for item in merge_streams(run(harvester) for harvester in harvesters):
+            self.harvested_count += 1
+            yield item
+
     def get_status(self) -> Dict[str, Any]:
-        """Get harvester status"""
+        """Sweep totals and per-harvester progress"""
+        totals = {state: sum(1 for job in self.jobs if job.state == state) for state in JOB_STATES}
+        totals['items'] = sum(job.items for job in self.jobs)
         return {
             'name': self.name,
-            'category': self.category,
             'harvested_count': self.harvested_count,
-            'quality_threshold': self.quality_threshold,
-            'swarm_enhanced': True,
-            'api_endpoints': len(self.api_config.get('base_urls', [])),
-            'last_harvest': datetime.now().isoformat()
+            'max_harvesters': self.max_harvesters,
+            'max_connections': self.max_connections,
+            'totals': totals,
+            'harvesters': [job.progress() for job in self.jobs],
+            'parse_offload': self.offload.get_status(),
+            'single_flight': shared_single_flight.get_status(),
+            'sink': self.sink.get_status(),
+            'catalog': self.engine.get_status(),
+            'last_harvest': self.last_harvest
         }
 
 
-# Module instance
-harvester_orchestrator_instance = HarvesterOrchestrator()
+def _as_item(result: Dict[str, Any], harvested_ns: int) -> HarvestItem:
+    """HarvestItem from a legacy harvester's result dict"""
+    return HarvestItem(
+        content=str(result['content']),
+        title=str(result.get('title', 'Untitled')),
+        url=str(result.get('url', result.get('source', ''))),
+        category=str(result.get('category', 'General_Harvesting')),
+        source=str(result.get('source', result.get('url', ''))),
+        harvested_ns=harvested_ns,
+        quality_score=float(result.get('quality_score', 0.0))
+    )
+
+
+# Module instance, created on first access so importing has no side effects
+_instance = None
+
+
+def __getattr__(name):
+    global _instance
+    if name == 'harvester_orchestrator_instance':
+        if _instance is None:
+            _instance = HarvesterOrchestrator()
+        return _instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--domains', nargs='*', help='domains to sweep (all if omitted)')
+    parser.add_argument('--sources', nargs='*', help='catalog sources by Domain/name')
+    parser.add_argument('--legacy', action='store_true', help='also run legacy modules of disabled entries')
+    parser.add_argument('--max-harvesters', type=int, default=8)
+    parser.add_argument('--max-connections', type=int, default=64)
+    parser.add_argument('--cpu-workers', type=int, default=None)
+    parser.add_argument('--max-items', type=int, default=50)
+    parser.add_argument('--progress-interval', type=float, default=5.0)
+    parser.add_argument('--sink-dir', type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    orchestrator = HarvesterOrchestrator(
+        max_harvesters=args.max_harvesters,
+        max_connections=args.max_connections,
+        cpu_workers=args.cpu_workers,
+        sink=HarvestSink(args.sink_dir) if args.sink_dir else None
+    )
+    orchestrator.select(args.domains or None, args.sources or None, legacy=args.legacy)
 
+    async def run():
+        async with orchestrator:
+            return await orchestrator.sweep(args.max_items, args.progress_interval)
 
-async def main():
-    """Demo harvester functionality"""
-    async with HarvesterOrchestrator() as harvester:
-        results = await harvester.harvest(max_items=5)
-        print(f"Harvested {len(results)} items")
-        
-        for item in results[:3]:
-            print(f"- {item['title']} ({item['quality_score']:.2f})")
-        
-        print(f"Status: {harvester.get_status()}")
+    status = asyncio.run(run())
+    print(json.dumps({'totals': status['totals'], 'harvesters': status['harvesters']}, indent=2))
+    return 0 if not status['totals']['failed'] else 1
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(main())
 
 
 def get_harvester_class():
@@ -13,7 +13,7 @@ import asyncio
 import numpy as np
 import logging
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union, AsyncIterable
 import json
 from pathlib import Path
 
@@ -54,17 +54,28 @@ class BaseTrainer:
         
         logger.info(f"{self.name} trainer initialized with swarm enhancements")
     
-    async def train(self, training_data: List[Dict], validation_data: List[Dict] = None) -> Dict[str, Any]:
-        """Advanced training method with swarm-enhanced algorithms"""
+    async def train(self, training_data: Union[List[Dict], AsyncIterable[Dict]],
+                    validation_data: List[Dict] = None) -> Dict[str, Any]:
+        """Advanced training method with swarm-enhanced algorithms
+        
+        ``training_data`` may be a list or an async iterable such as a
+        harvester's harvest_stream(); streamed items are featurized as they
+        arrive instead of being held in memory.
+        """
         
         model_id = f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         start_time = datetime.now()
         
         try:
-            logger.info(f"Starting training for {model_id} with {len(training_data)} samples")
-            
             # Prepare data
-            X_train, y_train = self._prepare_data(training_data)
+            if hasattr(training_data, '__aiter__'):
+                X_train, y_train, training_samples = await self._prepare_stream(training_data)
+            else:
+                X_train, y_train = self._prepare_data(training_data)
+                training_samples = len(training_data)
+            
+            logger.info(f"Starting training for {model_id} with {training_samples} samples")
+            
             X_val, y_val = self._prepare_data(validation_data or [])
             
             if len(X_train) == 0:
@@ -125,7 +136,7 @@ class BaseTrainer:
                 'final_loss': training_losses[-1] if training_losses else 0.0,
                 'training_time': training_time,
                 'epochs_completed': epoch + 1,
-                'training_samples': len(training_data),
+                'training_samples': training_samples,
                 'validation_samples': len(validation_data or [])
             }
             
@@ -148,18 +159,41 @@ class BaseTrainer:
         labels = []
         
         for item in data:
-            try:
-                # Extract features
-                feature_vector = self._extract_features(item)
-                label = self._extract_label(item)
+            self._prepare_item(item, features, labels)
+        
+        return self._finalize_features(features, labels)
+    
+    async def _prepare_stream(self, stream: AsyncIterable[Dict]) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Prepare training data from an async item stream, featurizing as items arrive"""
+        
+        features = []
+        labels = []
+        samples = 0
+        
+        async for item in stream:
+            samples += 1
+            self._prepare_item(item, features, labels)
+        
+        X, y = self._finalize_features(features, labels)
+        return X, y, samples
+    
+    def _prepare_item(self, item: Dict, features: List[np.ndarray], labels: List[float]):
+        """Extract one item's feature vector and label, skipping items that yield neither"""
+        
+        try:
+            # Extract features
+            feature_vector = self._extract_features(item)
+            label = self._extract_label(item)
+            
+            if feature_vector is not None and label is not None:
+                features.append(feature_vector)
+                labels.append(label)
                 
-                if feature_vector is not None and label is not None:
-                    features.append(feature_vector)
-                    labels.append(label)
-                    
-            except Exception as e:
-                logger.warning(f"Data preparation error: {e}")
-                continue
+        except Exception as e:
+            logger.warning(f"Data preparation error: {e}")
+    
+    def _finalize_features(self, features: List[np.ndarray], labels: List[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Stack and normalize extracted features"""
         
         if not features:
             return np.array([]), np.array([])
@@ -313,8 +347,17 @@ class BaseTrainer:
         }
 
 
-# Module instance  
-base_trainer_instance = BaseTrainer()
+# Module instance, created on first access so importing has no side effects
+_instance = None
+
+
+def __getattr__(name):
+    global _instance
+    if name == 'base_trainer_instance':
+        if _instance is None:
+            _instance = BaseTrainer()
+        return _instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 async def main():